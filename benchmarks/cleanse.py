@@ -0,0 +1,95 @@
+"""Micro-benchmark of the removal of anchors with unresolved targets
+(SimpleDocument.cleanse and ReferenceSanitizer.cleanse), on a document
+with many cross-references, half of which point to missing targets.
+
+    python -m benchmarks.cleanse --sizes 500 1000 2000
+
+The former implementation, running one XPath query per unresolved target,
+is timed as well for comparison.
+"""
+
+import sys
+from argparse import ArgumentParser
+from time import perf_counter
+from unittest.mock import patch
+
+from lxml import etree as et
+
+from benchmarks.transformation import logger
+from eurlex2lexparency.celex_manager.reference_sanitizer import ReferenceSanitizer
+from eurlex2lexparency.transformation.generic.document import SimpleDocument
+from eurlex2lexparency.utils import xtml
+
+ANCHORS_PER_PARAGRAPH = 4
+
+
+def reference_heavy(paragraphs) -> et.ElementBase:
+    """Each paragraph carries an ID and cites other paragraphs, internally
+    and via external path. Targets with odd numbers do not exist.
+    """
+    html = et.Element("html")
+    body = et.SubElement(html, "body")
+    for k in range(paragraphs):
+        p = et.SubElement(body, "p")
+        if k % 2 == 0:
+            p.attrib["id"] = f"p{k}"
+        p.text = "See "
+        for j in range(ANCHORS_PER_PARAGRAPH):
+            target = (k * 7 + j * 13) % paragraphs
+            a = et.SubElement(p, "a", href=f"#p{target}")
+            a.text = str(target)
+            a.tail = " and "
+        a = et.SubElement(p, "a", href=f"/eu/3202{k % 10}R{k:04d}/ART_1/")
+        a.text = "other act"
+    return html
+
+
+def xpath_cleanse(source, existing_paths):
+    """Former implementation of both cleansing steps"""
+    targets = set(
+        href[1:] for href in source.xpath("//a/@href") if href.startswith("#")
+    )
+    for href in targets - set(source.xpath("//*/@id")):
+        for anchor in source.xpath(f'//a[@href="#{href}"]'):
+            xtml.unfold(anchor)
+    found_refs = {ref for ref in source.xpath("//a/@href") if ref.startswith("/eu/")}
+    for wrong_ref in found_refs - existing_paths:
+        for a in source.xpath(f'//a[@href="{wrong_ref}"]'):
+            xtml.unfold(a)
+
+
+def indexed_cleanse(source, existing_paths):
+    SimpleDocument(source, "EN", logger=logger).cleanse("eu", "32020R0001")
+    with patch.object(
+        ReferenceSanitizer, "get_relevant_existing_paths", return_value=existing_paths
+    ):
+        ReferenceSanitizer().cleanse(source)
+
+
+def timed(function, paragraphs) -> float:
+    source = reference_heavy(paragraphs)
+    existing_paths = {
+        href for href in source.xpath("//a/@href") if href.endswith("0/ART_1/")
+    }
+    start = perf_counter()
+    function(source, existing_paths)
+    return perf_counter() - start
+
+
+def main(argv=None):
+    parser = ArgumentParser(description="Benchmarks the anchor cleansing.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000])
+    parser.add_argument(
+        "--skip-xpath", action="store_true", help="Skip the former implementation."
+    )
+    args = parser.parse_args(argv)
+    for size in args.sizes:
+        line = f"paragraphs={size:<7} indexed {timed(indexed_cleanse, size):8.3f}s"
+        if not args.skip_xpath:
+            line += f"  xpath {timed(xpath_cleanse, size):8.3f}s"
+        print(line, flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Examines how the time per transformation phase grows with the size of
+synthetic acts. The size is measured as number of elements of the source,
+such that dimensions with non-linear effect on the size (e.g. the nesting
+depth of lists) are comparable. The growth exponent of each phase is
+estimated by a linear fit in log-log space, i.e. time ~ size ** exponent.
+
+    python -m benchmarks.scaling --format fmx --dimension articles
+    python -m benchmarks.scaling --format html --dimension footnotes \\
+        --values 50 100 200 400
+
+Exits with 1, if the exponent of any phase exceeds the threshold, since
+this indicates super-linear (e.g. quadratic) behaviour.
+"""
+
+import sys
+from argparse import ArgumentParser
+from statistics import median
+
+import numpy as np
+from lexref import Reflector
+
+from benchmarks.synthetic import Shape, WRITERS, generate
+from benchmarks.transformation import logger
+from eurlex2lexparency.transformation.conductor import transform
+from eurlex2lexparency.transformation.utils.instrumentation import Instrumentation
+
+VALUES = (25, 50, 100, 200, 400)
+
+# Phases that take less time than this (in seconds) at the largest size
+# are too noisy for a meaningful fit.
+MIN_WALL = 0.01
+
+
+def measure(fmt, shape: Shape, repeat) -> dict:
+    """:return: Median wall time per phase, including the cleansing
+    (SimpleDocument.cleanse) that follows the transformation in the ETL.
+    """
+    phases = {}
+    for _ in range(repeat):
+        Reflector.reset()
+        instrumentation = Instrumentation()
+        transformer = transform(
+            generate(fmt, shape),
+            "EN",
+            logger=logger,
+            instrumentation=instrumentation,
+        )
+        with transformer.phase("cleanse"):
+            transformer.cleanse("eu", "32020R0001")
+        for record in instrumentation.phases:
+            phases.setdefault(record["name"], []).append(record["wall"])
+        phases.setdefault("total", []).append(
+            sum(record["wall"] for record in instrumentation.phases)
+        )
+    return {name: median(values) for name, values in phases.items()}
+
+
+def exponent(sizes, walls) -> float:
+    """Slope of the least squares fit of log(walls) over log(sizes)"""
+    return float(np.polyfit(np.log(sizes), np.log(walls), 1)[0])
+
+
+def sweep(fmt, dimension, values, repeat, base: Shape = Shape()):
+    """:return: Number of source elements per value of the dimension, and
+    the corresponding wall times per phase.
+    """
+    sizes = []
+    walls = {}
+    for value in values:
+        shape = base._replace(**{dimension: value})
+        sizes.append(sum(1 for _ in generate(fmt, shape).iter()))
+        result = measure(fmt, shape, repeat)
+        print(
+            f"{dimension}={value:<6} elements {sizes[-1]:7d}"
+            f"  total {result['total']:7.3f}s",
+            flush=True,
+        )
+        for name, wall in result.items():
+            walls.setdefault(name, []).append(wall)
+    return sizes, walls
+
+
+def analyze(sizes, walls: dict, threshold) -> list:
+    """Prints the exponent per phase.
+    :return: Names of the phases growing faster than size ** threshold
+    """
+    found = []
+    print(f"\n{'phase':<22} {'exponent':>8}  " + " ".join(f"{s:>8}" for s in sizes))
+    for name, values in sorted(walls.items(), key=lambda item: -item[1][-1]):
+        if len(values) != len(sizes) or values[-1] < MIN_WALL or min(values) <= 0:
+            continue
+        slope = exponent(sizes, values)
+        flag = ""
+        if slope > threshold:
+            flag = "  <- super-linear"
+            found.append(name)
+        print(
+            f"{name:<22} {slope:8.2f}  " + " ".join(f"{v:8.3f}" for v in values) + flag
+        )
+    return found
+
+
+def main(argv=None):
+    parser = ArgumentParser(description="Scaling of the transformation phases.")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="fmx")
+    parser.add_argument(
+        "--dimension",
+        choices=Shape._fields,
+        default="articles",
+        help="Shape parameter to be varied. The others keep their default.",
+    )
+    parser.add_argument(
+        "--values", type=int, nargs="+", default=list(VALUES), help="of the dimension"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.3,
+        help="Tolerated growth exponent.",
+    )
+    args = parser.parse_args(argv)
+
+    sizes, walls = sweep(args.format, args.dimension, args.values, args.repeat)
+    found = analyze(sizes, walls, args.threshold)
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,440 @@
+"""Generates synthetic acts of arbitrary size, as Formex (LEXP.COMBINED)
+and as modern EUR-Lex HTML, to examine how the transformation scales.
+
+    python -m benchmarks.synthetic --format html --articles 500 > act.html
+
+Both formats render the same content: Chapters of ten articles each, a
+definitions article, paragraphs with cross-references to other articles,
+lists nested up to a given depth, and footnotes.
+"""
+
+import random
+import sys
+from argparse import ArgumentParser
+from typing import List, NamedTuple
+
+from lxml import etree as et
+
+CHAPTER_SIZE = 10
+
+SYLLABLES = ("ka", "lo", "mi", "nu", "pe", "ri", "so", "tu", "ve", "za")
+
+QUOTE = "‧"  # as used by EUR-Lex HTML to delimit defined terms
+
+
+class Shape(NamedTuple):
+    articles: int = 20
+    depth: int = 2  # nesting depth of the lists
+    items: int = 3  # per list (and sub-list)
+    definitions: int = 10
+    footnotes: int = 5
+    references: int = 2  # per paragraph
+
+
+class Item(NamedTuple):
+    label: str
+    text: str
+    children: List["Item"]
+
+
+class Paragraph(NamedTuple):
+    text: str
+    footnotes: List[int]
+    items: List[Item]
+
+
+class Article(NamedTuple):
+    number: int
+    heading: str
+    paragraphs: List[Paragraph]
+
+
+def roman(number) -> str:
+    result = ""
+    for value, letters in (
+        (1000, "M"),
+        (900, "CM"),
+        (500, "D"),
+        (400, "CD"),
+        (100, "C"),
+        (90, "XC"),
+        (50, "L"),
+        (40, "XL"),
+        (10, "X"),
+        (9, "IX"),
+        (5, "V"),
+        (4, "IV"),
+        (1, "I"),
+    ):
+        count, number = divmod(number, value)
+        result += letters * count
+    return result
+
+
+def alpha(number) -> str:
+    """1 -> a, 26 -> z, 27 -> aa"""
+    result = ""
+    while number > 0:
+        number, rest = divmod(number - 1, 26)
+        result = chr(ord("a") + rest) + result
+    return result
+
+
+# label function and Formex list type per nesting level
+LEVELS = (
+    (alpha, "alpha"),
+    (lambda n: roman(n).lower(), "roman"),
+    (str, "ARAB"),
+)
+
+
+def term(number) -> str:
+    """Distinct artificial terms, such that none is part of another."""
+    word = ""
+    while True:
+        number, rest = divmod(number, len(SYLLABLES))
+        word += SYLLABLES[rest]
+        if number == 0:
+            break
+    return f"{word}nic entity"
+
+
+class Draft:
+    """Content of a synthetic act, independent of the output format"""
+
+    def __init__(self, shape: Shape, seed=0):
+        self.shape = shape
+        self.random = random.Random(seed)
+        self.terms = [term(k) for k in range(shape.definitions)]
+        self.articles = [self._article(n) for n in range(1, shape.articles + 1)]
+        # the footnotes are distributed evenly over the articles
+        for k in range(1, shape.footnotes + 1):
+            article = self.articles[(k - 1) * len(self.articles) // shape.footnotes]
+            article.paragraphs[0].footnotes.append(k)
+
+    @property
+    def recitals(self) -> int:
+        return max(1, self.shape.articles // 4)
+
+    def _reference(self) -> str:
+        other = self.random.randint(1, self.shape.articles)
+        return self.random.choice(
+            (
+                f"Article {other}",
+                f"Article {other}(1)",
+                f"point (a) of Article {other}(2)",
+            )
+        )
+
+    def _term(self) -> str:
+        if not self.terms:
+            return "undertaking"
+        return self.random.choice(self.terms)
+
+    def sentence(self) -> str:
+        references = [self._reference() for _ in range(self.shape.references)]
+        text = f"Each {self._term()} shall comply with the requirements"
+        if references:
+            text += " laid down in " + " and in ".join(references)
+        return text + f" and shall inform the competent {self._term()}."
+
+    def _items(self, level) -> List[Item]:
+        if level >= self.shape.depth:
+            return []
+        label, _ = LEVELS[level % len(LEVELS)]
+        return [
+            Item(
+                f"({label(k)})",
+                f"the obligations of the {self._term()} under {self._reference()};",
+                self._items(level + 1),
+            )
+            for k in range(1, self.shape.items + 1)
+        ]
+
+    def _article(self, number) -> Article:
+        if number == 1 and self.terms:
+            return Article(
+                number,
+                "Definitions",
+                [
+                    Paragraph(
+                        "For the purposes of this Regulation, "
+                        "the following definitions apply:",
+                        [],
+                        [
+                            Item(
+                                f"({k})",
+                                f"{QUOTE}{name}{QUOTE} means an entity subject to "
+                                f"{self._reference()};",
+                                [],
+                            )
+                            for k, name in enumerate(self.terms, start=1)
+                        ],
+                    )
+                ],
+            )
+        return Article(
+            number,
+            f"Obligations of type {roman(number)}",
+            [
+                Paragraph(self.sentence(), [], []),
+                Paragraph(
+                    self.sentence()[:-1] + ", in particular:",
+                    [],
+                    self._items(0),
+                ),
+            ],
+        )
+
+    def chapters(self):
+        for start in range(0, len(self.articles), CHAPTER_SIZE):
+            yield start // CHAPTER_SIZE + 1, self.articles[start : start + CHAPTER_SIZE]
+
+
+def _sub(parent, tag, text=None, **attrib) -> et.ElementBase:
+    element = et.SubElement(parent, tag, attrib)
+    element.text = text
+    return element
+
+
+def _list_type(items: List[Item]) -> str:
+    if items[0].label == "(1)":
+        return "ARAB"
+    return {"(a)": "alpha", "(i)": "roman"}[items[0].label]
+
+
+class FormexWriter:
+    """Renders a draft as LEXP.COMBINED"""
+
+    def __init__(self, draft: Draft):
+        self.draft = draft
+        self.quotes = 0
+
+    def text(self, parent, text):
+        """Sets the text, replacing the quotes by QUOT.START and QUOT.END"""
+        parts = text.split(QUOTE)
+        parent.text = parts[0]
+        for k in range(1, len(parts) - 1, 2):
+            self.quotes += 1
+            start, end = f"QS{self.quotes:04d}", f"QE{self.quotes:04d}"
+            quote = _sub(
+                parent, "QUOT.START", CODE="2018", ID=start, **{"REF.END": end}
+            )
+            quote.tail = parts[k]
+            quote = _sub(
+                parent, "QUOT.END", CODE="2019", ID=end, **{"REF.START": start}
+            )
+            quote.tail = parts[k + 1]
+
+    def list(self, parent, items: List[Item]):
+        list_ = _sub(parent, "LIST", TYPE=_list_type(items))
+        for item in items:
+            np = _sub(_sub(list_, "ITEM"), "NP")
+            _sub(np, "NO.P", item.label)
+            self.text(_sub(np, "TXT"), item.text)
+            if item.children:
+                self.list(_sub(np, "P"), item.children)
+
+    def article(self, parent, article: Article):
+        element = _sub(parent, "ARTICLE", IDENTIFIER=f"{article.number:03d}")
+        _sub(element, "TI.ART", f"Article {article.number}")
+        _sub(element, "STI.ART", article.heading)
+        for k, paragraph in enumerate(article.paragraphs, start=1):
+            parag = _sub(element, "PARAG", IDENTIFIER=f"{article.number:03d}.{k:03d}")
+            _sub(parag, "NO.PARAG", f"{k}.")
+            alinea = _sub(parag, "ALINEA")
+            text = _sub(alinea, "P") if paragraph.items else alinea
+            text.text = paragraph.text
+            for footnote in paragraph.footnotes:
+                note = _sub(
+                    text,
+                    "NOTE",
+                    **{"NOTE.ID": f"E{footnote:04d}"},
+                    NUMBERING="ARAB",
+                    TYPE="FOOTNOTE",
+                )
+                _sub(note, "P", f"OJ C {footnote}, 1.1.2019, p. {footnote}.")
+            if paragraph.items:
+                self.list(alinea, paragraph.items)
+
+    def __call__(self) -> et.ElementBase:
+        root = et.Element("LEXP.COMBINED")
+        act = _sub(root, "ACT")
+        bib = _sub(act, "BIB.INSTANCE")
+        _sub(bib, "DATE", "20200101", ISO="20200101")
+        _sub(bib, "LG.DOC", "EN")
+        ti = _sub(_sub(act, "TITLE"), "TI")
+        _sub(ti, "P", f"Regulation (EU) 2020/{len(self.draft.articles)}")
+        _sub(_sub(ti, "P", "of "), "DATE", "1 January 2020", ISO="20200101")
+        _sub(ti, "P", "on synthetic requirements")
+        preamble = _sub(act, "PREAMBLE")
+        _sub(preamble, "PREAMBLE.INIT", "THE COUNCIL OF THE EUROPEAN UNION,")
+        _sub(
+            _sub(preamble, "GR.VISA"),
+            "VISA",
+            "Having regard to the Treaty on the Functioning of the European Union,",
+        )
+        considerations = _sub(preamble, "GR.CONSID")
+        _sub(considerations, "GR.CONSID.INIT", "Whereas:")
+        for k in range(1, self.draft.recitals + 1):
+            np = _sub(_sub(considerations, "CONSID"), "NP")
+            _sub(np, "NO.P", f"({k})")
+            _sub(np, "TXT", self.draft.sentence())
+        _sub(preamble, "PREAMBLE.FINAL", "HAS ADOPTED THIS REGULATION:")
+        enacting_terms = _sub(act, "ENACTING.TERMS")
+        for number, articles in self.draft.chapters():
+            division = _sub(enacting_terms, "DIVISION")
+            title = _sub(division, "TITLE")
+            _sub(_sub(title, "TI"), "P", f"CHAPTER {roman(number)}")
+            _sub(_sub(title, "STI"), "P", f"Provisions of part {number}")
+            for article in articles:
+                self.article(division, article)
+        final = _sub(act, "FINAL")
+        _sub(final, "P", "This Regulation shall be binding in its entirety.")
+        signature = _sub(final, "SIGNATURE")
+        _sub(_sub(signature, "PL.DATE"), "P", "Done at Brussels, 1 January 2020.")
+        _sub(_sub(signature, "SIGNATORY"), "P", "For the Council")
+        return root
+
+
+class HtmlWriter:
+    """Renders a draft as modern EUR-Lex HTML, as in the Official Journal
+    since 2013.
+    """
+
+    document_id = "L_2020001EN.01000101"
+
+    def __init__(self, draft: Draft):
+        self.draft = draft
+
+    def paragraph(self, parent, text, class_="normal", footnotes=()):
+        p = _sub(parent, "p", text, **{"class": class_})
+        for footnote in footnotes:
+            anchor = _sub(
+                p,
+                "a",
+                "(",
+                href=f"#ntr{footnote}-{self.document_id}-E{footnote:04d}",
+                id=f"ntc{footnote}-{self.document_id}-E{footnote:04d}",
+            )
+            _sub(anchor, "span", str(footnote), **{"class": "super"}).tail = ")"
+        return p
+
+    def item(self, parent, label, text) -> et.ElementBase:
+        """:return: Cell of the item's text, where sub-lists are appended"""
+        table = _sub(parent, "table", border="0", cellpadding="0", width="100%")
+        _sub(table, "col", width="4%")
+        _sub(table, "col", width="96%")
+        tr = _sub(_sub(table, "tbody"), "tr")
+        self.paragraph(_sub(tr, "td", valign="top"), label)
+        td = _sub(tr, "td", valign="top")
+        self.paragraph(td, text)
+        return td
+
+    def list(self, parent, items: List[Item]):
+        for item in items:
+            td = self.item(parent, item.label, item.text)
+            if item.children:
+                self.list(td, item.children)
+
+    def article(self, body, article: Article):
+        self.paragraph(body, f"Article {article.number}", "ti-art")
+        self.paragraph(body, article.heading, "sti-art")
+        for k, paragraph in enumerate(article.paragraphs, start=1):
+            self.paragraph(
+                body, f"{k}.   {paragraph.text}", footnotes=paragraph.footnotes
+            )
+            if paragraph.items:
+                self.list(body, paragraph.items)
+
+    def __call__(self) -> et.ElementBase:
+        html = et.Element("html")
+        head = _sub(html, "head")
+        _sub(
+            head,
+            "meta",
+            content="text/html; charset=utf-8",
+            **{"http-equiv": "content-type"},
+        )
+        _sub(head, "title", f"{self.document_id}.xml")
+        body = _sub(html, "body")
+        tr = _sub(_sub(_sub(body, "table", width="100%"), "tbody"), "tr")
+        for class_, text in (
+            ("hd-date", "1.1.2020"),
+            ("hd-lg", "EN"),
+            ("hd-ti", "Official Journal of the European Union"),
+            ("hd-oj", "L 1/1"),
+        ):
+            self.paragraph(_sub(tr, "td"), text, class_)
+        _sub(body, "hr", **{"class": "separator"})
+        for text in (
+            f"REGULATION (EU) 2020/{len(self.draft.articles)} OF THE COUNCIL",
+            "of 1 January 2020",
+            "on synthetic requirements",
+        ):
+            self.paragraph(body, text, "doc-ti")
+        self.paragraph(body, "THE COUNCIL OF THE EUROPEAN UNION,")
+        self.paragraph(
+            body,
+            "Having regard to the Treaty on the Functioning of the European Union,",
+        )
+        self.paragraph(body, "Whereas:")
+        for k in range(1, self.draft.recitals + 1):
+            self.item(body, f"({k})", self.draft.sentence())
+        self.paragraph(body, "HAS ADOPTED THIS REGULATION:")
+        for number, articles in self.draft.chapters():
+            self.paragraph(body, f"CHAPTER {roman(number)}", "ti-section-1")
+            heading = self.paragraph(body, None, "ti-section-2")
+            _sub(heading, "span", f"PROVISIONS OF PART {number}", **{"class": "bold"})
+            for article in articles:
+                self.article(body, article)
+        final = _sub(body, "div", **{"class": "final"})
+        self.paragraph(final, "This Regulation shall be binding in its entirety.")
+        self.paragraph(final, "Done at Brussels, 1 January 2020.")
+        signatory = _sub(final, "div", **{"class": "signatory"})
+        self.paragraph(signatory, "For the Council", "signatory")
+        if self.draft.shape.footnotes:
+            _sub(body, "hr", **{"class": "note"})
+        for k in range(1, self.draft.shape.footnotes + 1):
+            p = _sub(body, "p", **{"class": "note"})
+            anchor = _sub(
+                p,
+                "a",
+                "(",
+                href=f"#ntc{k}-{self.document_id}-E{k:04d}",
+                id=f"ntr{k}-{self.document_id}-E{k:04d}",
+            )
+            _sub(anchor, "span", str(k), **{"class": "super"}).tail = ")"
+            anchor.tail = f" OJ C {k}, 1.1.2019, p. {k}."
+        # round trip, to obtain the tree the HTML parser would produce
+        return et.fromstring(et.tostring(html), parser=et.HTMLParser())
+
+
+WRITERS = {"fmx": FormexWriter, "html": HtmlWriter}
+
+
+def generate(fmt, shape: Shape = Shape(), seed=0) -> et.ElementBase:
+    """
+    :param fmt: "fmx" or "html"
+    :param shape: Size of the act
+    :param seed: of the random choice of terms and cross-references
+    :return: Synthetic act in English
+    """
+    return WRITERS[fmt](Draft(shape, seed))()
+
+
+def main(argv=None):
+    parser = ArgumentParser(description="Writes a synthetic act to stdout.")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="fmx")
+    for field, default in Shape._field_defaults.items():
+        parser.add_argument(f"--{field}", type=int, default=default)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    shape = Shape(**{field: getattr(args, field) for field in Shape._fields})
+    document = generate(args.format, shape, args.seed)
+    method = "html" if args.format == "html" else "xml"
+    sys.stdout.write(et.tostring(document, method=method, encoding="unicode"))
+
+
+if __name__ == "__main__":
+    main()
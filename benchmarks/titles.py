@@ -0,0 +1,90 @@
+"""Micro-benchmark of the date extraction from long titles of acts, over
+the titles of extraction/meta_data/tests/data/titles.list.
+
+    python -m benchmarks.titles --repeat 5
+
+The month table based TitleParts.get_date is compared with dateparser,
+which was used formerly and remains the fallback for invalid dates.
+"""
+
+import os
+import subprocess
+import sys
+from argparse import ArgumentParser
+from statistics import median
+from time import perf_counter
+
+from eurlex2lexparency.extraction.meta_data.title_parsing import TitleParser
+
+TITLES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    "eurlex2lexparency",
+    "extraction",
+    "meta_data",
+    "tests",
+    "data",
+    "titles.list",
+)
+
+
+def load_titles():
+    with open(TITLES_PATH, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def import_time(module) -> float:
+    """Seconds to import module in a fresh interpreter"""
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"from time import perf_counter; s = perf_counter(); import {module}; "
+            "print(perf_counter() - s)",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return float(output)
+
+
+def timed(function, matches, repeat) -> float:
+    walls = []
+    for _ in range(repeat):
+        start = perf_counter()
+        for m_date in matches:
+            function(m_date)
+        walls.append(perf_counter() - start)
+    return median(walls)
+
+
+def main(argv=None):
+    parser = ArgumentParser(description="Benchmarks the date extraction.")
+    parser.add_argument("--language", default="EN")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs.")
+    args = parser.parse_args(argv)
+
+    import dateparser
+
+    title_parts = TitleParser(args.language).title_part_pattern
+    matches = [
+        m_date
+        for m_date in map(title_parts.long_date.search, load_titles())
+        if m_date is not None
+    ]
+
+    def former(m_date):
+        return dateparser.parse(
+            m_date.group(), languages=[args.language.lower()]
+        ).date()
+
+    mismatches = sum(former(m) != title_parts.get_date(m) for m in matches)
+    print(f"dates          {len(matches):7d}  mismatches {mismatches}")
+    print(f"month table    {timed(title_parts.get_date, matches, args.repeat):7.4f}s")
+    print(f"dateparser     {timed(former, matches, args.repeat):7.4f}s")
+    print(f"import         {import_time('dateparser'):7.4f}s (dateparser)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""Benchmarks the transformation of the test fixtures.
+
+Runs offline, i.e. neither a database nor the SPARQL endpoint is required.
+
+    python -m benchmarks.transformation --repeat 5 --save
+    python -m benchmarks.transformation --repeat 5 --threshold 0.2
+
+The first call stores the results as baseline, the second one compares
+against it and exits with 1, if the median time or the peak memory of any
+fixture regresses by more than the threshold. Without a baseline, only
+--save is accepted. The peak memory is by how much the maximum resident set
+size of a fresh process grows, while it transforms the parsed fixture once.
+So, unlike tracemalloc, it includes the allocations of libxml2.
+"""
+
+import json
+import logging
+import os
+import resource
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from math import ceil
+from multiprocessing import get_context
+from statistics import median
+from time import perf_counter
+
+from lexref import Reflector
+from lxml import etree as et
+
+from eurlex2lexparency.transformation.conductor import transform
+from eurlex2lexparency.transformation.utils.instrumentation import Instrumentation
+
+TRANSFORMATION_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+    "eurlex2lexparency",
+    "transformation",
+)
+
+FIXTURES = {
+    "visakodex": ("formex/tests/data/visakodex.xml", "DE"),
+    "mifid_ii": ("formex/tests/data/mifid_ii.xml", "DE"),
+    "crr": ("formex/tests/data/crr.xml", "DE"),
+    "proposal": ("html/tests/data/proposal_raw.html", "DE"),
+    "moderncons_1": ("html/tests/data/moderncons_1_raw.html", "EN"),
+}
+
+BASELINE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "baseline.json")
+
+logger = logging.getLogger("benchmarks")
+logger.setLevel(logging.ERROR)  # the transformers' warnings are not of interest
+
+
+def percentile(values, p) -> float:
+    """Nearest-rank percentile"""
+    values = sorted(values)
+    return values[max(ceil(p / 100 * len(values)) - 1, 0)]
+
+
+def load(file_path) -> et.ElementBase:
+    if file_path.endswith(".xml"):
+        parser = et.XMLParser()
+    else:
+        parser = et.HTMLParser(encoding="utf-8")
+    return et.parse(file_path, parser=parser).getroot()
+
+
+def run_once(source: et.ElementBase, language):
+    """Transforms the source, starting with empty reference caches.
+    :return: Wall time and phase records
+    """
+    Reflector.reset()
+    instrumentation = Instrumentation()
+    start = perf_counter()
+    transform(source, language, logger=logger, instrumentation=instrumentation)
+    return perf_counter() - start, instrumentation.phases
+
+
+def max_rss() -> int:
+    """:return: Maximum resident set size of this process so far, in bytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # KiB on Linux
+
+
+def _peak_rss(file_path, language) -> int:
+    source = load(file_path)
+    before = max_rss()
+    run_once(source, language)
+    return max_rss() - before
+
+
+def peak_rss(file_path, language) -> int:
+    """:return: Growth of the maximum resident set size in bytes, while a
+    fresh process transforms the loaded document once.
+    """
+    # Unlike the forked children of the fork server, spawned processes
+    # inherit the maximum resident set size of this process via exec.
+    with ProcessPoolExecutor(1, mp_context=get_context("forkserver")) as executor:
+        return executor.submit(_peak_rss, file_path, language).result()
+
+
+def summarize(values) -> dict:
+    return {"median": median(values), "p95": percentile(values, 95)}
+
+
+def benchmark(file_path, language, repeat) -> dict:
+    """
+    :param file_path: of the document to be transformed. Parsing is not part
+        of the time measurement.
+    :param language: of the document
+    :param repeat: Number of timed runs
+    """
+    walls = []
+    phases = {}
+    for _ in range(repeat):
+        wall, records = run_once(load(file_path), language)
+        walls.append(wall)
+        for record in records:
+            phases.setdefault(record["name"], []).append(record["wall"])
+    return dict(
+        summarize(walls),
+        peak_memory=peak_rss(file_path, language),
+        phases={name: summarize(values) for name, values in phases.items()},
+    )
+
+
+def run(fixtures, repeat) -> dict:
+    results = {}
+    for name in fixtures:
+        file_name, language = FIXTURES[name]
+        file_path = os.path.join(TRANSFORMATION_PATH, file_name)
+        results[name] = benchmark(file_path, language, repeat)
+        print(
+            f"{name:<14} median {results[name]['median']:7.3f}s"
+            f"  p95 {results[name]['p95']:7.3f}s"
+            f"  peak {results[name]['peak_memory'] / 2 ** 20:7.1f}MiB",
+            flush=True,
+        )
+    return results
+
+
+def regressions(results: dict, baseline: dict, threshold) -> list:
+    """:return: Descriptions of the measures exceeding the baseline by more
+    than the threshold (relative).
+    """
+    found = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for measure in ("median", "peak_memory"):
+            before, after = baseline[name][measure], result[measure]
+            if after > before * (1 + threshold):
+                found.append(f"{name} {measure}: {before:.4g} -> {after:.4g}")
+    return found
+
+
+def print_phases(results: dict):
+    for name, result in results.items():
+        print(f"\n{name}")
+        for phase, values in sorted(
+            result["phases"].items(), key=lambda item: item[1]["median"], reverse=True
+        ):
+            print(
+                f"  {phase:<22} median {values['median']:7.3f}s"
+                f"  p95 {values['p95']:7.3f}s"
+            )
+
+
+def main(argv=None):
+    parser = ArgumentParser(description="Benchmarks the transformation.")
+    parser.add_argument(
+        "--fixture",
+        action="append",
+        choices=sorted(FIXTURES),
+        help="Fixture to be benchmarked. May be repeated. Default: all.",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs.")
+    parser.add_argument("--baseline", default=BASELINE, help="JSON file.")
+    parser.add_argument(
+        "--save", action="store_true", help="Store the results as baseline."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Tolerated relative regression compared to the baseline.",
+    )
+    parser.add_argument("--phases", action="store_true", help="Print the phases.")
+    args = parser.parse_args(argv)
+    if not args.save and not os.path.isfile(args.baseline):
+        parser.error(f"No baseline at {args.baseline}. Create one with --save.")
+
+    results = run(args.fixture or list(FIXTURES), args.repeat)
+    if args.phases:
+        print_phases(results)
+    if args.save:
+        with open(args.baseline, mode="w") as f:
+            json.dump(results, f, indent=2)
+        return 0
+    with open(args.baseline) as f:
+        found = regressions(results, json.load(f), args.threshold)
+    for regression in found:
+        print(f"Regression: {regression}")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
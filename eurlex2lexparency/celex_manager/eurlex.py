@@ -1,11 +1,10 @@
-import urllib3
-import certifi
 import os
 from lxml import etree as et
 from math import ceil
 from time import sleep
 from hashlib import sha256
 from functools import lru_cache
+from itertools import islice
 import datetime
 import logging
 from typing import Iterable
@@ -19,7 +18,7 @@ from eurlex2lexparency.celex_manager.celex import (
     AnnexType,
 )
 from settings import LEXPATH
-from eurlex2lexparency.utils.eurlex_request_lock import eurlex_request_queue
+from eurlex2lexparency.utils.eurlex_client import eurlex_client
 
 from eurlex2lexparency.utils.generics import (
     get_fallbacker,
@@ -35,6 +34,8 @@ from .model import (
     SessionManager,
     Corrigendum,
     Correpresentation,
+    existing_keys,
+    insert_missing,
 )
 
 session = SessionManager()
@@ -98,6 +99,125 @@ class PersistableHit:
                             )
                         )
 
+    @classmethod
+    def persist_many(
+        cls, hits: Iterable["PersistableHit"], chunk_size=500, sm=None
+    ) -> int:
+        """Same as calling persist for each of the hits (in the given order),
+        but with a few set-based queries and bulk inserts per chunk of hits.
+        Each chunk is persisted within a single transaction.
+        :param hits: Iterable of PersistableHit instances
+        :param chunk_size: Number of hits per transaction
+        :param sm: SessionManager
+        :return: Number of persisted hits
+        """
+        hits = iter(hits)
+        count = 0
+        while True:
+            chunk = list(islice(hits, chunk_size))
+            if not chunk:
+                return count
+            _persist_chunk(chunk, sm or session)
+            count += len(chunk)
+
+
+@retry(OperationalError, tries=3, wait=60)
+def _persist_chunk(hits, sm):
+    acts = {}  # celex -> values to be updated
+    versions = set()
+    representations = set()
+    corrigenda = set()
+    correpresentations = set()
+    for hit in hits:
+        celex = str(hit.celex.base)
+        values = acts.setdefault(celex, {})
+        if hit.celex.type == AnnexType.none:
+            if hit.in_force is not None:
+                values["in_force"] = hit.in_force
+            if hit.publication_date is not None:
+                values["publication_date"] = hit.publication_date
+        if hit.celex.type in (AnnexType.consolidate, AnnexType.none):
+            if hit.celex.type == AnnexType.consolidate:
+                v_date = hit.work_date
+            else:
+                v_date = hit.default_date
+            versions.add((celex, v_date))
+            for language in hit.languages:
+                representations.add((celex, v_date, language))
+        elif hit.celex.type == AnnexType.corrigendum:
+            c_number = hit.celex.annex.value
+            corrigenda.add((celex, c_number))
+            for language in hit.languages:
+                correpresentations.add((celex, c_number, language))
+    with sm() as s:
+        stored = {key[0] for key in existing_keys(s, Act, acts)}
+        s.bulk_update_mappings(
+            Act,
+            [
+                dict(celex=celex, **values)
+                for celex, values in acts.items()
+                if celex in stored and values
+            ],
+        )
+        insert_missing(
+            s,
+            Act,
+            [
+                dict(
+                    celex=celex,
+                    publication_date=values.get("publication_date"),
+                    in_force=values.get("in_force"),
+                )
+                for celex, values in acts.items()
+                if celex not in stored
+            ],
+        )
+        insert_missing(
+            s,
+            Version,
+            [
+                dict(celex=celex, date=v_date)
+                for celex, v_date in sorted(versions - existing_keys(s, Version, acts))
+            ],
+        )
+        insert_missing(
+            s,
+            Representation,
+            [
+                dict(
+                    celex=celex,
+                    date=v_date,
+                    language=language,
+                    formex_available=Representation.presumed_formex_availability(
+                        v_date
+                    ),
+                )
+                for celex, v_date, language in sorted(
+                    representations - existing_keys(s, Representation, acts)
+                )
+            ],
+        )
+        insert_missing(
+            s,
+            Corrigendum,
+            [
+                dict(celex=celex, number=c_number)
+                for celex, c_number in sorted(
+                    corrigenda - existing_keys(s, Corrigendum, acts)
+                )
+            ],
+        )
+        insert_missing(
+            s,
+            Correpresentation,
+            [
+                dict(celex=celex, number=c_number, language=language)
+                for celex, c_number, language in sorted(
+                    correpresentations - existing_keys(s, Correpresentation, acts)
+                )
+            ],
+        )
+
 
 MODULE_PATH = os.path.dirname(os.path.realpath(__file__))
 
@@ -388,9 +508,6 @@ class DoQuery:
 
     def __init__(self, logger=None):
         self.logger = logger or logging.getLogger()
-        self.http = urllib3.PoolManager(
-            cert_reqs="CERT_REQUIRED", ca_certs=certifi.where()
-        )
         self._url = "https://eur-lex.europa.eu/EURLexWebService"
         # noinspection HttpUrlsUsage
         self._headers = {
@@ -404,20 +521,21 @@ class DoQuery:
         assert len(search_language) == 2
         page_size = min(page_size, self.max_page_size)
         # TODO: Implementation of parameter excludeAllConsleg
-        eurlex_request_queue.wait()
-        r = self.http.request(
-            "POST",
+        r = eurlex_client.post(
             self._url,
-            body=self.envelope_template.format(
+            data=self.envelope_template.format(
                 query=query, page=page, size=page_size, language=search_language
-            ),
+            ).encode("utf-8"),
             headers=self._headers,
         )
-        if (r.status, r.reason) not in [(200, "OK"), (500, "Internal Server Error")]:
+        if (r.status_code, r.reason) not in [
+            (200, "OK"),
+            (500, "Internal Server Error"),
+        ]:
             raise RuntimeError(
-                "Request status and reason is {}, {}".format(r.status, r.reason)
+                "Request status and reason is {}, {}".format(r.status_code, r.reason)
             )
-        return DoQueryResult(r.data, logger=self.logger)
+        return DoQueryResult(r.content, logger=self.logger)
 
 
 def total_pages(total_hits, page_size):
@@ -1,8 +1,14 @@
+import json
+import os
+from argparse import ArgumentParser
 from datetime import date
 from functools import lru_cache
 from abc import ABCMeta, abstractmethod
 from itertools import product
+from typing import Optional
 
+import settings
+from settings import LEXPATH
 from eurlex2lexparency.celex_manager.legislation_getter import LegislationGetter
 from eurlex2lexparency.celex_manager.model import (
     SessionManager,
@@ -19,14 +25,65 @@ from eurlex2lexparency.celex_manager.celex import (
 
 
 class MissedGetter(LegislationGetter, metaclass=ABCMeta):
+    """Reconciles the local database with the remote one.
+    Unless a full reconciliation is requested, only the years since the
+    last run (the high-water mark, stored per getter) are queried remotely.
+    """
 
     YEARS = list(map(str, range(1950, date.today().year + 2)))
     INTERS = list("RLDF")
     TYPE = None
-
-    def __init__(self):
+    LOOKBACK = 1  # years to be queried again, prior to the high-water mark
+    MARKS = getattr(
+        settings,
+        "MISSED_GETTER_MARKS",
+        os.path.join(LEXPATH, "missed_getter_marks.json"),
+    )
+    CHUNK_SIZE = 10000
+
+    def __init__(self, full=True):
         super().__init__()
         self.sm = SessionManager()
+        mark = None if full else self.get_mark()
+        if mark is None:
+            self.horizon = None
+        else:
+            self.horizon = date(mark.year - self.LOOKBACK, 1, 1)
+
+    @property
+    def years(self):
+        if self.horizon is None:
+            return self.YEARS
+        return [year for year in self.YEARS if int(year) >= self.horizon.year]
+
+    @classmethod
+    def _read_marks(cls) -> dict:
+        try:
+            with open(cls.MARKS, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    @classmethod
+    def get_mark(cls) -> Optional[date]:
+        mark = cls._read_marks().get(cls.__name__)
+        if mark is None:
+            return None
+        return date.fromisoformat(mark)
+
+    @classmethod
+    def set_mark(cls, day: date):
+        marks = cls._read_marks()
+        marks[cls.__name__] = day.isoformat()
+        tmp_path = f"{cls.MARKS}.{os.getpid()}.tmp"
+        with open(tmp_path, mode="w", encoding="utf-8") as f:
+            json.dump(marks, f, indent=2)
+        os.replace(tmp_path, cls.MARKS)
+
+    def _keys(self, *columns):
+        """Streams the values of the given columns, instead of ORM objects."""
+        with self.sm() as s:
+            yield from s.query(*columns).yield_per(self.CHUNK_SIZE)
 
     @abstractmethod
     def _local(self):
@@ -51,16 +108,29 @@ class MissedGetter(LegislationGetter, metaclass=ABCMeta):
         pass
 
     @classmethod
-    def get(cls):
-        self = cls()
+    def get(cls, full=False):
+        """
+        :param full: If True, all years are reconciled, regardless of the
+            high-water mark. Superfluous local entries can only be reported
+            for full reconciliations.
+        """
+        started = date.today()
+        self = cls(full=full)
         missings = self.remote - self.local
-        self.logger.info(f"Missed {len(missings)} {self.TYPE}.")
-        self._pull_all_missings(missings)
-        superfluous = self.local - self.remote
-        if superfluous:
-            self.logger.warning(
-                "Superfluous: \n  " + "\n  ".join(map(str, superfluous))
+        if self.horizon is None:
+            self.logger.info(f"Missed {len(missings)} {self.TYPE}.")
+        else:
+            self.logger.info(
+                f"Missed {len(missings)} {self.TYPE} since {self.horizon}."
             )
+        self._pull_all_missings(missings)
+        if self.horizon is None:
+            superfluous = self.local - self.remote
+            if superfluous:
+                self.logger.warning(
+                    "Superfluous: \n  " + "\n  ".join(map(str, superfluous))
+                )
+        self.set_mark(started)
 
 
 class MissedVersionsGetter(MissedGetter):
@@ -69,19 +139,18 @@ class MissedVersionsGetter(MissedGetter):
 
     def _local(self):
         result = set()
-        with self.sm() as s:
-            for v in s.query(Version):
-                if v.date == date(1900, 1, 1):
-                    continue
-                try:
-                    result.add(v.compound_celex)
-                except UnexpectedPatternException:
-                    pass
+        for celex, day in self._keys(Version.celex, Version.date):
+            if day == date(1900, 1, 1):
+                continue
+            try:
+                result.add(CelexCompound.get(celex, day))
+            except UnexpectedPatternException:
+                pass
         return result
 
     def _remote(self):
         result = set()
-        for year in self.YEARS:
+        for year in self.years:
             for c in self("missed_consolidates", year=year):
                 result.add(CelexCompound.from_string(c[0].toPython()))
         return result
@@ -98,17 +167,16 @@ class MissedActsGetter(MissedGetter):
 
     def _local(self):
         result = set()
-        with self.sm() as s:
-            for a in s.query(Act):
-                try:
-                    result.add(CelexBase.from_string(a.celex))
-                except UnexpectedPatternException:
-                    pass
+        for (celex,) in self._keys(Act.celex):
+            try:
+                result.add(CelexBase.from_string(celex))
+            except UnexpectedPatternException:
+                pass
         return result
 
     def _remote(self):
         result = set()
-        for year, inter in product(self.YEARS, self.INTERS):
+        for year, inter in product(self.years, self.INTERS):
             for (c,) in self("celexes_inter_year", year=year, inter=inter):
                 result.add(CelexBase.from_string(c.toPython()))
         return result
@@ -124,15 +192,17 @@ class MissedCorrigendaGetter(MissedGetter):
 
     def _local(self):
         result = set()
-        with self.sm() as s:
-            for a in s.query(Corrigendum):
-                try:
-                    result.add(a.compound_celex)
-                except UnexpectedPatternException:
-                    pass
+        for celex, number in self._keys(Corrigendum.celex, Corrigendum.number):
+            try:
+                result.add(CelexCompound.get(celex, number))
+            except UnexpectedPatternException:
+                pass
         return result
 
     def _remote(self):
+        if self.horizon is not None:
+            # The celex of a corrigendum bears the year of the corrected act.
+            return self._remote_since()
         result = set()
         for year, inter in product(self.YEARS, self.INTERS):
             self.logger.info(f"Querying Corrigenda for ({year}, {inter})")
@@ -140,6 +210,16 @@ class MissedCorrigendaGetter(MissedGetter):
                 result.add(CelexCompound.from_string(c.toPython()))
         return result
 
+    def _remote_since(self):
+        result = set()
+        for inter in self.INTERS:
+            self.logger.info(f"Querying Corrigenda for ({self.horizon}, {inter})")
+            for (c,) in self(
+                "corrigenda_since", date=self.horizon.isoformat(), inter=inter
+            ):
+                result.add(CelexCompound.from_string(c.toPython()))
+        return result
+
     def _pull_all_missings(self, missings):
         base_celexes = {c.base for c in missings}
         for celex in base_celexes:
@@ -157,23 +237,24 @@ class MissedChangesGetter(MissedGetter):
 
     def _local(self):
         result = set()
-        with self.sm() as s:
-            for r in s.query(Changes):
-                try:
-                    result.add(
-                        (
-                            CelexBase.from_string(r.celex_changer),
-                            r.change,
-                            CelexBase.from_string(r.celex_changee),
-                        )
+        for changer, change, changee in self._keys(
+            Changes.celex_changer, Changes.change, Changes.celex_changee
+        ):
+            try:
+                result.add(
+                    (
+                        CelexBase.from_string(changer),
+                        change,
+                        CelexBase.from_string(changee),
                     )
-                except UnexpectedPatternException:
-                    pass
+                )
+            except UnexpectedPatternException:
+                pass
         return result
 
     def _remote(self):
         result = set()
-        for year, (change, cdm) in product(self.YEARS, self.change_2_cdm):
+        for year, (change, cdm) in product(self.years, self.change_2_cdm):
             for changer, changee in self("changes_year", year=year, change=cdm):
                 try:
                     result.add(
@@ -189,7 +270,7 @@ class MissedChangesGetter(MissedGetter):
 
     def _pull_all_missings(self, missings):
         with self.sm() as s:
-            celexes = set(a.celex for a in s.query(Act))
+            celexes = set(celex for (celex,) in s.query(Act.celex))
             for changer, change, changee in missings:
                 if changer == changee:
                     continue
@@ -209,7 +290,17 @@ class MissedChangesGetter(MissedGetter):
 
 
 if __name__ == "__main__":
-    MissedActsGetter.get()
-    MissedVersionsGetter.get()
-    MissedCorrigendaGetter.get()
-    MissedChangesGetter.get()
+    parser = ArgumentParser(
+        description="Pulls the acts, versions, corrigenda and changes "
+        "that are missing in the local database."
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Reconcile all years, instead of the ones since the last run.",
+    )
+    args = parser.parse_args()
+    MissedActsGetter.get(full=args.full)
+    MissedVersionsGetter.get(full=args.full)
+    MissedCorrigendaGetter.get(full=args.full)
+    MissedChangesGetter.get(full=args.full)
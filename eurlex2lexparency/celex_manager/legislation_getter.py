@@ -47,6 +47,10 @@ class Hits(dict):
 
 
 class LegislationGetter(SparqlKraken):
+    # The local database is reconciled with the remote state, which is
+    # useless if that state is taken from the cache.
+    bypass_cache = True
+
     def __init__(self, logger=None):
         super().__init__(logger)
         self.lcxdb = PreLegalContentXmlDataBase()
@@ -80,27 +84,32 @@ class LegislationGetter(SparqlKraken):
     def pull_acts_representations(self, celex: str):
         self.lcxdb.pull_all_hits(query_templates["celex_wild_card"].format(celex))
         results = self("act_consolidates", celex=celex)
+        hits = []
         for c_celex, day, lang in results:
             try:
                 compound = CelexCompound.from_string(c_celex.toPython())
             except UnexpectedPatternException:
                 continue
-            CompoundHit(compound, day.toPython(), {lang_2(lang)}).persist()
+            hits.append(CompoundHit(compound, day.toPython(), {lang_2(lang)}))
+        PersistableHit.persist_many(hits)
 
     def pull_compound_celex_representations(self, cc: CelexCompound):
         assert cc.type is AnnexType.consolidate
         results = self("cons_celex_lang", comp_celex=str(cc))
-        for day, lang in results:
-            CompoundHit(cc, day.toPython(), {lang_2(lang)}).persist()
+        PersistableHit.persist_many(
+            CompoundHit(cc, day.toPython(), {lang_2(lang)}) for day, lang in results
+        )
 
     def pull_all_corrigenda_representations(self, celex: CelexBase):
         results = self("corr_celex_lang", celex=str(celex))
-        for number, day, lang in results:
+        PersistableHit.persist_many(
             CompoundHit(
                 CelexCompound.get(celex, number.toPython()),
                 day.toPython(),
                 {lang_2(lang)},
-            ).persist()
+            )
+            for number, day, lang in results
+        )
 
     def _iter_conslegs(self, month: FullMonth, act_types: tuple):
         results = self(
@@ -139,8 +148,10 @@ class LegislationGetter(SparqlKraken):
         for k in range(1, trail + 1):
             months.append(month)
             month = month.previous()
-        for h in self.iter_hits(sorted(months), act_types=act_types):
-            h.persist()
+        count = PersistableHit.persist_many(
+            self.iter_hits(sorted(months), act_types=act_types)
+        )
+        self.logger.info(f"Persisted {count} hits.")
 
 
 if __name__ == "__main__":
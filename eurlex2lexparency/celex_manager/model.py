@@ -13,7 +13,13 @@ from sqlalchemy import (
     DateTime,
     create_engine,
     Integer,
+    and_,
+    event,
+    update,
+    insert,
 )
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 from sqlalchemy.sql import func
@@ -71,14 +77,18 @@ class Representation(Base):
 
     def __init__(self, **kwargs):
         if "formex_available" not in kwargs:
-            try:
-                year = kwargs["date"].year
-            except KeyError:
-                year = 1900
-            if year < 2004 and year != 1900:
-                kwargs["formex_available"] = False
+            formex_available = self.presumed_formex_availability(kwargs.get("date"))
+            if formex_available is not None:
+                kwargs["formex_available"] = formex_available
         super().__init__(**kwargs)
 
+    @staticmethod
+    def presumed_formex_availability(date: datetime.date = None):
+        """Documents prior to 2004 are not available in formex."""
+        if date is not None and date.year < 2004 and date.year != 1900:
+            return False
+        return None
+
     celex = Column(String(15), ForeignKey(Version.celex), primary_key=True)
     date = Column(
         Date,
@@ -253,6 +263,7 @@ class SessionManager:
 
     engine = create_engine(CELEX_CONNECT_STRING)
     Session = sessionmaker(bind=engine)
+    round_trips = 0  # statements sent to the database by this process
 
     @contextmanager
     def __call__(self):
@@ -267,6 +278,114 @@ class SessionManager:
             s.close()
 
 
+@event.listens_for(Engine, "before_cursor_execute")
+def count_round_trip(*_):
+    SessionManager.round_trips += 1
+
+
+class RowBuffer:
+    """Unit of work for a single row of the given model: The row is loaded
+    at most once, and changes are buffered until they are flushed.
+    """
+
+    def __init__(self, model, key: tuple, sm: SessionManager = None):
+        """
+        :param model: Mapped class, e.g. Representation
+        :param key: Values of the primary key, in the order of the columns
+        :param sm: SessionManager
+        """
+        self.model = model
+        self.key = key
+        self.sm = sm or SessionManager()
+        self._values = None
+        self._pending = {}
+
+    def take(self, row):
+        """Takes the values from the given instance, instead of loading."""
+        self._values = {
+            column.name: getattr(row, column.name)
+            for column in self.model.__table__.columns
+        }
+        self._values.update(self._pending)
+
+    def load(self):
+        with self.sm() as s:
+            row = s.query(self.model).get(self.key)
+            if row is None:
+                raise KeyError(f"No {self.model.__tablename__} {self.key}.")
+            self.take(row)
+
+    def __getitem__(self, name):
+        if self._values is None:
+            self.load()
+        return self._values[name]
+
+    def __setitem__(self, name, value):
+        self._pending[name] = value
+        if self._values is not None:
+            self._values[name] = value
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._pending)
+
+    def flush(self, session=None):
+        """Writes the buffered changes with one statement. If no session
+        is given, a new one is committed right away.
+        """
+        if not self._pending:
+            return
+        if session is None:
+            with self.sm() as s:
+                return self.flush(s)
+        key_columns = self.model.__table__.primary_key.columns
+        session.execute(
+            update(self.model)
+            .where(
+                and_(
+                    *(
+                        getattr(self.model, column.name) == value
+                        for column, value in zip(key_columns, self.key)
+                    )
+                )
+            )
+            .values(**self._pending)
+        )
+        self._pending = {}
+
+
+def existing_keys(session, model, celexes) -> set:
+    """Primary keys of the stored rows of the given model, that belong to
+    one of the given celexes.
+    """
+    key_columns = [
+        getattr(model, column.name) for column in model.__table__.primary_key.columns
+    ]
+    return set(
+        tuple(row)
+        for row in session.query(*key_columns).filter(model.celex.in_(celexes))
+    )
+
+
+def insert_missing(session, model, rows: list):
+    """Inserts the given rows with a single (executemany) statement.
+    Where the dialect allows so, rows whose primary key has been inserted
+    in the meantime (e.g. by a concurrent process) are skipped.
+    """
+    if not rows:
+        return
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        statement = sqlite.insert(model.__table__).on_conflict_do_nothing()
+    elif dialect == "postgresql":
+        statement = postgresql.insert(model.__table__).on_conflict_do_nothing()
+    elif dialect == "mysql":
+        statement = insert(model.__table__).prefix_with("IGNORE")
+    else:
+        statement = insert(model.__table__)
+    session.execute(statement, rows)
+
+
 if __name__ == "__main__":
     Base.metadata.create_all(SessionManager.engine)
     # DocumentElementID.__table__.create(SessionManager.engine)
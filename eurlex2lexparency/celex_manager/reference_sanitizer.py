@@ -40,12 +40,13 @@ class ReferenceSanitizer(metaclass=Singleton):
         return result
 
     def cleanse(self, e: et.ElementBase):
-        found_refs = {ref for ref in e.xpath("//a/@href") if ref.startswith("/eu/")}
+        anchors = xtml.index_by_attribute(e, "a", "href")
+        found_refs = {ref for ref in anchors if ref.startswith("/eu/")}
         existing_paths = self.get_relevant_existing_paths(
             {ref.split("/")[2] for ref in found_refs}
         )
         for wrong_ref in found_refs - existing_paths:
-            for a in e.xpath(f'//a[@href="{wrong_ref}"]'):
+            for a in anchors[wrong_ref]:
                 xtml.unfold(a)
 
     def extract_ids(self, celex, e: et.ElementBase):
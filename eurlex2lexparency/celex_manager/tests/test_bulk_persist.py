@@ -0,0 +1,77 @@
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+from eurlex2lexparency.celex_manager import eurlex
+from eurlex2lexparency.celex_manager.celex import CelexCompound
+from eurlex2lexparency.celex_manager.eurlex import PersistableHit
+from eurlex2lexparency.celex_manager.legislation_getter import ActHit, CompoundHit
+from eurlex2lexparency.celex_manager.model import (
+    Base,
+    Act,
+    Version,
+    Representation,
+    Corrigendum,
+    Correpresentation,
+)
+from eurlex2lexparency.celex_manager.tests.test_row_buffer import (
+    InMemorySessionManager,
+)
+
+
+def hits():
+    get = CelexCompound.from_string
+    return [
+        CompoundHit(get("02013R0575-20200627"), date(2020, 6, 27), {"DE", "EN"}),
+        ActHit(get("32013R0575"), True, date(2013, 6, 27), {"DE"}),
+        ActHit(get("31995L0046"), None, date(1995, 11, 23), {"EN"}),
+        CompoundHit(get("32013R0575R(02)"), date(2013, 11, 30), {"EN"}),
+        CompoundHit(get("01995L0046-20031120"), date(2003, 11, 20), {"DE"}),
+        ActHit(get("31995L0046"), False, None, {"DE", "EN"}),
+        CompoundHit(get("02013R0575-20200627"), date(2020, 6, 27), {"ES"}),
+        CompoundHit(get("32013R0575R(02)"), date(2013, 11, 30), {"DE"}),
+        ActHit(get("32016R0679"), True, date(2016, 5, 4), {"EN"}),
+    ]
+
+
+class TestBulkPersist(unittest.TestCase):
+    models = (Act, Version, Representation, Corrigendum, Correpresentation)
+
+    def setUp(self):
+        self.sm = InMemorySessionManager()
+        Base.metadata.create_all(self.sm.engine)
+        with self.sm() as s:  # already known
+            s.add(Act(celex="32016R0679", in_force=False))
+            s.add(Version(celex="32016R0679", date=PersistableHit.default_date))
+
+    def tearDown(self):
+        Base.metadata.drop_all(self.sm.engine)
+
+    def stored(self):
+        result = {}
+        with self.sm() as s:
+            for model in self.models:
+                columns = [getattr(model, c.name) for c in model.__table__.columns]
+                result[model.__tablename__] = sorted(
+                    tuple(row) for row in s.query(*columns)
+                )
+        return result
+
+    def test_equivalence(self):
+        with patch.object(eurlex, "session", self.sm):
+            for hit in hits():
+                hit.persist()
+            expected = self.stored()
+            self.tearDown()
+            self.setUp()
+            self.assertEqual(len(hits()), PersistableHit.persist_many(hits(), 4))
+        self.assertEqual(expected, self.stored())
+        self.assertEqual(8, len(expected["representation"]))
+        self.assertEqual(2, len(expected["correpresentation"]))
+        # idempotent
+        PersistableHit.persist_many(hits(), sm=self.sm)
+        self.assertEqual(expected, self.stored())
+
+
+if __name__ == "__main__":
+    unittest.main()
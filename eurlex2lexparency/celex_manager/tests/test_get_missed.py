@@ -0,0 +1,84 @@
+import os
+import unittest
+from datetime import date
+from tempfile import TemporaryDirectory
+
+from eurlex2lexparency.celex_manager.celex import CelexCompound, CelexBase
+from eurlex2lexparency.celex_manager.get_missed import (
+    MissedActsGetter,
+    MissedCorrigendaGetter,
+    MissedVersionsGetter,
+)
+from eurlex2lexparency.celex_manager.model import (
+    Base,
+    Act,
+    Version,
+    Corrigendum,
+)
+from eurlex2lexparency.celex_manager.tests.test_row_buffer import (
+    InMemorySessionManager,
+)
+from eurlex2lexparency.utils.sqlite_cache import SqliteCache
+from eurlex2lexparency.utils.tests.test_sparql_cache import Endpoint
+
+
+class TestMissedGetter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.marks = os.path.join(self.tmp.name, "marks.json")
+        self.sm = InMemorySessionManager()
+        Base.metadata.create_all(self.sm.engine)
+        with self.sm() as s:
+            s.add(Act(celex="32013R0575"))
+            s.add(Version(celex="32013R0575", date=date(1900, 1, 1)))
+            s.add(Version(celex="32013R0575", date=date(2020, 6, 27)))
+            s.add(Corrigendum(celex="32013R0575", number=2))
+
+    def tearDown(self):
+        Base.metadata.drop_all(self.sm.engine)
+        self.tmp.cleanup()
+
+    def getter(self, cls, full):
+        getter_class = type(cls.__name__, (cls,), {"MARKS": self.marks})
+        getter = getter_class(full=full)
+        getter.sm = self.sm
+        return getter
+
+    def test_marks(self):
+        getter = self.getter(MissedActsGetter, full=False)
+        self.assertIsNone(getter.horizon)
+        self.assertEqual(MissedActsGetter.YEARS, getter.years)
+        getter.set_mark(date(2021, 3, 4))
+        self.assertEqual(date(2021, 3, 4), getter.get_mark())
+        incremental = self.getter(MissedActsGetter, full=False)
+        self.assertEqual(date(2020, 1, 1), incremental.horizon)
+        self.assertEqual("2020", incremental.years[0])
+        self.assertIsNone(self.getter(MissedActsGetter, full=True).horizon)
+
+    def test_local(self):
+        self.assertEqual(
+            {CelexBase.from_string("32013R0575")},
+            self.getter(MissedActsGetter, full=True).local,
+        )
+        self.assertEqual(
+            {CelexCompound.from_string("02013R0575-20200627")},
+            self.getter(MissedVersionsGetter, full=True).local,
+        )
+        self.assertEqual(
+            {CelexCompound.from_string("32013R0575R(02)")},
+            self.getter(MissedCorrigendaGetter, full=True).local,
+        )
+
+    def test_remote_state_not_cached(self):
+        getter = self.getter(MissedActsGetter, full=False)
+        getter.cache = SqliteCache(os.path.join(self.tmp.name, "sparql.db"))
+        getter.sparql = Endpoint()
+        getter.templates["acts_since"] = "acts since {year}"
+        getter("acts_since", year="2020")
+        result = getter("acts_since", year="2020")
+        self.assertEqual(2, result[0][1].toPython())
+        self.assertEqual(0, sum(getter.cache_stats.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from lxml import etree as et
+
+from eurlex2lexparency.celex_manager.reference_sanitizer import ReferenceSanitizer
+from eurlex2lexparency.utils import xtml
+
+FILE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    "transformation",
+    "html",
+    "tests",
+    "data",
+    "proposal_refined.html",
+)
+
+
+class TestReferenceSanitizer(unittest.TestCase):
+    def test_cleanse(self):
+        expected = et.parse(FILE_PATH, parser=et.HTMLParser()).getroot()
+        actual = et.parse(FILE_PATH, parser=et.HTMLParser()).getroot()
+        refs = sorted({r for r in expected.xpath("//a/@href") if r.startswith("/eu/")})
+        existing = set(refs[::2])
+        self.assertGreater(len(refs) - len(existing), 10)
+        # former implementation, querying the anchors per wrong reference
+        for wrong_ref in set(refs) - existing:
+            for a in expected.xpath(f'//a[@href="{wrong_ref}"]'):
+                xtml.unfold(a)
+        with patch.object(
+            ReferenceSanitizer, "get_relevant_existing_paths", return_value=existing
+        ):
+            ReferenceSanitizer().cleanse(actual)
+        self.assertEqual(
+            et.tostring(expected, encoding="unicode"),
+            et.tostring(actual, encoding="unicode"),
+        )
+        remaining = {r for r in actual.xpath("//a/@href") if r.startswith("/eu/")}
+        self.assertEqual(existing, remaining)
+
+
+if __name__ == "__main__":
+    unittest.main()
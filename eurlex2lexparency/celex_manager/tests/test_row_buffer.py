@@ -0,0 +1,74 @@
+import unittest
+from datetime import date
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from eurlex2lexparency.celex_manager.model import (
+    Base,
+    SessionManager,
+    Act,
+    Version,
+    Representation,
+    RowBuffer,
+)
+
+
+class InMemorySessionManager(SessionManager):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Session = sessionmaker(bind=engine)
+
+
+class TestRowBuffer(unittest.TestCase):
+    key = ("32013R0575", date(2020, 6, 27), "DE")
+
+    def setUp(self):
+        self.sm = InMemorySessionManager()
+        Base.metadata.create_all(self.sm.engine)
+        with self.sm() as s:
+            s.add(Act(celex=self.key[0], publication_date=date(2013, 6, 27)))
+            s.add(Version(celex=self.key[0], date=self.key[1]))
+            s.add(Representation(celex=self.key[0], date=self.key[1], language="DE"))
+
+    def tearDown(self):
+        Base.metadata.drop_all(self.sm.engine)
+
+    def stored(self) -> Representation:
+        with self.sm() as s:
+            r = s.query(Representation).get(self.key)
+            s.expunge(r)
+        return r
+
+    def test_unit_of_work(self):
+        round_trips = SessionManager.round_trips
+        r = RowBuffer(Representation, self.key, self.sm)
+        self.assertIsNone(r["transformation"])
+        self.assertFalse(r["uploaded"])
+        r["transformation"] = "success_fmx"
+        r["formex_available"] = True
+        self.assertEqual("success_fmx", r["transformation"])
+        self.assertTrue(r.dirty)
+        self.assertEqual(1, SessionManager.round_trips - round_trips)
+        self.assertIsNone(self.stored().transformation)
+        round_trips = SessionManager.round_trips
+        r.flush()
+        self.assertEqual(1, SessionManager.round_trips - round_trips)
+        self.assertFalse(r.dirty)
+        r.flush()
+        self.assertEqual(1, SessionManager.round_trips - round_trips)
+        stored = self.stored()
+        self.assertEqual("success_fmx", stored.transformation)
+        self.assertTrue(stored.formex_available)
+
+    def test_unknown(self):
+        r = RowBuffer(Act, ("32099R9999",), self.sm)
+        self.assertRaises(KeyError, r.__getitem__, "in_force")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,15 +16,15 @@ ActStatus = namedtuple("ActStatus", ["celex", "in_force"])
 
 
 class InForceStatusUpdater(SparqlKraken):
+    # The in-force statuses are compared with the current remote ones.
+    bypass_cache = True
+
     def __init__(self):
         super().__init__()
         self.sm = SessionManager()
 
     def in_force(self, celex):
-        results = self.sparql.query(
-            self.templates["celex_in_force"].format(celex=celex)
-        )
-        for (value,) in results:
+        for (value,) in self("celex_in_force", celex=celex):
             return value.toPython()
 
     @classmethod
@@ -62,9 +62,7 @@ class InForceStatusUpdater(SparqlKraken):
 
     @retry(EndPointInternalError, tries=3, wait=300)
     def _remote_status_for(self, law_type: str, year: int):
-        return self.sparql.query(
-            self.templates["in_force_for"].format(law_type=law_type, year=year)
-        )
+        return self("in_force_for", law_type=law_type, year=year)
 
     def iter_remote_status_for(self, law_type: str = None, year: int = None):
         if law_type is None:
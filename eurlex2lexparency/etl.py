@@ -18,7 +18,7 @@ from eurlex2lexparency.celex_manager.model import (
     SessionManager,
     Act,
     Representation,
-    Version as ActVersion,
+    RowBuffer,
 )
 from eurlex2lexparency.celex_manager.celex import (
     CelexBase,
@@ -26,13 +26,17 @@ from eurlex2lexparency.celex_manager.celex import (
     UnexpectedPatternException,
 )
 from eurlex2lexparency.transformation.conductor import transform
+from eurlex2lexparency.transformation.utils.instrumentation import Instrumentation
 from eurlex2lexparency.extraction.meta_data.language_format import (
     EurLexLanguagesAndFormats,
 )
 from eurlex2lexparency.extraction.meta_data.eli_data import construct_url_from
 from eurlex2lexparency.extraction.meta_data import cdm_data
 from eurlex2lexparency.extraction.full_bodies.html import HTMLoader
-from eurlex2lexparency.extraction.full_bodies.formex import FormexLoader
+from eurlex2lexparency.extraction.full_bodies.formex import (
+    FormexLoader,
+    BasicFormexLoader,
+)
 from eurlex2lexparency.extraction.generic import FormatNotAvailable, Formats
 from lexref.utils import limit_recursion_depth
 
@@ -55,6 +59,12 @@ def load_source(sauce) -> SimpleDocument:
 rs = ReferenceSanitizer()
 
 
+def formex_url(celex, version: Version):
+    if version.folder == "initial":
+        return celex
+    return "0{}-{}".format(celex[1:], version.folder)
+
+
 class AbstractAct:
 
     addb = SessionManager()  # abstract document data base
@@ -75,6 +85,7 @@ class AbstractAct:
         """
         self.celex = celex
         self.local_path = local_path
+        self.act = RowBuffer(Act, (celex,), self.addb)
         os.makedirs(os.path.join(self.local_path, "RDF"), exist_ok=True)
         self.representations = self.get_language_representations()
 
@@ -84,27 +95,23 @@ class AbstractAct:
 
     @property
     def in_force(self):
-        with self.addb() as s:
-            r = s.query(Act).filter(Act.celex == self.celex).first().in_force
-        return r
+        return self.act["in_force"]
 
     @property
     def publication_date(self):
-        with self.addb() as s:
-            r = s.query(Act).filter(Act.celex == self.celex).first().publication_date
-        return r
+        return self.act["publication_date"]
 
     @in_force.setter
     def in_force(self, value):
-        with self.addb() as s:
-            r = s.query(Act).filter(Act.celex == self.celex).first()
-            r.in_force = value
+        """Buffered, see flush"""
+        self.act["in_force"] = value
 
     def get_language_representations(self):
         with self.addb() as s:
             act = s.query(Act).get((self.celex,))
             if act is None:
                 raise RuntimeError("Unknown document: {}.".format(self.celex))
+            self.act.take(act)
             consolidates = set([representation.date for representation in act.versions])
         return {
             consoli_date: EurLexLanguagesAndFormats(
@@ -156,6 +163,57 @@ class AbstractAct:
         file_path = os.path.join(self.local_path, language, "head.json")
         return cdm_data.ActMetaData.cached_retrieve(self.celex, language, file_path)
 
+    def formex_may_available(self, version: Version, formex_available=None):
+        """Formex is expected for versions consolidated or acts published
+        since 2004, unless it is known whether it is available.
+        :param version: of the representation
+        :param formex_available: as stored for the representation
+        """
+        if formex_available is not None:
+            return formex_available
+        if version.consoli_date.year >= 2004:
+            return True
+        return self.publication_date.year >= 2004
+
+    def prefetch(self, language, version):
+        """Downloads the meta data and the raw sources of the given
+        representation to the local storage, without transforming anything.
+        A subsequent instantiation then finds everything it needs locally.
+        :param language: (string) Two letter country code. E.g.: DE, EN
+        :param version: (date or string) indicating the version to be fetched.
+        """
+        version = Version.create(version)
+        local_path = os.path.join(self.local_path, language, version.folder)
+        if os.path.isfile(os.path.join(local_path, "refined.html")):
+            return
+        os.makedirs(local_path, exist_ok=True)
+        logger = SwingingFileLogger.get("prefetch", local_path)
+        formats = self.representations[version.consoli_date][language]
+        cdm_data.set_logger(logger)
+        self.get_meta_data(language)
+        with self.addb() as s:
+            formex_available = (
+                s.query(Representation)
+                .get((self.celex, version.consoli_date, language))
+                .formex_available
+            )
+        if self.formex_may_available(version, formex_available):
+            fmt_dir = os.path.join(local_path, "fmx")
+            os.makedirs(fmt_dir, exist_ok=True)
+            try:
+                BasicFormexLoader(
+                    fmt_dir, formex_url(self.celex, version), language, logger
+                ).document
+            except FormatNotAvailable:
+                with self.addb() as s:
+                    s.query(Representation).get(
+                        (self.celex, version.consoli_date, language)
+                    ).formex_available = False
+            else:
+                return
+        if formats.html is not None:
+            HTMLoader(os.path.join(local_path, "htm"), formats.html, logger).document
+
     def instantiate(self, language, version="latest"):
         """
         :param language: (string) Two letter country code. E.g.: DE, EN
@@ -179,6 +237,7 @@ class AbstractAct:
             return PhysicalAct(self, language, version)
         except TransformingRepealerError:
             self.in_force = False
+            self.act.flush()
             if version == "latest":
                 return self.instantiate(language, version=self.latest(language))
             else:
@@ -186,6 +245,8 @@ class AbstractAct:
 
 
 class PhysicalAct:
+    instrument = False  # record the phases of the transformation?
+
     def __init__(self, abstract: AbstractAct, language, version):
         """Spatial- and time-like fixed representation of the abstract
         :param abstract: (AbstractAct) underlying abstract abstract
@@ -197,6 +258,11 @@ class PhysicalAct:
         self.abstract = abstract
         self.language = language
         self.version = Version.create(version)
+        self.representation = RowBuffer(
+            Representation,
+            (abstract.celex, self.version.consoli_date, language),
+            abstract.addb,
+        )
         self.local_path = os.path.join(
             self.abstract.local_path, self.language, self.version.folder
         )
@@ -218,20 +284,34 @@ class PhysicalAct:
                 os.path.join(self.local_path, "refined.html")
             )
         except (FileNotFoundError, OSError):
-            self.document = self._instantiate_carefully()
-            if self.formats.html is None and not self.formex_may_available:
-                self.formex_available = False
-                self._dump_stub()
+            try:
+                self.document = self._instantiate_carefully()
+                if self.formats.html is None and not self.formex_may_available:
+                    self.formex_available = False
+                    self._dump_stub()
+            finally:
+                self.flush()
         else:
             if self.transformation_status is None:
                 if self.document.stubbed:
                     self.transformation_status = "stubbed"
                 else:
                     self.transformation_status = "success"
+                self.flush()
 
     def __repr__(self):
         return f"PhysicalAct({self.abstract.celex}, {self.version}, {self.language})"
 
+    def flush(self):
+        """Writes the buffered changes of the representation and of the act
+        to the database, in one commit.
+        """
+        if not (self.representation.dirty or self.abstract.act.dirty):
+            return
+        with self.abstract.addb() as s:
+            self.abstract.act.flush(s)
+            self.representation.flush(s)
+
     def fall_back_meta_data(self) -> cdm_data.ActMetaData:
         try:
             celex_object = CelexBase.from_string(self.abstract.celex)
@@ -241,9 +321,7 @@ class PhysicalAct:
         else:
             type_document = {"R": "REG", "D": "DEC", "L": "DIR"}.get(celex_object.inter)
             serial_number = celex_object.number
-        with self.abstract.addb() as s:
-            act = s.query(Act).get((self.abstract.celex,))
-            date_publication = act.publication_date
+        date_publication = self.abstract.publication_date
         if self.version.folder != "initial":
             date_document = self.version.consoli_date
         else:
@@ -310,9 +388,7 @@ class PhysicalAct:
             os.makedirs(fmt_dir, exist_ok=True)
             dl = FormexLoader(
                 fmt_dir,
-                url=self.abstract.celex
-                if self.version.folder == "initial"
-                else "0{}-{}".format(self.abstract.celex[1:], self.version.folder),
+                url=formex_url(self.abstract.celex, self.version),
                 language=self.language,
                 logger=self.logger,
             )
@@ -331,9 +407,23 @@ class PhysicalAct:
             self.formex_available = True
         return dl
 
+    def _instrumentation(self):
+        if not self.instrument:
+            return None
+        return Instrumentation(
+            celex=self.abstract.celex,
+            language=self.language,
+            version=self.version.folder,
+        )
+
     def _transform(self, dl):
         try:
-            document = transform(dl.document, self.language, logger=self.logger)
+            document = transform(
+                dl.document,
+                self.language,
+                logger=self.logger,
+                instrumentation=self._instrumentation(),
+            )
         except Exception as e:
             if self.formex_available:
                 # Did this failure happen with formex input?
@@ -350,7 +440,12 @@ class PhysicalAct:
                     url=self.formats.html,
                     logger=self.logger,
                 )
-                document = transform(dl.document, self.language, logger=self.logger)
+                document = transform(
+                    dl.document,
+                    self.language,
+                    logger=self.logger,
+                    instrumentation=self._instrumentation(),
+                )
             else:
                 raise e
         return document, dl
@@ -399,10 +494,13 @@ class PhysicalAct:
                 current_preamble = document.source.xpath('//*[@id="PRE"]')[0]
                 current_preamble.addnext(previous_preamble)
                 current_preamble.getparent().remove(current_preamble)
-        document.cleanse(self.abstract.domain, self.abstract.celex)
-        rs.extract_ids(self.abstract.celex, document.source)
-        rs.cleanse(document.source)
+        with document.phase("cleanse"):
+            document.cleanse(self.abstract.domain, self.abstract.celex)
+            rs.extract_ids(self.abstract.celex, document.source)
+            rs.cleanse(document.source)
         document.dump(self.local_path)
+        if self.instrument:
+            document.instrumentation.dump(self.local_path)
         self.transformation_status = "success_{}".format(created_format)
 
     def get_previous_preamble(self, version: Version):
@@ -435,19 +533,15 @@ class PhysicalAct:
 
     def set_to_non_existence(self, format_):
         folder = format_
-        with self.abstract.addb as s:
-            r = s.query(Representation).get(
-                (self.abstract.celex, self.version.consoli_date, self.language)
-            )
-            if format_ in ("html", "htm"):
-                r.url_html = ""
-                folder = "htm"
-            elif format_ == "pdf":
-                r.url_pdf = ""
-                folder = "pdf"
-            elif format_ in ("formex", "fmx"):
-                r.formex_available = False
-                folder = "fmx"
+        if format_ in ("html", "htm"):
+            self.representation["url_html"] = ""
+            folder = "htm"
+        elif format_ == "pdf":
+            self.representation["url_pdf"] = ""
+            folder = "pdf"
+        elif format_ in ("formex", "fmx"):
+            self.representation["formex_available"] = False
+            folder = "fmx"
         self.cleanup(os.path.join(self.local_path, folder))
 
     def cleanup(self, path=None):
@@ -471,50 +565,19 @@ class PhysicalAct:
         self.abstract.representations[self.version.consoli_date][
             self.language
         ] = self.formats
-        with self.abstract.addb() as s:
-            this = s.query(Representation).get(
-                (self.abstract.celex, self.version.consoli_date, self.language)
-            )
-            this.url_html = value
+        self.representation["url_html"] = value
 
     @property
     def formex_available(self):
-        with self.abstract.addb() as s:
-            this = s.query(Representation).get(
-                (self.abstract.celex, self.version.consoli_date, self.language)
-            )
-            result = this.formex_available
-        return result
+        return self.representation["formex_available"]
 
     @formex_available.setter
     def formex_available(self, value):
-        with self.abstract.addb() as s:
-            r = (
-                s.query(Representation)
-                .filter(
-                    Representation.celex == self.abstract.celex,
-                    Representation.language == self.language,
-                    Representation.date == self.version.consoli_date,
-                )
-                .first()
-            )
-            r.formex_available = value
+        self.representation["formex_available"] = value
 
     @property
     def formex_may_available(self):
-        if self.formex_available is not None:
-            return self.formex_available
-        if self.version.consoli_date.year >= 2004:
-            return True
-        with self.abstract.addb() as s:
-            this = s.query(ActVersion).get(
-                (self.abstract.celex, self.version.consoli_date)
-            )
-            if this.act.publication_date.year >= 2004:
-                result = True
-            else:
-                result = False
-        return result
+        return self.abstract.formex_may_available(self.version, self.formex_available)
 
     def __str__(self):
         return "PhysicalAct(celex={}, language={}, version={})".format(
@@ -531,33 +594,19 @@ class PhysicalAct:
 
     @property
     def uploaded(self) -> bool:
-        with self.abstract.addb() as s:
-            r = s.query(Representation).filter(*self.standard_filters).first().uploaded
-        return r
+        return self.representation["uploaded"]
 
     @uploaded.setter
     def uploaded(self, value: bool):
-        with self.abstract.addb() as s:
-            r = s.query(Representation).filter(*self.standard_filters).first()
-            r.uploaded = value
+        self.representation["uploaded"] = value
 
     @property
     def transformation_status(self):
-        # TODO: merge the behaviour of these two properties.
-        with self.abstract.addb() as s:
-            r = (
-                s.query(Representation)
-                .filter(*self.standard_filters)
-                .first()
-                .transformation
-            )
-        return r
+        return self.representation["transformation"]
 
     @transformation_status.setter
     def transformation_status(self, value):
-        with self.abstract.addb() as s:
-            r = s.query(Representation).filter(*self.standard_filters).first()
-            r.transformation = value
+        self.representation["transformation"] = value
 
     def upload(self, address: str):
         """
@@ -573,8 +622,10 @@ class PhysicalAct:
         )
         if r.status_code == 200:
             self.uploaded = True
+            self.flush()
         else:
             self.transformation_status = "failed"
+            self.flush()
             raise UploadError(
                 "Something went wrong on uploading: "
                 f"status: {r.status_code}, text: {r.text}"
@@ -1,5 +1,7 @@
 import os
 from argparse import ArgumentParser
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
 
 import requests
@@ -21,8 +23,15 @@ from eurlex2lexparency.celex_manager.celex import (
     UnexpectedPatternException,
 )
 from .etl import AbstractAct, PhysicalAct, UploadError
+from .extraction.meta_data.cdm_data import ActMetaData
+from .extraction.full_bodies.formex import FormexLoader
+from .transformation.utils.generics import HeadingAnalyzer
+from .transformation.utils.instrumentation import Instrumentation
+import settings
 from settings import LEXPATH, LANG_2_ADDRESS
 from eurlex2lexparency.utils.generics import retry, get_fallbacker
+from eurlex2lexparency.utils.sparql_kraken import SparqlKraken
+from eurlex2lexparency.utils.sqlite_cache import SqliteCache
 
 
 class EtlManager:
@@ -33,6 +42,10 @@ class EtlManager:
         self.sm = SessionManager()
         fallbacker = get_fallbacker(self.logger, exceptions=Exception)
         self.process_act = fallbacker(self.process_act)
+        self.prefetch = fallbacker(self.prefetch)
+        heading_cache = getattr(settings, "HEADING_CACHE", None)
+        if heading_cache is not None:
+            HeadingAnalyzer.persist(SqliteCache(heading_cache, table="headings"))
 
     def inform_unavailability(self, celex, version: Version, language):
         if version.folder == "initial":
@@ -81,18 +94,96 @@ class EtlManager:
                 )
             )
 
+    def act_path(self, celex):
+        try:
+            return os.path.join(self.DATA_PATH, CelexBase.from_string(celex).path)
+        except UnexpectedPatternException:
+            return os.path.join(self.DATA_PATH, celex)
+
     def process_act(self, celex, version: Version, language) -> PhysicalAct:
         specification = f"{celex} ({version.folder}), {language}"
         self.logger.info(f"Processing {specification}.")
-        try:
-            path = os.path.join(self.DATA_PATH, CelexBase.from_string(celex).path)
-        except UnexpectedPatternException:
-            path = os.path.join(self.DATA_PATH, celex)
-        acd = AbstractAct(celex, path)
+        acd = AbstractAct(celex, self.act_path(celex))
         instance = acd.instantiate(language, version)
         self.logger.info(f"Successfully refined {specification}.")
         return instance
 
+    def prefetch(self, celex, version: Version, language):
+        """Fetch stage: Download everything process_act requires from remote."""
+        AbstractAct(celex, self.act_path(celex)).prefetch(language, version)
+
+    def retrieve_meta_data(self, celexes, language, batch_size):
+        """Stores the metadata of the given acts locally, retrieving those
+        of batch_size acts per query. Acts that fail here are retrieved one
+        by one, when processed.
+        """
+        try:
+            ActMetaData.cached_retrieve_many(
+                {
+                    celex: os.path.join(self.act_path(celex), language, "head.json")
+                    for celex in celexes
+                },
+                language,
+                batch_size,
+            )
+        except Exception as e:
+            self.logger.warning(f"Retrieving the metadata in batches failed: {e}")
+
+    # Processes fetching sources at the same time, at most. They share the
+    # rate limit, so the requests are in flight while others wait for it.
+    FETCHERS = 4
+
+    def _prefetched(self, cv, language, depth):
+        """Yields the items of cv, while background processes are fetching
+        the sources of the next <depth> items. So the rate limited downloads
+        and the transformations of the consumer run at the same time.
+        """
+        SessionManager.engine.dispose()
+        with ProcessPoolExecutor(
+            min(depth, self.FETCHERS),
+            initializer=_init_worker,
+            initargs=(False, SparqlKraken.bypass_cache),
+        ) as fetcher:
+            pending = deque()
+            for celex, version in cv:
+                pending.append(
+                    (
+                        celex,
+                        version,
+                        fetcher.submit(_prefetch, celex, version, language),
+                    )
+                )
+                if len(pending) > depth:
+                    yield self._fetched(*pending.popleft())
+            while pending:
+                yield self._fetched(*pending.popleft())
+
+    def _fetched(self, celex, version, future):
+        try:
+            future.result()
+        except Exception as e:  # e.g. BrokenProcessPool
+            self.logger.warning(f"Prefetching {celex} ({version.folder}) failed: {e}")
+        return celex, version
+
+    def etl_one(self, celex, version: Version, language, upload=False):
+        """Transforms and optionally uploads a single representation.
+        :return: The resulting transformation status, or None, if processing
+            the act failed altogether.
+        """
+        d = self.process_act(celex, version, language)
+        if d is None:
+            return None
+        status = d.transformation_status
+        if status in ("repealer", "failed"):
+            return status
+        if upload and not d.uploaded:
+            try:
+                d.upload(LANG_2_ADDRESS[language])
+            except UploadError as e:
+                self.logger.error(str(e))
+                self.inform_unavailability(celex, version, language)
+        return status
+
     @retry(OperationalError, tries=3, wait=10)
     def get_celex_version_list(
         self, language, celex=None, version=None, only_enforced=False, upload=False
@@ -138,7 +229,18 @@ class EtlManager:
             )
         return cv
 
-    def __call__(self, celex, language, version=None, upload=False, rm_local=False):
+    def __call__(
+        self,
+        celex,
+        language,
+        version=None,
+        upload=False,
+        rm_local=False,
+        workers=1,
+        prefetch=0,
+        instrument=False,
+        meta_batch=0,
+    ) -> Counter:
         """Perform ETL to given celex list.
         :param celex: string that complies the celex format.
         :param version: (string) parameter to determine, whether
@@ -150,6 +252,17 @@ class EtlManager:
         :param upload: Indicates whether the document shall be uploaded
             after being transformed.
         :param rm_local: Shall the existing files be deleted first?
+        :param workers: Number of worker processes to distribute the
+            representations to. 1 means: process sequentially.
+        :param prefetch: Number of representations whose sources are
+            downloaded ahead of the transformation by a separate process.
+            0 means: no prefetching.
+        :param instrument: If set, the time spent per phase of each
+            transformation is recorded next to the refined document, and
+            aggregated for the whole run.
+        :param meta_batch: If positive, the metadata of the acts missing it
+            locally are retrieved ahead, that many acts per SPARQL query.
+        :return: Number of processed representations per transformation status.
         """
         cv = self.get_celex_version_list(
             version=version, celex=celex, language=language, upload=upload
@@ -157,18 +270,90 @@ class EtlManager:
         if rm_local:
             for celex, version in cv:
                 self.remove_transformed(celex, language, version)
+        if meta_batch > 0:
+            self.retrieve_meta_data(
+                list(dict.fromkeys(celex for celex, _ in cv)), language, meta_batch
+            )
+        instrumented = PhysicalAct.instrument
+        PhysicalAct.instrument = instrument
+        try:
+            statuses = self._transform(
+                cv, language, upload, workers, prefetch, instrument
+            )
+        finally:
+            PhysicalAct.instrument = instrumented
+        summary = Counter(statuses)
+        self.logger.info(
+            "ETL summary: "
+            + ", ".join(
+                f"{status}: {count}"
+                for status, count in sorted(
+                    summary.items(), key=lambda item: str(item[0])
+                )
+            )
+        )
+        if instrument:
+            self.report_instrumentation(cv, language)
+        return summary
+
+    def _transform(self, cv, language, upload, workers, prefetch, instrument):
+        """:return: The status of each of the given representations"""
+        items = self._prefetched(cv, language, prefetch) if prefetch > 0 else cv
+        if workers > 1 and len(cv) > 1:
+            # Pooled connections must not be inherited by the worker processes
+            SessionManager.engine.dispose()
+            with ProcessPoolExecutor(
+                workers,
+                initializer=_init_worker,
+                initargs=(instrument, SparqlKraken.bypass_cache),
+            ) as pool:
+                return self._pooled(pool, workers, items, language, upload)
+        return [
+            self.etl_one(celex, version, language, upload) for celex, version in items
+        ]
+
+    # Representations submitted to the pool per worker, ahead of their turn
+    POOL_WINDOW = 2
+
+    def _pooled(self, pool, workers, items, language, upload) -> list:
+        """Submits the items to the pool, as they are taken from items, with
+        at most POOL_WINDOW items per worker pending. So a prefetching items
+        iterator stays only its depth ahead of the transformations.
+        """
+        statuses = []
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(_etl_one, item, language, upload))
+            if len(pending) >= self.POOL_WINDOW * workers:
+                statuses.append(pending.popleft().result())
+        statuses.extend(future.result() for future in pending)
+        return statuses
+
+    def report_instrumentation(self, cv, language) -> dict:
+        """Aggregates the instrumentation records of the given representations
+        and stores the result to the data path.
+        """
+        records = []
         for celex, version in cv:
-            d = self.process_act(celex, version, language)
-            if d is None:
-                continue
-            if d.transformation_status in ("repealer", "failed"):
+            try:
+                records.append(
+                    Instrumentation.load(
+                        os.path.join(self.act_path(celex), language, version.folder)
+                    )
+                )
+            except FileNotFoundError:  # e.g. failed or transformed before
                 continue
-            if upload and not d.uploaded:
-                try:
-                    d.upload(LANG_2_ADDRESS[language])
-                except UploadError as e:
-                    self.logger.error(str(e))
-                    self.inform_unavailability(celex, version, language)
+        aggregate = Instrumentation.aggregate(records)
+        with open(os.path.join(self.DATA_PATH, Instrumentation.file_name), "w") as f:
+            json.dump(aggregate, f, indent=2)
+        for name, total in sorted(
+            aggregate["phases"].items(), key=lambda item: item[1]["wall"], reverse=True
+        ):
+            self.logger.info(
+                f"Phase {name}: {total['wall']:.1f}s wall, {total['cpu']:.1f}s CPU "
+                f"over {total['count']} documents."
+            )
+        return aggregate
 
     @staticmethod
     def set_in_force(celex, language, value):
@@ -243,6 +428,32 @@ class EtlManager:
         self(celex, language, upload=True)
 
 
+_etl = None
+
+
+def _init_worker(instrument=False, bypass_cache=False):
+    """Initializer of the worker processes: Each of them has its own
+    EtlManager, and thereby its own database sessions.
+    :param instrument: See EtlManager.__call__
+    :param bypass_cache: Whether the SPARQL queries bypass the cache.
+    """
+    global _etl
+    PhysicalAct.instrument = instrument
+    SparqlKraken.bypass_cache = bypass_cache
+    # The workers run in parallel already, so they convert images in-process.
+    FormexLoader.max_conversion_workers = getattr(settings, "TIFF_WORKERS", 1)
+    _etl = EtlManager()
+
+
+def _etl_one(item, language, upload):
+    celex, version = item
+    return _etl.etl_one(celex, version, language, upload)
+
+
+def _prefetch(celex, version, language):
+    return _etl.prefetch(celex, version, language)
+
+
 def parse_args():
     parser = ArgumentParser(
         description="Performs ETL on optionally provided list of documents."
@@ -268,6 +479,34 @@ def parse_args():
         help="If set, the transformed documents are uploaded.",
         action="store_true",
     )
+    parser.add_argument(
+        "--workers",
+        help="Number of worker processes to transform the documents in parallel.",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--prefetch",
+        help="Number of documents to be downloaded ahead of the transformation.",
+        type=int,
+        default=0,
+    )
+    parser.add_argument(
+        "--instrument",
+        help="If set, the time spent per transformation phase is recorded.",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--meta_batch",
+        help="Number of acts whose metadata are retrieved per query ahead.",
+        type=int,
+        default=0,
+    )
+    parser.add_argument(
+        "--bypass_sparql_cache",
+        help="If set, the SPARQL endpoint is queried regardless of the cache.",
+        action="store_true",
+    )
     args = parser.parse_args()
 
     if args.celex:
@@ -278,4 +517,6 @@ def parse_args():
 if __name__ == "__main__":
     etl = EtlManager()
     parsed = parse_args()
+    if parsed.__dict__.pop("bypass_sparql_cache"):
+        SparqlKraken.bypass_cache = True
     etl(**parsed.__dict__)
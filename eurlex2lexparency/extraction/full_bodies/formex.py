@@ -1,7 +1,9 @@
+import io
 import os
-import shutil
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict
 from zipfile import ZipFile
-import requests
 from lxml import etree as et
 from PIL import Image
 import logging
@@ -11,27 +13,49 @@ from eurlex2lexparency.extraction.generic import (
     Retriever,
     FormatNotAvailable,
     img_2_base64,
+    FileCache,
 )
-from eurlex2lexparency.utils.eurlex_request_lock import eurlex_request_queue
+from eurlex2lexparency.utils.eurlex_client import eurlex_client
+import settings
+from settings import LEXPATH
 
 
-class FileCheater:
-    """
-    For cheating on Image.save:
-        https://pillow.readthedocs.io/en/3.1.x/reference/Image.html
+def tif_2_png(tif: bytes) -> bytes:
+    im = Image.open(io.BytesIO(tif))
+    if im.mode in ("CMYK", "RGBX"):
+        im = im.convert("RGB")
+    png = io.BytesIO()
+    im.save(png, format="PNG")
+    return png.getvalue()
+
+
+class FormexPackage(Mapping):
+    """Members of a formex zip file. XML members are parsed directly from
+    the zip file, once they are accessed.
     """
 
-    def __init__(self):
-        self.content = b""
+    def __init__(self, zip_file: ZipFile):
+        self.zip_file = zip_file
+        self._parsed = {}
 
-    def write(self, inp: bytes):
-        self.content += inp
+    def __getitem__(self, name):
+        if name not in self._parsed:
+            if not name.endswith(".xml"):
+                raise NotImplementedError(f"No idea how to handle this file: {name}.")
+            with self.zip_file.open(name) as member:
+                self._parsed[name] = et.parse(
+                    member, parser=et.XMLParser(encoding="utf-8")
+                ).getroot()
+        return self._parsed[name]
 
-    def tell(self, value):
-        raise NotImplemented("Why do you even need this method?")
+    def __iter__(self):
+        return iter(self.zip_file.namelist())
 
-    def seek(self):
-        raise NotImplemented("Why do you even need this method?")
+    def __len__(self):
+        return len(self.zip_file.namelist())
+
+    def read(self, name) -> bytes:
+        return self.zip_file.read(name)
 
 
 class BasicFormexLoader(Retriever):
@@ -54,8 +78,7 @@ class BasicFormexLoader(Retriever):
             -H 'Accept: application/zip;mtype=fmx4' \
             -H 'Accept-Language: deu' -L --output 02002F0584-20090328.zip
         """
-        eurlex_request_queue.wait()
-        r = requests.get(
+        r = eurlex_client.get(
             "https://publications.europa.eu/resource/celex/{}".format(self.url),
             headers={
                 "Accept": "application/zip;mtype=fmx4",
@@ -78,6 +101,13 @@ class BasicFormexLoader(Retriever):
 
 
 class FormexLoader(Retriever):
+    # Converted images, addressed by the content of the TIFF file. Images
+    # recur in many versions and languages of the same act.
+    png_cache = FileCache(os.path.join(LEXPATH, "cache", "png"))
+    # Processes converting the TIFF files of a document, at most. 1 means:
+    # converting in the calling process, as the ETL worker processes do.
+    max_conversion_workers = getattr(settings, "TIFF_WORKERS", os.cpu_count())
+
     def __init__(self, local_path, url, language, logger=None):
         self.zipped_formex = BasicFormexLoader(
             local_path, url, language, logger
@@ -85,40 +115,43 @@ class FormexLoader(Retriever):
         super().__init__(local_path, url)
         self.logger = logger or logging.getLogger()
 
-    def extract(self):
-        tmpath = os.path.join(self.local_path, "tmp")
-        os.makedirs(tmpath, exist_ok=True)
+    def convert(self, tifs: Dict[str, bytes]) -> Dict[str, str]:
+        """Converts the given TIFF files to PNG, in parallel.
+        :param tifs: File name -> content of the TIFF file
+        :return: File name -> base64 encoded PNG
+        """
         result = {}
+        missing = {}
+        for name, tif in tifs.items():
+            png = self.png_cache.get(tif)
+            if png is None:
+                missing[name] = tif
+            else:
+                result[name] = img_2_base64("PNG", png)
+        if missing:
+            self.logger.info(f"Converting {', '.join(missing)}")
+        if len(missing) > 1 and self.max_conversion_workers > 1:
+            with ProcessPoolExecutor(
+                min(len(missing), self.max_conversion_workers)
+            ) as executor:
+                pngs = list(executor.map(tif_2_png, missing.values()))
+        else:
+            pngs = [tif_2_png(tif) for tif in missing.values()]
+        for (name, tif), png in zip(missing.items(), pngs):
+            self.png_cache.set(tif, png)
+            result[name] = img_2_base64("PNG", png)
+        return result
+
+    def retrieve(self):
         with ZipFile(os.path.join(self.local_path, "fmx.zip")) as f:
             self.logger.info(
                 'Inflating zip file for "CELEX:{}"\n'.format(self.url)
                 + "File list: {}".format(", ".join(f.namelist()))
             )
-            for name in f.namelist():
-                f.extract(name, tmpath)
-                if name.endswith(".tif"):
-                    im = Image.open(os.path.join(tmpath, name))
-                    self.logger.info(f"Converting {name}")
-                    fc = FileCheater()
-                    if im.mode in ("CMYK", "RGBX"):
-                        im = im.convert("RGB")
-                    im.save(fc, format="PNG")
-                    result[name] = img_2_base64("PNG", fc.content)
-                elif name.endswith(".xml"):
-                    result[name] = et.ElementTree(
-                        file=os.path.join(tmpath, name),
-                        parser=et.XMLParser(encoding="utf-8"),
-                    ).getroot()
-                else:
-                    raise NotImplementedError(
-                        f"No idea how to handle this file: {name}."
-                    )
-        shutil.rmtree(tmpath)
-        return result
+            return self._combine(FormexPackage(f))
 
-    def retrieve(self):
-        zf = self.extract()
-        overview = [value for name, value in zf.items() if name.endswith(".doc.xml")][0]
+    def _combine(self, zf: FormexPackage):
+        overview = zf[[name for name in zf if name.endswith(".doc.xml")][0]]
         main = zf[overview.xpath("//DOC.MAIN.PUB/REF.PHYS/@FILE")[0]]
         annexes = [
             zf[name]
@@ -152,8 +185,11 @@ class FormexLoader(Retriever):
                 "TODO: adapt data-model to set formex status"
             )
         if delivered_tifs:
+            pngs = self.convert(
+                {tif: zf.read(tif) for tif in required_tifs & delivered_tifs}
+            )
             for tif in combined.xpath('//INCL.ELEMENT[@TYPE="TIFF"]'):
-                tif.attrib["FILEREF"] = zf[tif.attrib["FILEREF"]]
+                tif.attrib["FILEREF"] = pngs[tif.attrib["FILEREF"]]
         et.ElementTree(element=combined).write(
             os.path.join(self.local_path, "formex.xml"), encoding="utf-8"
         )
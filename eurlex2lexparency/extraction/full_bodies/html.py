@@ -1,11 +1,13 @@
 import os
+from typing import Dict, Iterable
 from urllib.parse import urljoin, urlparse
 import requests
 from lxml import etree as et
 import logging
 
-from eurlex2lexparency.extraction.generic import Retriever, img_2_base64
-from eurlex2lexparency.utils.generics import retry
+from eurlex2lexparency.extraction.generic import Retriever, img_2_base64, FileCache
+from eurlex2lexparency.utils.eurlex_client import eurlex_client
+from settings import LEXPATH
 
 
 # TODO: Find raw documents that have java-script elements directly embedded.
@@ -13,6 +15,8 @@ from eurlex2lexparency.utils.generics import retry
 #         be stored in a separate js-file.
 #         Actually, the same holds for embedded style-elements.
 class HTMLoader(Retriever):
+    image_cache = FileCache(os.path.join(LEXPATH, "cache", "images"))
+
     def __init__(self, local_path, url, logger=None):
         self.logger = logger or logging.getLogger()
         super().__init__(local_path, url)
@@ -24,32 +28,72 @@ class HTMLoader(Retriever):
         )
         return document.getroot()
 
+    def get_images(self, urls: Iterable[str]) -> Dict[str, bytes]:
+        """Retrieves the images of the given URLs, either from the cache or
+        concurrently from remote (as many at once, as the pool of
+        eurlex_client allows). Images that cannot be retrieved are missing
+        in the result.
+        """
+        result = {}
+        missing = []
+        for url in urls:
+            content = self.image_cache.get(url)
+            if content is None:
+                missing.append(url)
+            else:
+                result[url] = content
+        if missing:
+            self.logger.info(f"Downloading {len(missing)} images.")
+            responses = eurlex_client.get_all(
+                missing, return_exceptions=True, throttled=False, tries=3
+            )
+            for url, response in zip(missing, responses):
+                if not isinstance(response, Exception):
+                    try:
+                        response.raise_for_status()
+                    except requests.exceptions.HTTPError as e:
+                        response = e
+                if isinstance(response, Exception):
+                    self.logger.warning(f"Could not retrieve image {url}: {response}")
+                    continue
+                self.image_cache.set(url, response.content)
+                result[url] = response.content
+        return result
+
     def retrieve(self):
-        sauce = requests.get(self.url).content.replace(b" xmlns=", b" xmlnamespace=")
+        sauce = eurlex_client.get(self.url).content.replace(
+            b" xmlns=", b" xmlnamespace="
+        )
         document = et.fromstring(
             sauce, parser=et.HTMLParser(encoding="utf-8", remove_blank_text=True)
         )
         for element in document.xpath("//*[@xmlnamespace]"):
             element.attrib.pop("xmlnamespace")
 
-        @retry(exceptions=requests.exceptions.ConnectionError, tries=3)
-        def patiently_get(url_):
-            return requests.get(url_).content
-
         for attrib in ("src", "href"):  # Making all url-paths absolute
             for element in document.xpath(f"//*[@{attrib}]"):
                 if element.attrib[attrib].startswith("#"):
                     continue
                 element.attrib[attrib] = urljoin(self.url, element.attrib[attrib])
 
-            for k, resource in enumerate(document.xpath(f"//img[@{attrib}]")):
-                if resource.attrib[attrib].startswith("data:image/jpg;base64"):
-                    continue
-                resource_url = urlparse(resource.attrib[attrib])
-                suffix = resource_url.geturl().split(".")[-1]
-                resource.attrib[attrib] = img_2_base64(
-                    suffix, patiently_get(resource_url.geturl())
-                )
+        resources = [
+            (attrib, resource)
+            for attrib in ("src", "href")
+            for resource in document.xpath(f"//img[@{attrib}]")
+            if not resource.attrib[attrib].startswith("data:image/jpg;base64")
+        ]
+        images = self.get_images(
+            set(
+                urlparse(resource.attrib[attrib]).geturl()
+                for attrib, resource in resources
+            )
+        )
+        for attrib, resource in resources:
+            resource_url = urlparse(resource.attrib[attrib]).geturl()
+            if resource_url not in images:
+                continue  # keeps referring to the remote image
+            suffix = resource_url.split(".")[-1]
+            resource.attrib[attrib] = img_2_base64(suffix, images[resource_url])
         # Store to self.local_path
         os.makedirs(self.local_path, mode=0o770, exist_ok=True)
         et.ElementTree(document).write(
@@ -1,8 +1,8 @@
 import os
-import requests
 import logging
 
 from eurlex2lexparency.extraction.generic import Retriever
+from eurlex2lexparency.utils.eurlex_client import eurlex_client
 from settings import LEXPATH
 from eurlex2lexparency.celex_manager.celex import CelexBase, Version
 from eurlex2lexparency.celex_manager.model import SessionManager, Representation
@@ -23,7 +23,7 @@ class PDFLoader(Retriever):
 
     def retrieve(self):
         os.makedirs(self.local_path, exist_ok=True)
-        pdf = requests.get(self.url).content
+        pdf = eurlex_client.get(self.url).content
         with open(self.local_file, mode="bw") as f:
             f.write(pdf)
 
@@ -0,0 +1,76 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+from zipfile import ZipFile
+
+from PIL import Image
+
+from eurlex2lexparency.extraction.generic import FileCache
+from eurlex2lexparency.extraction.full_bodies import formex
+from eurlex2lexparency.extraction.full_bodies.formex import FormexLoader
+
+OVERVIEW = """<?xml version="1.0" encoding="UTF-8"?>
+<DOC>
+  <DOC.MAIN.PUB><REF.PHYS FILE="act.xml"/></DOC.MAIN.PUB>
+</DOC>"""
+
+MAIN = """<?xml version="1.0" encoding="UTF-8"?>
+<ACT>
+  <P>First <INCL.ELEMENT TYPE="TIFF" FILEREF="a.tif"/></P>
+  <P>Second <INCL.ELEMENT TYPE="TIFF" FILEREF="b.tif"/></P>
+</ACT>"""
+
+
+def tif(color):
+    content = io.BytesIO()
+    Image.new("CMYK", (4, 4), color).save(content, format="TIFF")
+    return content.getvalue()
+
+
+class TestFormexLoader(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.local_path = os.path.join(self.tmp_dir.name, "fmx")
+        os.makedirs(self.local_path)
+        with ZipFile(os.path.join(self.local_path, "fmx.zip"), mode="w") as f:
+            f.writestr("act.doc.xml", OVERVIEW)
+            f.writestr("act.xml", MAIN)
+            f.writestr("a.tif", tif((0, 0, 0, 0)))
+            f.writestr("b.tif", tif((0, 255, 0, 0)))
+            f.writestr("c.tif", b"Not referenced, not converted")
+            f.writestr("unused.xml", "Not referenced, not parsed")
+        self.png_cache = FileCache(os.path.join(self.tmp_dir.name, "png"))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def load(self):
+        with mock.patch.object(FormexLoader, "png_cache", self.png_cache):
+            return FormexLoader(self.local_path, "32099R0001", "EN").retrieve()
+
+    def test_images(self):
+        images = self.load().xpath('//INCL.ELEMENT[@TYPE="TIFF"]/@FILEREF')
+        self.assertEqual(2, len(images))
+        self.assertEqual(2, len(set(images)))
+        for image in images:
+            self.assertTrue(image.startswith("data:image/PNG;base64, "))
+        with mock.patch.object(formex, "tif_2_png") as tif_2_png:
+            self.assertEqual(
+                images, self.load().xpath('//INCL.ELEMENT[@TYPE="TIFF"]/@FILEREF')
+            )
+            tif_2_png.assert_not_called()
+        self.assertEqual(["fmx.zip", "formex.xml"], sorted(os.listdir(self.local_path)))
+
+    def test_in_process(self):
+        with mock.patch.object(
+            FormexLoader, "max_conversion_workers", 1
+        ), mock.patch.object(formex, "ProcessPoolExecutor") as executor:
+            images = self.load().xpath('//INCL.ELEMENT[@TYPE="TIFF"]/@FILEREF')
+        executor.assert_not_called()
+        self.assertEqual(2, len(set(images)))
+
+
+if __name__ == "__main__":
+    unittest.main()
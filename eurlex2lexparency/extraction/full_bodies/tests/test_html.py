@@ -0,0 +1,65 @@
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import requests
+
+from eurlex2lexparency.extraction.generic import FileCache
+from eurlex2lexparency.extraction.full_bodies.html import HTMLoader
+from eurlex2lexparency.utils.eurlex_client import eurlex_client
+
+
+def response(url, status_code=200) -> requests.Response:
+    result = requests.Response()
+    result.url, result.status_code = url, status_code
+    result._content = url.encode("utf-8")
+    return result
+
+
+class TestImageRetrieval(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.loader = HTMLoader(self.tmp_dir.name, "https://eur-lex.europa.eu/")
+        self.loader.image_cache = FileCache(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_cached(self):
+        urls = {f"https://eur-lex.europa.eu/{k}.jpg" for k in range(20)}
+        threads = set()
+
+        def send(method, url, tries, **kwargs):
+            threads.add(threading.get_ident())
+            return response(url)
+
+        with mock.patch.object(eurlex_client, "_send", side_effect=send) as _send:
+            images = self.loader.get_images(urls)
+            self.assertEqual(len(urls), _send.call_count)
+            self.assertEqual(images, self.loader.get_images(urls))
+            self.assertEqual(len(urls), _send.call_count)
+        self.assertNotIn(threading.get_ident(), threads)
+        for url, content in images.items():
+            self.assertEqual(url.encode("utf-8"), content)
+
+    def test_failures(self):
+        urls = {f"https://eur-lex.europa.eu/{k}.jpg" for k in range(5)}
+        missing = "https://eur-lex.europa.eu/0.jpg"
+        unreachable = "https://eur-lex.europa.eu/1.jpg"
+
+        def send(method, url, tries, **kwargs):
+            if url == unreachable:
+                raise requests.exceptions.ConnectionError(url)
+            return response(url, 404 if url == missing else 200)
+
+        with mock.patch.object(eurlex_client, "_send", side_effect=send):
+            with self.assertLogs(self.loader.logger, "WARNING"):
+                images = self.loader.get_images(urls)
+        self.assertEqual(urls - {missing, unreachable}, set(images))
+        self.assertIsNone(self.loader.image_cache.get(missing))
+        self.assertIsNone(self.loader.image_cache.get(unreachable))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
 import base64
+import os
 from abc import ABCMeta, abstractmethod
 from collections.__init__ import namedtuple
 from functools import lru_cache
+from hashlib import sha256
 
 
 class Retriever(metaclass=ABCMeta):
@@ -40,3 +42,38 @@ Formats = namedtuple("Formats", ["html", "pdf"])
 def img_2_base64(suffix, src):
     encoded = base64.b64encode(src)
     return f"data:image/{suffix};base64, " + encoded.decode("ascii")
+
+
+class FileCache:
+    """Binary contents, stored in files named by the hash of their key.
+    Safe to be shared by several processes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    @staticmethod
+    def hash(key) -> str:
+        if type(key) is str:
+            key = key.encode("utf-8")
+        return sha256(key).hexdigest()
+
+    def _file_path(self, key):
+        hashed = self.hash(key)
+        return os.path.join(self.path, hashed[:2], hashed)
+
+    def get(self, key):
+        """:return: The stored content, or None, if not available."""
+        try:
+            with open(self._file_path(key), mode="rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, content: bytes):
+        file_path = self._file_path(key)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp_path = f"{file_path}.{os.getpid()}"
+        with open(tmp_path, mode="wb") as f:
+            f.write(content)
+        os.replace(tmp_path, file_path)
@@ -4,7 +4,8 @@ import os
 from datetime import date
 from urllib import parse
 from urllib.error import URLError
-from functools import reduce, lru_cache
+from functools import partial, reduce, lru_cache
+from multiprocessing.util import Finalize
 
 from rdflib import Graph
 from cachier import cachier
@@ -13,6 +14,7 @@ import logging
 import re
 from lxml.etree import XMLSyntaxError
 from collections import defaultdict
+from typing import Dict
 
 from eurlex2lexparency.celex_manager.celex import CelexBase
 from eurlex2lexparency.extraction.meta_data.handler import (
@@ -22,10 +24,12 @@ from eurlex2lexparency.extraction.meta_data.handler import (
     CORRIGENDUM,
     correct_no,
 )
+import settings
 from settings import LEXPATH
 from eurlex2lexparency.utils.generics import retry
 from eurlex2lexparency.celex_manager.eurlex import country_mapping
 from eurlex2lexparency.utils.sparql_kraken import SparqlKraken, prefixes
+from eurlex2lexparency.utils.sqlite_cache import SqliteCache
 
 from .handler import DocumentMetaData, Anchor, DressedAttribute
 from . import treaties as tmd
@@ -114,10 +118,37 @@ class Resolver:
         return self.mapping.get(uri, None)
 
 
+def _added(counts: dict, stats: dict = None) -> dict:
+    stats = stats or {}
+    return {key: stats.get(key, 0) + value for key, value in counts.items()}
+
+
 class Kraken(SparqlKraken):
+    """Templates filtering by the celex exist in two variants: .1 matches
+    the celex typed as xsd:string, .2 matches it as any literal, which is
+    much slower. The result of .1 is taken, unless it is empty.
+    For each template, the kraken keeps track of how often .1 is empty
+    (persisted in variant_store). For templates where this happens most of
+    the time, it issues both variants as one query (.union), instead of
+    one after the other.
+    The calls are counted in memory and added to the stored statistics
+    every FLUSH_CALLS calls, and at the exit of the process.
+    """
+
+    variant_store = SqliteCache(SparqlKraken.cache.path, table="variants")
+    # Calls of a template, before its statistics are taken into account
+    MIN_CALLS = 20
+    # Share of calls with empty .1 results, from which the union is issued
+    UNION_SHARE = 0.5
+    # Calls of all templates, after which their statistics are stored
+    FLUSH_CALLS = 100
+
     def __init__(self):
         super().__init__()
         self.extendeds = self._extend_templates()
+        self.variant_stats = {}
+        self.unflushed = {}
+        self._pid = None
 
     celex_filter = re.compile(
         r"\?(?P<subject>[a-zA-Z_]+) "
@@ -129,6 +160,10 @@ class Kraken(SparqlKraken):
         "  FILTER( str(?filter_celex) = '{{celex}}' ) ."
     ).format
 
+    projection = re.compile(
+        r"^SELECT (?P<distinct>DISTINCT )?(?P<variables>(\?\w+ ?)+)", flags=re.I
+    )
+
     def _extend_templates(self):
         extendeds = []
         for key, t in list(self.templates.items()):
@@ -142,16 +177,87 @@ class Kraken(SparqlKraken):
             extendeds.append(key)
             self.templates[f"{key}.1"] = t
             self.templates[f"{key}.2"] = new_t
+            self.templates[f"{key}.union"] = self._union(t, new_t)
         return extendeds
 
+    def _union(self, *variants) -> str:
+        """Template of a query, that yields the rows of all variants, each
+        row extended by the number of its variant (?variant).
+        """
+        variables = self.projection.match(variants[0]).group("variables").strip()
+        branches = [
+            self.projection.sub(
+                lambda m: f"{m.group()} ({k} AS ?variant)", variant, count=1
+            )
+            for k, variant in enumerate(variants, 1)
+        ]
+        return (
+            f"SELECT {variables} ?variant\nWHERE {{{{\n{{{{\n"
+            + "\n}}\nUNION\n{{\n".join(branches)
+            + "\n}}\n}}"
+        )
+
+    def stats(self, template) -> dict:
+        """Number of calls of the template and how often .1 was empty."""
+        if template not in self.variant_stats:
+            stats = None
+            if self.variant_store is not None:
+                stats = self.variant_store.get(template)
+            self.variant_stats[template] = stats or {"calls": 0, "empty": 0}
+        return self.variant_stats[template]
+
+    def _record(self, template, empty):
+        if self._pid != os.getpid():
+            # Calls counted before forking are flushed by the parent process.
+            self.unflushed = {}
+            self._pid = os.getpid()
+            # Unlike atexit, also run at the exit of multiprocessing workers.
+            Finalize(self, self.flush_stats, exitpriority=0)
+        for stats in (
+            self.stats(template),
+            self.unflushed.setdefault(template, {"calls": 0, "empty": 0}),
+        ):
+            stats["calls"] += 1
+            stats["empty"] += empty
+        if sum(s["calls"] for s in self.unflushed.values()) >= self.FLUSH_CALLS:
+            self.flush_stats()
+
+    def flush_stats(self):
+        """Adds the calls counted since the last flush to the stored
+        statistics, which also take in those of other processes.
+        """
+        unflushed, self.unflushed = self.unflushed, {}
+        if self.variant_store is None:
+            return
+        for template, counts in unflushed.items():
+            self.variant_stats[template] = self.variant_store.update(
+                template, partial(_added, counts)
+            )
+
+    def prefers_union(self, template) -> bool:
+        stats = self.stats(template)
+        if stats["calls"] < self.MIN_CALLS:
+            return False
+        return stats["empty"] >= self.UNION_SHARE * stats["calls"]
+
+    def _call_extended(self, template, **kwargs) -> list:
+        if self.prefers_union(template):
+            rows = {1: [], 2: []}
+            for *row, variant in super().__call__(f"{template}.union", **kwargs):
+                rows[int(variant)].append(tuple(row))
+            self._record(template, len(rows[1]) == 0)
+            return rows[1] or rows[2]
+        r = super().__call__(f"{template}.1", **kwargs)
+        self._record(template, len(r) == 0)
+        if len(r) > 0:
+            return r
+        return super().__call__(f"{template}.2", **kwargs)
+
     def __call__(self, *args, **kwargs):
         result = []
         for arg in args:
             if arg in self.extendeds:
-                for i in (1, 2):
-                    r = super().__call__(f"{arg}.{i}", **kwargs)
-                    if len(r) > 0:
-                        break
+                r = self._call_extended(arg, **kwargs)
             else:
                 r = super().__call__(arg, **kwargs)
             if arg.startswith("subject_predicate_"):
@@ -272,21 +378,50 @@ class ActMetaData(DocumentMetaData):
                     amd = cls.retrieve(id_local, language)
                 except TimeoutError:
                     amd = cls.from_ELI(id_local, language)
+        amd.save(file_path)
+        return amd
+
+    @classmethod
+    def cached_retrieve_many(
+        cls, file_paths: Dict[str, str], language, batch_size=None
+    ) -> Dict[str, ActMetaData]:
+        """Like cached_retrieve, for several acts at once. The acts that are
+        not stored locally yet are retrieved in batches (see retrieve_many),
+        and stored after each batch.
+        :param file_paths: Path of the head.json per celex
+        :return: Metadata per celex, except for acts without any metadata.
+        """
+        batch_size = batch_size or cls.BATCH_SIZE
+        result = {}
+        missing = []
+        for celex, file_path in file_paths.items():
+            try:
+                with open(file_path, encoding="utf-8") as f:
+                    result[celex] = cls.from_dict(json.load(f))
+            except FileNotFoundError:
+                missing.append(celex)
+        for k in range(0, len(missing), batch_size):
+            batch = missing[k : k + batch_size]
+            try:
+                retrieved = cls.retrieve_many(batch, language, batch_size)
+            except TimeoutError:
+                retrieved = {celex: cls.from_ELI(celex, language) for celex in batch}
+            for celex, amd in retrieved.items():
+                amd.save(file_paths[celex])
+            result.update(retrieved)
+        return result
+
+    def save(self, file_path):
         os.makedirs(file_path.replace("head.json", ""), exist_ok=True)
         with open(file_path, mode="w", encoding="utf-8") as f:
-            json.dump(amd.to_dict(), f, ensure_ascii=False, indent=2, default=default)
-        return amd
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2, default=default)
 
     @classmethod
     @retry(exceptions=(URLError, XMLSyntaxError), tries=3, wait=3)
     def retrieve(cls, celex, language):
-        self = cls(language)
         lang3 = country_mapping.get(two=language)
-        self.source_iri = "http://publications.europa.eu/resource/celex/" + celex
-        self.id_local = celex
-        results = cls.kraken(
-            "act_predicate_object", "subject_predicate_act", celex=celex, lang3=lang3
-        )
+        core = cls.retrieve_core(celex)
+        results = cls._language_results(core, lang3)
         for p in ("title", "is_about"):
             r = cls.kraken(
                 f"act_{p}_lang", celex=celex, language=language.lower(), lang3=lang3
@@ -294,6 +429,21 @@ class ActMetaData(DocumentMetaData):
             results.extend([(p, v) for (v,) in r])
         if not results:
             raise EmptyMetaDataException(f"Empty set for {celex}.")
+        self = cls.from_results(celex, language, results)
+        self.complete(
+            core,
+            TitlesRetriever.retrieve_titles(
+                language, set(map(str, self.referrer_ids())) | cls._cited_works(core)
+            ),
+        )
+        return self
+
+    @classmethod
+    def from_results(cls, celex, language, results) -> ActMetaData:
+        """:param results: Pairs of property and value, as retrieved"""
+        self = cls(language)
+        self.source_iri = "http://publications.europa.eu/resource/celex/" + celex
+        self.id_local = celex
         for property_, value in results:
             if str(property_) == prefixes["owl"] + "sameAs":
                 if value.startswith(cls._eli_resource_trunc_cdm):
@@ -324,20 +474,239 @@ class ActMetaData(DocumentMetaData):
             else:
                 setattr(self, name, value)
         self.set_title_data()
-        self.enhance_referrers()
-        self.retrieve_citations()
-        self.popularize()
         return self
 
-    def retrieve_citations(self):
-        lang3 = country_mapping.get(two=self.language)
-        for predicate, template in [
-            ("cites", "act_cites_title"),
-            ("cited_by", "title_cites_act"),
-        ]:
+    # Language-neutral results per celex, shared by the languages (see
+    # retrieve_core). Set to None, to query them for each language anew.
+    cores = SqliteCache(
+        getattr(
+            settings, "META_CORE_CACHE", os.path.join(LEXPATH, "cache", "cores.db")
+        ),
+        table="cores",
+    )
+
+    @classmethod
+    def _cached_core(cls, celex):
+        if cls.cores is None:
+            return None
+        return cls.cores.get(
+            f"{cls.kraken.ENDPOINT} {celex}",
+            max_age=cls.kraken.ttl("act_predicate_object"),
+        )
+
+    @classmethod
+    def _store_core(cls, celex, core):
+        if cls.cores is None or not (core["properties"] or core["subjects"]):
+            return
+        cls.cores.set(f"{cls.kraken.ENDPOINT} {celex}", core)
+
+    @classmethod
+    def retrieve_core(cls, celex) -> dict:
+        """The results, that are the same for all languages: Properties of the
+        act, acts referring to it (with the languages of the corrigenda)
+        and acts citing or cited by it, as cellar IDs and celex.
+        The titles and labels are retrieved per language.
+        """
+        core = cls._cached_core(celex)
+        if core is None:
+            core = {
+                "properties": cls.kraken("act_predicate_object", celex=celex),
+                "subjects": cls.kraken("subject_predicate_act", celex=celex),
+            }
+            for predicate, template in cls._citation_templates:
+                core[predicate] = cls.kraken(template, celex=celex)
+            cls._store_core(celex, core)
+        return core
+
+    @classmethod
+    def _language_results(cls, core, lang3) -> list:
+        """:return: Pairs of property and value of the core, as they apply to
+        the given language. Corrigenda apply only to their own language.
+        """
+        corrects_by = cls.ontology_pref + "resource_legal_corrects_resource_legal_by"
+        language = prefixes["lang"] + lang3
+        results = list(core["properties"])
+        for p, value, lang in core["subjects"]:
+            if p == corrects_by and str(lang) != language:
+                continue
+            results.append((p, value))
+        return results
+
+    @staticmethod
+    def _cited_works(core) -> set:
+        return {
+            str(work)
+            for predicate in ("cites", "cited_by")
+            for work, _ in core[predicate]
+        }
+
+    def complete(self, core, titles: Dict[str, tuple]):
+        """Adds the language specific data, that is not part of the results.
+        :param titles: Celex and title per cellar ID of the referred acts
+        """
+        self.enhance_referrers(
+            {
+                cellar: Anchor.create(*titles[cellar], self.language)
+                for cellar in map(str, self.referrer_ids())
+                if cellar in titles
+            }
+        )
+        self.retrieve_citations(core, titles)
+        self.popularize()
+
+    # Number of acts covered by a single query of retrieve_many
+    BATCH_SIZE = 50
+    # Number of citations per act and direction, as in act_cites_work
+    CITATION_LIMIT = 1000
+
+    @classmethod
+    def retrieve_many(
+        cls, celexes, language, batch_size=None
+    ) -> Dict[str, ActMetaData]:
+        """Retrieves the same metadata as retrieve, for several acts, with
+        each query covering up to batch_size acts (VALUES-based templates).
+        Acts without results are retrieved one by one, since their celex
+        might not be typed as xsd:string.
+        :return: Metadata per celex, except for acts without any metadata.
+        """
+        batch_size = batch_size or cls.BATCH_SIZE
+        celexes = list(dict.fromkeys(celexes))
+        result = {}
+        for k in range(0, len(celexes), batch_size):
+            result.update(cls._retrieve_batch(celexes[k : k + batch_size], language))
+        return result
+
+    @staticmethod
+    def _values(celexes) -> str:
+        return " ".join(f"'{celex}'^^xsd:string" for celex in celexes)
+
+    @classmethod
+    @retry(exceptions=(URLError, XMLSyntaxError), tries=3, wait=3)
+    def _retrieve_batch(cls, celexes, language) -> Dict[str, ActMetaData]:
+        lang3 = country_mapping.get(two=language)
+        cores = cls.retrieve_cores(celexes, len(celexes))
+        results = {
+            celex: cls._language_results(cores[celex], lang3) for celex in celexes
+        }
+        titled = set()
+        for p in ("title", "is_about"):
+            for celex, v in cls.kraken(
+                f"batch_act_{p}_lang",
+                celexes=cls._values(celexes),
+                language=language.lower(),
+                lang3=lang3,
+            ):
+                results[str(celex)].append((p, v))
+                if p == "title":
+                    titled.add(str(celex))
+        for celex in celexes:
+            if celex in titled or not results[celex]:
+                continue
+            for p in ("title", "is_about"):
+                r = cls.kraken(
+                    f"act_{p}_lang", celex=celex, language=language.lower(), lang3=lang3
+                )
+                results[celex].extend([(p, v) for (v,) in r])
+        metas = {}
+        for celex in celexes:
+            if not results[celex]:
+                cls._logger.warning(f"Empty set for {celex}.")
+                continue
+            metas[celex] = cls.from_results(celex, language, results[celex])
+        cellar_ids = set()
+        for celex, self in metas.items():
+            cellar_ids |= set(map(str, self.referrer_ids()))
+            cellar_ids |= cls._cited_works(cores[celex])
+        titles = TitlesRetriever.retrieve_titles(language, cellar_ids)
+        for celex, self in metas.items():
+            self.complete(cores[celex], titles)
+        return metas
+
+    @classmethod
+    def retrieve_cores(cls, celexes, batch_size=None) -> Dict[str, dict]:
+        """Like retrieve_core, for several acts. Those, whose cores are not
+        stored yet, are queried batch_size acts per query.
+        """
+        batch_size = batch_size or cls.BATCH_SIZE
+        cores = {}
+        missing = []
+        for celex in celexes:
+            core = cls._cached_core(celex)
+            if core is None:
+                missing.append(celex)
+            else:
+                cores[celex] = core
+        for k in range(0, len(missing), batch_size):
+            cores.update(cls._retrieve_batch_cores(missing[k : k + batch_size]))
+        return cores
+
+    @classmethod
+    def _retrieve_batch_cores(cls, celexes) -> Dict[str, dict]:
+        values = cls._values(celexes)
+        cores = {celex: {"properties": [], "subjects": []} for celex in celexes}
+        for celex, p, value in cls.kraken("batch_act_predicate_object", celexes=values):
+            cores[str(celex)]["properties"].append((p, value))
+        for celex, *row in cls.kraken("batch_subject_predicate_act", celexes=values):
+            cores[str(celex)]["subjects"].extend(byify_p([row]))
+        batched = [celex for celex in celexes if cores[celex]["properties"]]
+        citations = cls._retrieve_batch_citations(batched)
+        for celex in celexes:
+            if celex not in batched:
+                cores[celex] = cls.retrieve_core(celex)
+                continue
+            for predicate, template in cls._citation_templates:
+                if predicate in citations[celex]:
+                    cores[celex][predicate] = citations[celex][predicate]
+                else:
+                    cores[celex][predicate] = cls.kraken(template, celex=celex)
+            cls._store_core(celex, cores[celex])
+        return cores
+
+    _citation_templates = (
+        ("cites", "act_cites_work"),
+        ("cited_by", "work_cites_act"),
+    )
+
+    @classmethod
+    def _retrieve_batch_citations(cls, celexes) -> Dict[str, dict]:
+        """:return: Rows (cellar ID, celex) per predicate, per celex.
+        Predicates, whose batched results might have been truncated, are
+        missing.
+        """
+        citations = defaultdict(dict)
+        if not celexes:
+            return citations
+        limit = cls.CITATION_LIMIT * len(celexes)
+        for predicate, template in cls._citation_templates:
+            rows = cls.kraken(
+                f"batch_{template}", celexes=cls._values(celexes), limit=limit
+            )
+            if len(rows) >= limit:
+                continue
+            per_act = defaultdict(list)
+            for act, work, celex in rows:
+                per_act[str(act)].append((work, celex))
+            for act in celexes:
+                citations[act][predicate] = per_act[act][: cls.CITATION_LIMIT]
+        return citations
+
+    def retrieve_citations(self, core: dict = None, titles: dict = None):
+        """Adds the cited and citing acts, that have a title in the language.
+        :param core: As retrieved by retrieve_core
+        :param titles: Celex and title per cellar ID, if already retrieved.
+        """
+        if core is None:
+            core = self.retrieve_core(self.id_local)
+        if titles is None:
+            titles = TitlesRetriever.retrieve_titles(
+                self.language, self._cited_works(core)
+            )
+        for predicate, _ in self._citation_templates:
             attribute = getattr(self, predicate)
-            for celex, title in self.kraken(template, celex=self.id_local, lang3=lang3):
-                attribute.add(Anchor.create(celex, title, self.language))
+            for work, celex in core[predicate]:
+                title = titles.get(str(work), (None, None))[1]
+                if title is not None:
+                    attribute.add(Anchor.create(str(celex), title, self.language))
 
     def add_changers(self):
         """might help for updating purposes."""
@@ -372,15 +741,24 @@ class ActMetaData(DocumentMetaData):
     _CELLAR_TRUNC = "http://publications.europa.eu/resource/cellar/"
     _CELEX_TRUNC = "http://publications.europa.eu/resource/celex/"
 
-    def enhance_referrers(self):
-        combined = reduce(
+    def referrer_ids(self) -> set:
+        """Referred acts, that are not yet converted to Anchors"""
+        return reduce(
             lambda a, b: a | b,
             [
                 set(d for d in getattr(self, r) if type(d) is not Anchor)
                 for r in self._referrers
             ],
         )
-        cellar_2_anchor = TitlesRetriever(self.language, combined).get_anchors()
+
+    def enhance_referrers(self, cellar_2_anchor: Dict[str, Anchor] = None):
+        """:param cellar_2_anchor: Anchors of the referrers, if already
+        retrieved. Otherwise, they are queried.
+        """
+        if cellar_2_anchor is None:
+            cellar_2_anchor = TitlesRetriever(
+                self.language, self.referrer_ids()
+            ).get_anchors()
         for name in self._referrers:
             referrer = getattr(self, name)
             if len(referrer) == 0:
@@ -600,6 +978,8 @@ class ActMetaData(DocumentMetaData):
 class TitlesRetriever:
 
     kraken = kraken
+    # Number of cellar IDs per query, when retrieving for several acts
+    MAX_IDS = 500
 
     def __init__(self, language, cellar_ids):
         self.lang_3 = (
@@ -619,17 +999,31 @@ class TitlesRetriever:
         )
 
     @retry(exceptions=(URLError, XMLSyntaxError, AttributeError), tries=3, wait=3)
-    def get_anchors(self):
+    def get_titles(self) -> Dict[str, tuple]:
+        """:return: Celex and title (or None) per cellar ID"""
         if len(self.cellar_ids) == 0:
             return dict()
-        result = self.kraken.sparql.query(self.query)
+        result = self.kraken.query(self.query, "title_retriever_base")
         return {
-            str(cellar): Anchor.create(
-                id_local.toPython(), to_python(title), self.lang_2
-            )
+            str(cellar): (id_local.toPython(), to_python(title))
             for cellar, id_local, title in result
         }
 
+    def get_anchors(self):
+        return {
+            cellar: Anchor.create(id_local, title, self.lang_2)
+            for cellar, (id_local, title) in self.get_titles().items()
+        }
+
+    @classmethod
+    def retrieve_titles(cls, language, cellar_ids) -> Dict[str, tuple]:
+        """Like get_titles, for any number of cellar IDs, MAX_IDS per query."""
+        cellar_ids = sorted(cellar_ids)
+        titles = {}
+        for k in range(0, len(cellar_ids), cls.MAX_IDS):
+            titles.update(cls(language, cellar_ids[k : k + cls.MAX_IDS]).get_titles())
+        return titles
+
 
 def set_logger(logger: logging.Logger):
     Anchor.logger = logger
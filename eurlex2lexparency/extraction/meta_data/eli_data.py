@@ -4,11 +4,11 @@ from rdflib import Graph, URIRef, Literal
 from rdflib.namespace import RDF
 import re
 from datetime import date
-import requests
 from abc import ABC
 
 from eurlex2lexparency.extraction.meta_data.graph_data import new_graph
 from eurlex2lexparency.utils.sparql_kraken import prefixes
+from eurlex2lexparency.utils.eurlex_client import eurlex_client
 from eurlex2lexparency.extraction.generic import Retriever
 from eurlex2lexparency.utils.xtml import remove
 from eurlex2lexparency.celex_manager.celex import CelexCompound
@@ -42,7 +42,7 @@ class EurLexDocumentLandingPage(UrlConstructor):
     def retrieve(self):
         landing_page = et.ElementTree(
             et.fromstring(
-                requests.get(self.url).text, parser=et.HTMLParser(encoding="utf-8")
+                eurlex_client.get(self.url).text, parser=et.HTMLParser(encoding="utf-8")
             )
         )
         text = landing_page.find('.//div[@id="text"]')
@@ -391,4 +391,4 @@ class DocumentMetaData(metaclass=ABCMeta):
 
 
 def byify_p(results):
-    return [(str(p) + "_by", o) for p, o in results]
+    return [(str(p) + "_by", *rest) for p, *rest in results]
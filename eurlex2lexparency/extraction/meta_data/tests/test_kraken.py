@@ -0,0 +1,84 @@
+import multiprocessing
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from eurlex2lexparency.extraction.meta_data.tests.test_retrieve_many import (
+    ACTS,
+    LocalKraken,
+    cdm_graph,
+)
+from eurlex2lexparency.utils.sqlite_cache import SqliteCache
+
+UNTYPED = "32014L0059"
+
+
+class TestVariants(unittest.TestCase):
+    def setUp(self):
+        self.graph = cdm_graph()
+        self.kraken = LocalKraken(self.graph)
+
+    def test_union_same_as_sequence(self):
+        for template in self.kraken.extendeds:
+            for celex in ACTS:
+                kwargs = dict(celex=celex, lang3="ENG", language="en")
+                sequential = self.kraken(template, **kwargs)
+                with patch.object(self.kraken, "prefers_union", return_value=True):
+                    union = self.kraken(template, **kwargs)
+                self.assertEqual(
+                    sorted(map(repr, sequential)), sorted(map(repr, union))
+                )
+
+    def test_learned_union(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store = SqliteCache(os.path.join(directory.name, "sparql.db"), "variants")
+        with patch.object(LocalKraken, "variant_store", store):
+            kraken = LocalKraken(self.graph)
+            for _ in range(kraken.MIN_CALLS):
+                kraken("act_title_lang", celex=UNTYPED, lang3="ENG")
+                kraken("act_predicate_object", celex="32013R0575")
+            self.assertEqual(
+                ["act_title_lang.1", "act_title_lang.2", "act_predicate_object.1"],
+                kraken.templates_queried[:3],
+            )
+            kraken.templates_queried.clear()
+            self.assertEqual(
+                1, len(kraken("act_title_lang", celex=UNTYPED, lang3="ENG"))
+            )
+            self.assertEqual(["act_title_lang.union"], kraken.templates_queried)
+            kraken.flush_stats()  # as at exit
+            restarted = LocalKraken(self.graph)
+            self.assertTrue(restarted.prefers_union("act_title_lang"))
+            self.assertFalse(restarted.prefers_union("act_predicate_object"))
+
+    def test_stats_of_processes_merged(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store = SqliteCache(os.path.join(directory.name, "sparql.db"), "variants")
+        with patch.object(LocalKraken, "variant_store", store), patch.object(
+            LocalKraken, "FLUSH_CALLS", 10
+        ), patch.object(store, "update", wraps=store.update) as update:
+            krakens = (LocalKraken(self.graph), LocalKraken(self.graph))
+            for _ in range(15):
+                for kraken in krakens:
+                    kraken("act_title_lang", celex=UNTYPED, lang3="ENG")
+            self.assertEqual(2, update.call_count)
+            self.assertEqual({"calls": 20, "empty": 20}, store.get("act_title_lang"))
+            process = multiprocessing.get_context("fork").Process(
+                target=krakens[0],
+                args=("act_title_lang",),
+                kwargs=dict(celex=UNTYPED, lang3="ENG"),
+            )
+            process.start()
+            process.join()
+            self.assertEqual(0, process.exitcode)
+            self.assertEqual({"calls": 21, "empty": 21}, store.get("act_title_lang"))
+            for kraken in krakens:
+                kraken.flush_stats()
+            self.assertEqual({"calls": 31, "empty": 31}, store.get("act_title_lang"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from rdflib import Graph, Literal, Namespace
+from rdflib.namespace import RDF, SKOS, XSD
+
+from eurlex2lexparency.extraction.meta_data.cdm_data import (
+    ActMetaData,
+    Kraken,
+    TitlesRetriever,
+)
+from eurlex2lexparency.extraction.meta_data.title_parsing import TitleParser
+from eurlex2lexparency.utils.sparql_kraken import bind_prefixes, prefixes
+from eurlex2lexparency.utils.sqlite_cache import SqliteCache
+
+CDM = Namespace(prefixes["cdm"])
+CELLAR = Namespace("http://publications.europa.eu/resource/cellar/")
+LANG = Namespace(prefixes["lang"])
+
+ACTS = {
+    "32013R0575": "Regulation (EU) No 575/2013 of the European Parliament and of "
+    "the Council of 26 June 2013 on prudential requirements for credit "
+    "institutions and amending Regulation (EU) No 648/2012",
+    "32012R0648": "Regulation (EU) No 648/2012 of the European Parliament and of "
+    "the Council of 4 July 2012 on OTC derivatives",
+    "32019R0876": "Regulation (EU) 2019/876 of the European Parliament and of "
+    "the Council of 20 May 2019 amending Regulation (EU) No 575/2013",
+    "32014L0059": "Directive 2014/59/EU of the European Parliament and of the "
+    "Council of 15 May 2014 establishing a framework for the recovery",
+}
+
+
+def cdm_graph() -> Graph:
+    """Small excerpt of the CDM graph, with one act whose celex is no typed
+    literal (32014L0059).
+    """
+    graph = bind_prefixes(Graph())
+    for k, (celex, title) in enumerate(ACTS.items()):
+        work = CELLAR[f"work{k}"]
+        datatype = None if celex == "32014L0059" else XSD.string
+        graph.add(
+            (work, CDM.resource_legal_id_celex, Literal(celex, datatype=datatype))
+        )
+        graph.add((work, RDF.type, CDM.regulation))
+        graph.add((work, CDM["resource_legal_in-force"], Literal(True)))
+        graph.add((work, CDM.resource_legal_number_natural_celex, Literal(100 + k)))
+        expression = CELLAR[f"work{k}.ENG"]
+        graph.add((expression, CDM.expression_belongs_to_work, work))
+        graph.add((expression, CDM.expression_uses_language, LANG.ENG))
+        graph.add((expression, CDM.expression_title, Literal(title)))
+        expression = CELLAR[f"work{k}.DEU"]
+        graph.add((expression, CDM.expression_belongs_to_work, work))
+        graph.add((expression, CDM.expression_uses_language, LANG.DEU))
+        graph.add((expression, CDM.expression_title, Literal(f"Verordnung {k}")))
+    work = CELLAR.work0
+    graph.add((work, CDM.resource_legal_amends_resource_legal, CELLAR.work1))
+    graph.add((CELLAR.work2, CDM.resource_legal_amends_resource_legal, work))
+    graph.add((work, CDM.work_cites_work, CELLAR.work3))
+    graph.add((CELLAR.work3, CDM.work_cites_work, CELLAR.work1))
+    graph.add((work, CDM.work_is_about_concept_eurovoc, CELLAR.concept))
+    graph.add((CELLAR.concept, SKOS.prefLabel, Literal("banking", lang="en")))
+    graph.add((CELLAR.concept, SKOS.prefLabel, Literal("Bankwesen", lang="de")))
+    corrigendum = CELLAR.corrigendum
+    graph.add((corrigendum, CDM.resource_legal_corrects_resource_legal, work))
+    graph.add(
+        (
+            corrigendum,
+            CDM.resource_legal_id_celex,
+            Literal("32013R0575R(01)", datatype=XSD.string),
+        )
+    )
+    graph.add((CELLAR["corrigendum.DEU"], CDM.expression_belongs_to_work, corrigendum))
+    graph.add((CELLAR["corrigendum.DEU"], CDM.expression_uses_language, LANG.DEU))
+    return graph
+
+
+class LocalKraken(Kraken):
+    """Queries the graph in memory, instead of the endpoint."""
+
+    bypass_cache = True
+    variant_store = None
+
+    def __init__(self, graph):
+        super().__init__()
+        self.sparql = graph
+        self.templates_queried = []
+
+    def _query(self, query, template) -> list:
+        self.templates_queried.append(template)
+        return [tuple(row) for row in self.sparql.query(query)]
+
+
+def serialized(meta: ActMetaData):
+    return sorted(meta.dumps().split("\n"))
+
+
+class TestRetrieveMany(unittest.TestCase):
+    def setUp(self):
+        self.kraken = LocalKraken(cdm_graph())
+        for cls in (ActMetaData, TitlesRetriever):
+            patcher = patch.object(cls, "kraken", self.kraken)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        patcher = patch.object(
+            ActMetaData,
+            "cores",
+            SqliteCache(os.path.join(directory.name, "cores.db"), table="cores"),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.object(TitleParser, "cache", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_same_as_retrieve(self):
+        celexes = list(ACTS) + ["32099R9999"]  # the latter does not exist
+        with patch.object(ActMetaData, "cores", None):
+            expected = {celex: ActMetaData.retrieve(celex, "EN") for celex in ACTS}
+        queries_one_by_one = len(self.kraken.templates_queried)
+        self.kraken.templates_queried.clear()
+        actual = ActMetaData.retrieve_many(celexes, "EN", batch_size=3)
+        self.assertEqual(set(ACTS), set(actual))
+        for celex in ACTS:
+            self.assertEqual(serialized(expected[celex]), serialized(actual[celex]))
+        self.assertEqual(
+            {"/eu/32012R0648/"}, {a.href for a in actual["32013R0575"].amends}
+        )
+        self.assertEqual(
+            {"/eu/32014L0059/"}, {a.href for a in actual["32013R0575"].cites}
+        )
+        self.assertLess(len(self.kraken.templates_queried), queries_one_by_one)
+
+    def test_truncated_citations(self):
+        with patch.object(ActMetaData, "CITATION_LIMIT", 0):
+            actual = ActMetaData.retrieve_many(["32013R0575"], "EN")
+        self.assertIn("act_cites_work.1", self.kraken.templates_queried)
+        self.assertEqual(1, len(actual["32013R0575"].cites))
+
+    def test_languages_share_core(self):
+        ActMetaData.retrieve_many(list(ACTS), "EN")
+        self.kraken.templates_queried.clear()
+        german = ActMetaData.retrieve_many(list(ACTS), "DE")
+        core_templates = (
+            "act_predicate_object",
+            "subject_predicate_act",
+            "act_cites_work",
+            "work_cites_act",
+        )
+        for template in self.kraken.templates_queried:
+            self.assertFalse(template.split(".")[0].endswith(core_templates))
+        self.kraken.templates_queried.clear()
+        single = ActMetaData.retrieve("32013R0575", "DE")
+        self.assertNotIn("act_predicate_object.1", self.kraken.templates_queried)
+        with patch.object(ActMetaData, "cores", None):
+            expected = ActMetaData.retrieve("32013R0575", "DE")
+        self.assertEqual(serialized(expected), serialized(german["32013R0575"]))
+        self.assertEqual(serialized(expected), serialized(single))
+        self.assertEqual({"Bankwesen"}, expected.is_about)
+        self.assertEqual(1, len(expected.corrected_by))
+        english = ActMetaData.retrieve("32013R0575", "EN")
+        self.assertEqual(0, len(english.corrected_by))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,15 @@
+import os
 import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
 
 from lexref import Reflector
 
-from eurlex2lexparency.extraction.meta_data.title_parsing import TitleParser
+from eurlex2lexparency.extraction.meta_data.title_parsing import (
+    TitleParser,
+    TitleParts,
+)
+from eurlex2lexparency.utils.sqlite_cache import SqliteCache
 from datetime import date
 
 in_2_out_en = [
@@ -171,6 +178,17 @@ in_2_out_es = [
 
 
 class TestTitleParser(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.cache = SqliteCache(os.path.join(self.tmp.name, "titles.db"))
+        patcher = patch.object(TitleParser, "cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.cache.connection.close()
+        self.tmp.cleanup()
+
     def test_parser_en(self):
         Reflector.reset()
         parser = TitleParser("EN")
@@ -183,6 +201,43 @@ class TestTitleParser(unittest.TestCase):
         for title, data in in_2_out_es:
             self.assertEqual(data, parser(title))
 
+    def test_cache(self):
+        title, data = in_2_out_en[0]
+        parser = TitleParser("EN")
+        self.assertEqual(data, parser(title))
+        with patch.object(TitleParser, "parse", return_value={}) as parse:
+            self.assertEqual(data, parser(title))
+            self.assertEqual(data, TitleParser("EN")(title))
+            parse.assert_not_called()
+            TitleParser("DE")(title)  # other language
+            with patch.object(TitleParser, "code_version", "modified"):
+                parser(title)
+        self.assertEqual(2, parse.call_count)
+
+
+class TestTitleParts(unittest.TestCase):
+    def test_get_date(self):
+        for language, text, expected in [
+            ("EN", "of 26 June 2013 on", date(2013, 6, 26)),
+            ("EN", "of 1. MAY 1999 on", date(1999, 5, 1)),
+            ("DE", "vom 3. März 2016 zur", date(2016, 3, 3)),
+            ("ES", "de 13 de junio de 2024 por", date(2024, 6, 13)),
+        ]:
+            title_parts = TitleParts(language)
+            m_date = title_parts.long_date.search(text)
+            self.assertEqual(expected, title_parts.get_date(m_date), text)
+
+    def test_invalid_date(self):
+        title_parts = TitleParts("EN")
+        m_date = title_parts.long_date.search("of 31 February 2013")
+        # passed on to dateparser, which does not make sense of it either
+        self.assertIsNone(title_parts.get_date(m_date))
+        result = TitleParser("EN").parse(
+            "Regulation (EU) No 1/2013 of the Council of 31 February 2013 on fish"
+        )
+        self.assertNotIn("date_document", result)
+        self.assertEqual("On fish", result["title_essence"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,9 +1,17 @@
+import os
 import re
-import dateparser
+from datetime import date
 from functools import lru_cache
+from hashlib import sha256
+from typing import Optional
 
 from lexref import Reflector
 
+import settings
+from settings import LEXPATH
+from eurlex2lexparency.utils.generics import code_fingerprint
+from eurlex2lexparency.utils.sqlite_cache import SqliteCache
+
 title_suffix = ["Text with EEA relevance", "Text von Bedeutung für den EWR"]
 
 
@@ -69,7 +77,26 @@ def align_decision_ref(id_human, title):
     return id_human.replace("Beschluss ", "Entscheidung ")
 
 
+def _code_version() -> str:
+    """Fingerprint of the title parsing: Source of this module and versions
+    of the libraries involved. Parsed titles stored under a different
+    fingerprint are not used.
+    """
+    with open(__file__, encoding="utf-8") as f:
+        return code_fingerprint([f.read()], ("lexref", "dateparser"))
+
+
 class TitleParser:
+    """Parses long titles of acts. The results are cached on disk, shared by
+    all processes and runs, unless cache is set to None.
+    """
+
+    cache = SqliteCache(
+        getattr(settings, "TITLE_CACHE", os.path.join(LEXPATH, "cache", "titles.db")),
+        table="titles",
+    )
+    code_version = _code_version()
+
     def __init__(self, language):
         self.language = language
         self.reflector = Reflector(
@@ -92,14 +119,27 @@ class TitleParser:
             if not r["href"].startswith("#")
         ]
 
-    def __call__(self, long_title):
+    def __call__(self, long_title) -> dict:
+        if self.cache is None:
+            return self.parse(long_title)
+        key = (
+            f"{self.language}:{self.code_version}:"
+            f"{sha256(long_title.encode('utf-8')).hexdigest()}"
+        )
+        result = self.cache.get(key)
+        if result is None:
+            result = self.parse(long_title)
+            self.cache.set(key, result)
+        return result
+
+    def parse(self, long_title) -> dict:
         result = {}
         long_title = re.sub(r"\s", " ", long_title)
         m_date = self.title_part_pattern.long_date.search(long_title)
         if m_date is not None:
-            result["date_document"] = dateparser.parse(
-                m_date.group(), languages=[self.language.lower()]
-            ).date()
+            date_document = self.title_part_pattern.get_date(m_date)
+            if date_document is not None:
+                result["date_document"] = date_document
             title_start = m_date.end() + 1
         else:
             title_start = 0
@@ -194,7 +234,8 @@ class TitleParts:
                 "(,| and )?(repealing|amending) ", flags=re.I
             )
             self.long_date = re.compile(
-                r"[0-9]{{1,2}}\.?\s({0})\s[0-9]{{4}}".format("|".join(months)),
+                r"(?P<day>[0-9]{{1,2}})\.?\s(?P<month>{0})\s"
+                r"(?P<year>[0-9]{{4}})".format("|".join(months)),
                 flags=re.I,
             )
         elif self._language == "ES":
@@ -222,7 +263,8 @@ class TitleParts:
                 "((y )?por (el|la) que se |que )?(modifica|deroga)", flags=re.I
             )
             self.long_date = re.compile(
-                r"[0-9]{{1,2}}\sde\s({0})\sde\s[0-9]{{4}}".format("|".join(months)),
+                r"(?P<day>[0-9]{{1,2}})\sde\s(?P<month>{0})\sde\s"
+                r"(?P<year>[0-9]{{4}})".format("|".join(months)),
                 flags=re.I,
             )
         elif self._language == "DE":
@@ -246,7 +288,8 @@ class TitleParts:
                 "((und)? zur )?((Abä|Ä)nderung|Aufhebung)", flags=re.I
             )
             self.long_date = re.compile(
-                r"[0-9]{{1,2}}\.\s({0})\s(19|20)[0-9]{{2}}".format("|".join(months)),
+                r"(?P<day>[0-9]{{1,2}})\.\s(?P<month>{0})\s"
+                r"(?P<year>(19|20)[0-9]{{2}})".format("|".join(months)),
                 flags=re.I,
             )
         else:
@@ -254,3 +297,24 @@ class TitleParts:
                 "It seems that the time has come "
                 "to implement language {}".format(self._language)
             )
+        self.months = {month.lower(): k for k, month in enumerate(months, 1)}
+
+    def get_date(self, m_date: re.Match) -> Optional[date]:
+        """:param m_date: Match of long_date
+        Falls back to dateparser only if the match is no valid date.
+        :return: None, if dateparser cannot make sense of it either.
+        """
+        try:
+            return date(
+                int(m_date.group("year")),
+                self.months[m_date.group("month").lower()],
+                int(m_date.group("day")),
+            )
+        except (ValueError, KeyError):
+            import dateparser  # expensive import, rarely needed
+
+            parsed = dateparser.parse(
+                m_date.group(), languages=[self._language.lower()]
+            )
+            if parsed is not None:
+                return parsed.date()
@@ -0,0 +1,35 @@
+import unittest
+from datetime import date
+
+from eurlex2lexparency.celex_manager.celex import Version
+from eurlex2lexparency.etl import AbstractAct, PhysicalAct
+
+
+class TestFormexMayAvailable(unittest.TestCase):
+    def setUp(self):
+        self.act = AbstractAct.__new__(AbstractAct)
+        self.act.act = {"publication_date": date(1999, 5, 1)}
+
+    def test_by_dates(self):
+        self.assertFalse(self.act.formex_may_available(Version.create("initial")))
+        self.assertTrue(self.act.formex_may_available(Version.create("20040101")))
+        self.act.act["publication_date"] = date(2004, 1, 1)
+        self.assertTrue(self.act.formex_may_available(Version.create("initial")))
+
+    def test_stored(self):
+        version = Version.create("20200101")
+        self.assertFalse(self.act.formex_may_available(version, False))
+        self.assertTrue(self.act.formex_may_available(Version.create("initial"), True))
+
+    def test_physical_act(self):
+        physical = PhysicalAct.__new__(PhysicalAct)
+        physical.abstract = self.act
+        physical.version = Version.create("initial")
+        physical.representation = {"formex_available": None}
+        self.assertFalse(physical.formex_may_available)
+        physical.representation["formex_available"] = True
+        self.assertTrue(physical.formex_may_available)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import unittest
+from collections import Counter
+from tempfile import TemporaryDirectory
+from time import perf_counter, sleep
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from eurlex2lexparency.celex_manager.celex import Version
+from eurlex2lexparency.etl import PhysicalAct
+from eurlex2lexparency.etl_manager import EtlManager
+
+MAIN_PID = os.getpid()
+FAILING = "32099R9999"
+
+
+def process_act(self, celex, version, language):
+    """Stub of EtlManager.process_act, telling where and how it ran."""
+    if celex == FAILING:
+        raise RuntimeError(f"Stubbed failure of {celex}.")
+    status = "worker" if os.getpid() != MAIN_PID else "main"
+    if PhysicalAct.instrument:
+        status += "-instrumented"
+    return SimpleNamespace(transformation_status=status, uploaded=False)
+
+
+def log_event(event, celex):
+    with open(os.environ["ETL_EVENTS"], "a") as f:
+        f.write(f"{perf_counter()} {event} {celex}\n")
+
+
+def slow_process_act(self, celex, version, language):
+    sleep(0.2)
+    log_event("transformed", celex)
+    return SimpleNamespace(transformation_status="transformed", uploaded=False)
+
+
+def prefetch(self, celex, version, language):
+    log_event("fetched", celex)
+
+
+def slow_prefetch(self, celex, version, language):
+    log_event("fetching", celex)
+    sleep(0.2)
+    log_event("fetched", celex)
+
+
+def read_events(path):
+    with open(path) as f:
+        events = sorted(map(str.split, f), key=lambda e: float(e[0]))
+    return [(event, celex) for _, event, celex in events]
+
+
+class TestEtlManager(unittest.TestCase):
+    celexes = ("32013R0575", "32016R0679", "31995L0046", FAILING)
+
+    def setUp(self):
+        cv = [(celex, Version.create("20200101")) for celex in self.celexes]
+        for name, value in (
+            ("process_act", process_act),
+            ("get_celex_version_list", lambda *args, **kwargs: cv),
+            ("report_instrumentation", lambda *args: None),
+        ):
+            patcher = patch.object(EtlManager, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.etl = EtlManager()
+
+    def test_workers(self):
+        with self.assertLogs("etl", "INFO"):
+            summary = self.etl(None, "EN", workers=2, instrument=True)
+        self.assertEqual(Counter({"worker-instrumented": 3, None: 1}), summary)
+        self.assertFalse(PhysicalAct.instrument)
+
+    def test_sequential(self):
+        self.etl(None, "EN", instrument=True)
+        summary = self.etl(None, "EN")
+        self.assertEqual(Counter({"main": 3, None: 1}), summary)
+
+    def test_prefetching_workers(self):
+        """The prefetching stays its depth ahead of the transformations."""
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "events")
+        cv = [(str(k), Version.create("20200101")) for k in range(12)]
+        with patch.dict(os.environ, {"ETL_EVENTS": path}), patch.object(
+            EtlManager, "process_act", slow_process_act
+        ), patch.object(EtlManager, "prefetch", prefetch), patch.object(
+            EtlManager, "get_celex_version_list", lambda *args, **kwargs: cv
+        ):
+            summary = EtlManager()(None, "EN", workers=2, prefetch=1)
+        self.assertEqual(Counter({"transformed": 12}), summary)
+        events = read_events(path)
+        self.assertEqual(24, len(events))
+        # Not all are fetched, before the first transformation finishes
+        self.assertLess(
+            events.index(("transformed", "0")), events.index(("fetched", "11"))
+        )
+
+    def test_concurrent_fetching(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "events")
+        with patch.dict(os.environ, {"ETL_EVENTS": path}), patch.object(
+            EtlManager, "prefetch", slow_prefetch
+        ):
+            summary = self.etl(None, "EN", prefetch=3)
+        self.assertEqual(Counter({"main": 3, None: 1}), summary)
+        in_flight = []
+        for event, _ in read_events(path):
+            previous = in_flight[-1] if in_flight else 0
+            in_flight.append(previous + (1 if event == "fetching" else -1))
+        self.assertEqual(3, max(in_flight))
+
+
+if __name__ == "__main__":
+    unittest.main()
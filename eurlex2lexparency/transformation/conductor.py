@@ -27,10 +27,7 @@ def get_transformer(element: et.ElementBase, language, logger) -> DocumentTransf
     standardizer = get_standardizer(language, fmt)
     if element.tag == "html":
         if standardizer is not None:
-            element = et.fromstring(
-                standardizer(et.tostring(element, method="html", encoding="unicode")),
-                parser=et.HTMLParser(),
-            )
+            standardizer(element)
         class_freq = xtml.analyze_attrib_frequency(element, "class")
         if "alert alert-warning" in class_freq:
             div = element.xpath('//div[@class="alert alert-warning"]')
@@ -66,34 +63,79 @@ def get_transformer(element: et.ElementBase, language, logger) -> DocumentTransf
         raise NotImplementedError("New transform type found.")
     elif element.tag == "LEXP.COMBINED":
         if standardizer is not None:
-            element = et.fromstring(
-                standardizer(et.tostring(element, encoding="unicode")),
-                parser=et.XMLParser(),
-            )
+            standardizer(element)
         return FormexTransformer(element, language, logger=logger)
     else:
         raise NotImplementedError("New transform type found.")
 
 
-def transform(element: et.ElementBase, language, logger=None) -> DocumentTransformer:
+def transform(
+    element: et.ElementBase, language, logger=None, instrumentation=None
+) -> DocumentTransformer:
+    """
+    :param instrumentation: Optional Instrumentation instance, to record
+        the time spent per phase of the transformation.
+    """
     transformer = get_transformer(element, language, logger or logging.getLogger())
+    if instrumentation is not None:
+        transformer.instrumentation = instrumentation
     transformer.transform()
     return transformer
 
 
+ORDINAL_INDICATOR = {
+    # tag, attributes, and the pattern of the preceding text
+    "html": ("span", {"class": "super"}, re.compile(r"n\Z", flags=re.I)),
+    "fmx": ("HT", {"TYPE": "sup"}, re.compile(r"n.\Z", flags=re.I)),
+}
+
+LEADING_LABEL = re.compile(r"^([0-9]+|[a-z])\)")
+
+
+def replace_ordinal_indicators(element: et.ElementBase, fmt):
+    """n<span class="super">o</span>, n.<HT TYPE="SUP">o</HT>  --> chr(8470)"""
+    tag, attrib, lead_pattern = ORDINAL_INDICATOR[fmt]
+    for indicator in list(element.iter(tag)):
+        if len(indicator) > 0 or (indicator.text or "").lower() != "o":
+            continue
+        if {k: v.lower() for k, v in indicator.attrib.items()} != attrib:
+            continue
+        previous = indicator.getprevious()
+        parent = indicator.getparent()
+        lead = parent.text if previous is None else previous.tail
+        match = lead_pattern.search(lead or "")
+        if match is None:
+            continue
+        lead = lead[: match.start()] + chr(8470) + (indicator.tail or "")
+        if previous is None:
+            parent.text = lead
+        else:
+            previous.tail = lead
+        parent.remove(indicator)
+
+
+def parenthesize_leading_labels(element: et.ElementBase):
+    """Texts directly following a tag: 1) --> (1), a) --> (a)"""
+    for node in element.iter():
+        if isinstance(node.tag, str) and node.text is not None:
+            node.text = LEADING_LABEL.sub(r"(\g<1>)", node.text)
+        if node.tail is not None:
+            node.tail = LEADING_LABEL.sub(r"(\g<1>)", node.tail)
+
+
 def get_standardizer(language, fmt="html"):
+    """:return: Function that standardizes a document (element) in place,
+    or None, if not required for the given language.
+    """
     if language == "ES":
-        n_o = {
-            "html": 'n<span class="super">o</span>',
-            "fmx": 'n.<HT TYPE="SUP">o</HT>',
-        }[fmt]
-
-        def standardizer(in_string):
-            """n°, n<span class="super">o</span>   --> chr(8470)"""
-            result = re.sub(n_o, chr(8470), in_string, flags=re.IGNORECASE)
+
+        def standardizer(element):
+            replace_ordinal_indicators(element, fmt)
             if fmt == "html":
-                result = re.sub(r">([0-9]+|[a-z])\)", r">(\g<1>)", result)
-            return result
+                parenthesize_leading_labels(element)
+                # as if the document had been serialized and parsed again
+                xtml.escape_uri_attributes(element)
+                xtml.close_implicitly(element)
 
     else:
         standardizer = None
@@ -26,18 +26,27 @@ class FormexTransformer(DocumentTransformer):
 
     def transform(self):
         self._raise_if_repealer()
-        self._document_preprocessing()
-        title = self.locate_title()
-        self.skeletorize()
-        self.articles = self._split()
-        # List of et-elements that form the leaves
-        xtml.push(self.articles["PRE"].source, title)
-        self._document_postprocessing()
-        self.definitions = self.reference_definitions()
+        with self.phase("preprocessing"):
+            self._document_preprocessing()
+        with self.phase("locate_title"):
+            title = self.locate_title()
+        with self.phase("skeletorize"):
+            self.skeletorize()
+        with self.phase("split"):
+            self.articles = self._split()
+            # List of et-elements that form the leaves
+            xtml.push(self.articles["PRE"].source, title)
+        with self.phase("postprocessing"):
+            self._document_postprocessing()
+        with self.phase("reference_definitions"):
+            self.definitions = self.reference_definitions()
         self._warn_on_unhandled()
-        self.link()
-        self.embed()
-        self.export()
+        with self.phase("link"):
+            self.link()
+        with self.phase("embed"):
+            self.embed()
+        with self.phase("export"):
+            self.export()
 
     def _document_postprocessing(self):
         self._ht_elements()
@@ -78,19 +87,38 @@ class FormexTransformer(DocumentTransformer):
         """Returns the html-version"""
         self.source.tag = "body"
         self.source.attrib.pop("id")
-        sauce = """<!DOCTYPE html>
-            <html lang="{lang}">
-                <head>
-                    <meta charset="UTF-8">
-                    <title>Transformed document</title>
-                </head>
-                {body}
-            </html>""".format(
-            body=et.tostring(self.source, encoding="unicode", method="html"),
-            lang=self.language.lower(),
+        html = et.fromstring(
+            '<!DOCTYPE html> <html lang="{lang}"> <head> <meta charset="UTF-8"> '
+            "<title>Transformed document</title> </head> <body></body> </html>".format(
+                lang=self.language.lower()
+            ),
+            parser=et.HTMLParser(),
         )
-        sauce = multi_blanks.sub(" ", sauce)
-        self.source = et.fromstring(sauce, parser=et.HTMLParser())
+        body = html.find("body")
+        self.source.tail = body.tail
+        html.replace(body, self.source)
+        self.source = html
+        # Same outcome as serializing to HTML, collapsing the blanks and
+        # parsing, but without copying the entire document.
+        xtml.drop_namespaces(html)
+        body = html.find("body")
+        xtml.escape_uri_attributes(body)
+        for element in body.iter():
+            if element.text is not None:
+                element.text = multi_blanks.sub(" ", element.text)
+            if element.tail is not None:
+                element.tail = multi_blanks.sub(" ", element.tail)
+            if not isinstance(element.tag, str):  # comments
+                continue
+            element.tag = element.tag.lower()
+            attributes = {}
+            for key, value in element.attrib.items():
+                # The HTML parser keeps the first of duplicate attributes.
+                attributes.setdefault(key.lower(), multi_blanks.sub(" ", value))
+            if list(attributes.items()) != element.attrib.items():
+                element.attrib.clear()
+                element.attrib.update(attributes)
+        xtml.close_implicitly(body)
 
     def _ht_elements(self):
         for ht in self.source.xpath(".//HT"):
@@ -277,8 +305,9 @@ class FormexTransformer(DocumentTransformer):
     def reference_definitions(self):
         """Find definitions"""
         terms = TechnicalTerms(self.language)
-        for article in self.articles.values():
-            article.reference_definitions(terms)
+        for article_id, article in self.articles.items():
+            with self.instrumentation.article(article_id, article):
+                article.reference_definitions(terms)
 
     def skeleton(self, fine=True):
         result = xtml.subskeleton(self.source)
@@ -0,0 +1,70 @@
+import os
+import re
+import unittest
+from unittest.mock import Mock, patch
+
+from lxml import etree as et
+
+from eurlex2lexparency.transformation.formex import document
+from eurlex2lexparency.transformation.formex.document import FormexTransformer
+from eurlex2lexparency.transformation.generic.definitions import (
+    TechnicalTerms,
+    add_delimiters,
+)
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "data")
+
+
+def reference_spans(definitions: dict, in_text: str):
+    """Outcome of the alternation of all terms, as a regular expression."""
+    pattern = re.compile("|".join(map(add_delimiters, definitions.keys())))
+    return [m.span() for m in pattern.finditer(in_text)]
+
+
+class CheckedTerms(TechnicalTerms):
+    checks = []
+
+    def locate_technical_terms(self, in_text):
+        expected = reference_spans(self.definitions, in_text)
+        result = super().locate_technical_terms(in_text)
+        self.checks.append(
+            (expected, [(s.span.start, s.span.end) for s in result], in_text)
+        )
+        return result
+
+
+class TestTermMatcher(unittest.TestCase):
+    def test_inflections(self):
+        terms = TechnicalTerms("EN")
+        for term in ("institution", "CRR", "own funds", "a", "B"):
+            terms.definitions[term] = {"title": term}
+            terms.matcher.add(term)
+        text = (
+            "institutions, CRRs, CRR own fundsxyz own funds A a B b "
+            "institutionalxy institution_ institutionsxy"
+        )
+        self.assertEqual(
+            reference_spans(dict(terms.definitions), text),
+            [(a.span.start, a.span.end) for a in terms.locate_technical_terms(text)],
+        )
+        # learned inflection
+        self.assertIn("institutions", terms.definitions)
+        self.assertEqual(
+            reference_spans(dict(terms.definitions), text),
+            [(a.span.start, a.span.end) for a in terms.locate_technical_terms(text)],
+        )
+
+    def test_fixtures(self):
+        for file_name in ("mifid_ii.xml", "visakodex.xml"):
+            CheckedTerms.checks = []
+            source = et.parse(os.path.join(DATA_PATH, file_name)).getroot()
+            with patch.object(document, "TechnicalTerms", CheckedTerms):
+                FormexTransformer(source, language="DE", logger=Mock()).transform()
+            self.assertGreater(len(CheckedTerms.checks), 100)
+            self.assertTrue(any(expected for expected, _, _ in CheckedTerms.checks))
+            for expected, actual, text in CheckedTerms.checks:
+                self.assertEqual(expected, actual, text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import re
+import unittest
+
+from lxml import etree as et
+
+from eurlex2lexparency.transformation.formex.document import FormexTransformer
+
+
+def exported_by_round_trip(source: et.ElementBase, language: str):
+    """The former export: Serializing to HTML, collapsing blanks and parsing."""
+    source.tag = "body"
+    source.attrib.pop("id")
+    sauce = (
+        '<!DOCTYPE html>\n<html lang="{lang}">\n<head>\n<meta charset="UTF-8">\n'
+        "<title>Transformed document</title>\n</head>\n{body}\n</html>".format(
+            body=et.tostring(source, encoding="unicode", method="html"),
+            lang=language.lower(),
+        )
+    )
+    return et.fromstring(re.sub(r"\s+", " ", sauce), parser=et.HTMLParser())
+
+
+class TestExport(unittest.TestCase):
+    source = (
+        '<DIV id="doc" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">\n'
+        '  <P CLASS="lxp-title" Data-Type="a\n  b" class="dropped">Title <B>bold\n'
+        "  </B><P>inner</P>after</P><!-- a  comment -->\n"
+        "  <UL><LI></LI>loose<LI>item<BR>gone</BR></LI></UL>\n"
+        "  <TABLE><TR><TD>cell<TD>next</TD></TD></TR></TABLE>\n"
+        '  <DIV xsi:type="t"><H3>heading<DIV>block</DIV></H3>tail</DIV>\n'
+        '  <IMG SRC="data:image/PNG;base64, iVBO\n  Rw0=" ALT="a  b"/>\n'
+        '  <A HREF=" #note 1" NAME="n 1">note</A><SPAN NAME="n 1">ä</SPAN>\n'
+        "</DIV>"
+    )
+
+    def exported(self) -> et.ElementBase:
+        transformer = FormexTransformer.__new__(FormexTransformer)
+        transformer.source = et.fromstring(self.source)
+        transformer.language = "DE"
+        transformer.export()
+        return transformer.source
+
+    def test_same_as_round_trip(self):
+        expected = exported_by_round_trip(et.fromstring(self.source), "DE")
+        self.assertEqual(
+            et.tostring(expected, encoding="unicode"),
+            et.tostring(self.exported(), encoding="unicode"),
+        )
+
+    def test_attribute_names_lowercased(self):
+        title = self.exported().find("body/p")
+        self.assertEqual({"class": "lxp-title", "data-type": "a b"}, title.attrib)
+
+    def test_uri_attributes_escaped(self):
+        body = self.exported().find("body")
+        self.assertEqual(
+            "data:image/PNG;base64,%20iVBO%20%20%20Rw0=", body.find("img").get("src")
+        )
+        self.assertEqual("a b", body.find("img").get("alt"))
+        self.assertEqual(
+            {"href": "#note%201", "name": "n%201"}, dict(body.find("a").attrib)
+        )
+        self.assertEqual("n 1", body.find("span").get("name"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,6 +23,7 @@ from lexref.structures import Target
 from eurlex2lexparency.utils.xtml import iter_table_columns
 from eurlex2lexparency.utils import xtml
 from ..utils.generics import VirtualMarkup, LATINS_RE
+from ..utils.reflectors import reflectors
 from ..config import PREAMBLE_NAMES
 
 
@@ -82,15 +83,16 @@ class Article:
     def e(self) -> et.ElementBase:
         return self.source
 
+    BLANKS = re.compile(r"\s+")
+
     def _simplify_blanks(self):
         for element in self.source.iterdescendants():
             for text_type in ["text", "tail"]:
-                if getattr(element, text_type) is not None:
-                    setattr(
-                        element,
-                        text_type,
-                        re.sub(r"\s+", " ", getattr(element, text_type)),
-                    )
+                text = getattr(element, text_type)
+                if text is not None:
+                    simplified = self.BLANKS.sub(" ", text)
+                    if simplified != text:
+                        setattr(element, text_type, simplified)
 
     def _finalize(
         self,
@@ -151,28 +153,28 @@ class Article:
 
     def _set_ids(self):
         """Assign IDs to each list item and article"""
-        query = './/li[not(@id) and (not(parent::ul) or @class="definition")]'
+        query = './/li[not(parent::ul) or @class="definition"]'
+        occurrences = Counter()
         for list_item in self.source.xpath(query):
-            list_item.attrib["id"] = "{}-{}".format(
-                self.id,
-                "-".join(
-                    [
-                        data_title_2_sub_id(title)
-                        for title in list_item.xpath("ancestor-or-self::li/@data-title")
-                    ]
-                ),
-            )
-        # Override duplicate IDs
-        query = './/li[@id and (not(parent::ul) or @class="definition")]'
-        counter = Counter(li.attrib["id"] for li in self.source.xpath(query))
-        for id_, count in counter.items():
-            if count == 1:
-                continue
-            for k, dup in enumerate(self.source.xpath(f'//li[@id="{id_}"]')[1:]):
-                dup.attrib["id"] = id_ + "--" + str(k + 1)
-        # Enforce IDs to be ASCII:
-        for li in self.source.xpath(query):
-            li.attrib["id"] = self.NON_ASCII.sub("_z_", li.attrib["id"])
+            if "id" not in list_item.attrib:
+                list_item.attrib["id"] = "{}-{}".format(
+                    self.id,
+                    "-".join(
+                        [
+                            data_title_2_sub_id(title)
+                            for title in list_item.xpath(
+                                "ancestor-or-self::li/@data-title"
+                            )
+                        ]
+                    ),
+                )
+            id_ = list_item.attrib["id"]
+            # Override duplicate IDs
+            if occurrences[id_] > 0:
+                list_item.attrib["id"] = id_ + "--" + str(occurrences[id_])
+            occurrences[id_] += 1
+            # Enforce IDs to be ASCII:
+            list_item.attrib["id"] = self.NON_ASCII.sub("_z_", list_item.attrib["id"])
 
     @property
     def amends(self):
@@ -201,7 +203,7 @@ class Article:
             if amends[0].startswith("/eu/"):
                 document_context = amends[0]
                 container_context = None
-        reflector = Reflector(
+        reflector = reflectors.get(
             self.language,
             "markup",
             container_context=container_context,
@@ -234,7 +236,7 @@ class Article:
                         document_context = ref
                 else:
                     continue
-                reflector = Reflector(
+                reflector = reflectors.get(
                     self.language,
                     "markup",
                     document_context=document_context,
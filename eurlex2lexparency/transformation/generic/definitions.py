@@ -11,7 +11,7 @@ normal_term = re.compile(r"^[/\sa-zA-Z0-9-]{,200}$")
 
 
 def term_validity(term) -> bool:
-    if normal_term.match(term) is None:
+    if normal_term.match(term) is None or term == "":
         return False
     try:
         int(term)
@@ -27,12 +27,105 @@ def term_validity(term) -> bool:
 multi_blank = re.compile(r"\s+")
 
 
+def inflectable(word: str) -> bool:
+    return not (len(word) == 1 or word == word.upper())
+
+
 def add_delimiters(word: str) -> str:
-    if len(word) == 1 or word == word.upper():
+    if not inflectable(word):
         return rf"\b{word}\b"
     return rf"\b{word}[a-z]{{,2}}\b"
 
 
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _at_boundary(text: str, position: int) -> bool:
+    """Same as regex' \\b"""
+    before = position > 0 and _is_word_char(text[position - 1])
+    after = position < len(text) and _is_word_char(text[position])
+    return before != after
+
+
+class TermMatcher:
+    """Locates words within texts, with the same outcome as finditer of the
+    alternation of the words, each wrapped by add_delimiters: Of the words
+    matching at the leftmost position, the earliest added one wins.
+    Words are kept in a trie, that is walked from the word boundaries
+    preceding one of the words' initials. So new words can be added at any
+    time, without recompiling all of them.
+    """
+
+    def __init__(self):
+        self.root = {}
+        self.size = 0
+        self._starts = None
+
+    def add(self, word: str):
+        if word[0] not in self.root:
+            self._starts = None
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {})
+        if None not in node:  # holds priority and inflectability of the word
+            node[None] = (self.size, inflectable(word))
+            self.size += 1
+
+    @property
+    def starts(self):
+        if self._starts is None:
+            initials = "".join(map(re.escape, sorted(self.root)))
+            self._starts = re.compile(rf"\b[{initials}]")
+        return self._starts
+
+    @staticmethod
+    def _end(text: str, word_end: int, inflectable_: bool):
+        if inflectable_:
+            suffix_end = word_end
+            while suffix_end < min(word_end + 2, len(text)):
+                if not ("a" <= text[suffix_end] <= "z"):
+                    break
+                suffix_end += 1
+            for end in range(suffix_end, word_end - 1, -1):
+                if _at_boundary(text, end):
+                    return end
+        elif _at_boundary(text, word_end):
+            return word_end
+        return None
+
+    def match(self, text: str, start: int):
+        """:return: End of the match at position <start>, or None"""
+        best, result = self.size, None
+        node = self.root
+        for position in range(start, len(text)):
+            node = node.get(text[position])
+            if node is None:
+                break
+            priority, inflectable_ = node.get(None, (best, False))
+            if priority >= best:
+                continue
+            end = self._end(text, position + 1, inflectable_)
+            if end is not None:
+                best, result = priority, end
+        return result
+
+    def finditer(self, text: str):
+        """:return: Spans of the non-overlapping matches"""
+        if not self.root:
+            return
+        search = self.starts.search
+        m = search(text)
+        while m is not None:
+            start = m.start()
+            end = self.match(text, start)
+            if end is None:
+                m = search(text, start + 1)
+            else:
+                yield start, end
+                m = search(text, end)
+
+
 _patterns = {
     "EN": {
         "definitions_title": "Definition",
@@ -53,6 +146,7 @@ class TechnicalTerms:
         patterns = _patterns[self.language]
         self.definitions_title = patterns["definitions_title"]
         self.definitions = {}
+        self.matcher = TermMatcher()
 
     def create_attribs(self, term, target):
         return {
@@ -79,16 +173,13 @@ class TechnicalTerms:
             if not term_validity(term):
                 continue
             self.definitions[term] = self.create_attribs(term, def_id)
+            self.matcher.add(term)
             quotation.attrib["class"] = "lxp-definition-term"
             is_def = True
         if not is_def:
             return
         def_element.attrib["class"] = "lxp-definition"
 
-    @property
-    def pattern(self):
-        return re.compile("|".join(map(add_delimiters, self.definitions.keys())))
-
     def get_definition(self, word):
         for cut in range(3):
             key = word if cut == 0 else word[:-cut]
@@ -98,14 +189,15 @@ class TechnicalTerms:
                 continue
             if key != word:
                 self.definitions[word] = result
+                self.matcher.add(word)
             return result
 
     def locate_technical_terms(self, in_text: str) -> List[SpanAttributes]:
-        if len(self.definitions) is None:
+        if len(self.definitions) == 0:
             return []
-        term_stack = []
-        for m in self.pattern.finditer(in_text):
-            term_stack.append(
-                SpanAttributes(Span(*m.span()), self.get_definition(m.group()))
-            )
-        return term_stack
+        # Inflections learned by get_definition only apply to later texts.
+        spans = list(self.matcher.finditer(in_text))
+        return [
+            SpanAttributes(Span(start, end), self.get_definition(in_text[start:end]))
+            for start, end in spans
+        ]
@@ -1,5 +1,5 @@
 import os
-from collections import Counter
+from collections import defaultdict
 from typing import Dict, List
 from lxml import etree as et
 from abc import ABCMeta, abstractmethod
@@ -9,6 +9,7 @@ from string import ascii_lowercase
 from eurlex2lexparency.extraction.meta_data.cdm_data import ActMetaData
 from eurlex2lexparency.transformation.config import FINAL_TITLE
 from eurlex2lexparency.utils import xtml
+from ..utils.instrumentation import no_instrumentation
 from .article import Article
 
 
@@ -57,16 +58,18 @@ class SimpleDocument:
             head.append(meta)
 
     def cleanse(self, domain, id_local):
-        for anchor in self.source.xpath(f'//a[@href="/{domain}/{id_local}/"]'):
+        anchors = xtml.index_by_attribute(self.source, "a", "href")
+        for anchor in anchors.pop(f"/{domain}/{id_local}/", []):
             xtml.unfold(anchor)
-        targets = set(
-            href[1:] for href in self.source.xpath("//a/@href") if href.startswith("#")
-        )
+        # The IDs are collected after the unfolding above, which removes the
+        # IDs of the unfolded anchors.
         ids = set(self.source.xpath("//*/@id"))
-        unfounds = targets - ids
+        unfounds = [
+            href for href in anchors if href.startswith("#") and href[1:] not in ids
+        ]
         self.logger.info(f"There are {len(unfounds)} unfound reference targets.")
         for href in unfounds:
-            for anchor in self.source.xpath(f'//a[@href="#{href}"]'):
+            for anchor in anchors[href]:
                 xtml.unfold(anchor)
 
     def dump(self, target_path):
@@ -82,10 +85,16 @@ class SimpleDocument:
 
 
 class DocumentTransformer(SimpleDocument, metaclass=ABCMeta):
+    # Replaced by an Instrumentation instance, to record the phases.
+    instrumentation = no_instrumentation
+
     @abstractmethod
     def transform(self):
         pass
 
+    def phase(self, name):
+        return self.instrumentation.phase(name, self)
+
     def embed(self):
         """Embedding of the core attributes.
         Note that the order matters. E.g., the definition embedding makes
@@ -93,8 +102,9 @@ class DocumentTransformer(SimpleDocument, metaclass=ABCMeta):
         embedding of the articles.
         """
         # assignment of self.cover.meta.id is done within md.py
-        for article in self.articles.values():
-            article.embed()
+        for article_id, article in self.articles.items():
+            with self.instrumentation.article(article_id, article):
+                article.embed()
         self.make_toc_ids_unique()
         self.make_final()
 
@@ -120,21 +130,22 @@ class DocumentTransformer(SimpleDocument, metaclass=ABCMeta):
         pass
 
     def link(self):
-        for article in self.articles.values():
-            article.link()
+        for article_id, article in self.articles.items():
+            with self.instrumentation.article(article_id, article):
+                article.link()
 
     def make_toc_ids_unique(self):
         for it in ("container", "article"):
-            ids = Counter(self.source.xpath(f'//*[@class="lxp-{it}"]/@id'))
-            for id_, count in ids.items():
-                if count == 1:
+            elements = defaultdict(list)
+            for element in self.source.xpath(f'//*[@class="lxp-{it}" and @id]'):
+                elements[element.attrib["id"]].append(element)
+            for id_, duplicates in elements.items():
+                if len(duplicates) == 1:
                     continue
                 self.logger.warning(
-                    f"Change duplicate id: {id_} " f"(appears {count} times)"
+                    f"Change duplicate id: {id_} " f"(appears {len(duplicates)} times)"
                 )
-                for i, element in enumerate(
-                    self.source.xpath(f'//*[@class="lxp-{it}" and @id="{id_}"]')[1:]
-                ):
+                for i, element in enumerate(duplicates[1:]):
                     element.attrib["id"] = id_ + ascii_lowercase[i]
 
     def make_final(self):
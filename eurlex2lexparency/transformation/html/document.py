@@ -57,14 +57,21 @@ class _Document(DocumentTransformer, metaclass=ABCMeta):
                 d.text = nump.sub(r"(\g<1>)", d.text, count=1)
 
     def transform(self):
-        self.standardize_items()
-        self._document_pre_processing()
-        self.locate_title()
-        self.skeletorize()
-        self.articles = self._split()
-        self.reference_definitions()
-        self.link()
-        self.embed()
+        with self.phase("preprocessing"):
+            self.standardize_items()
+            self._document_pre_processing()
+        with self.phase("locate_title"):
+            self.locate_title()
+        with self.phase("skeletorize"):
+            self.skeletorize()
+        with self.phase("split"):
+            self.articles = self._split()
+        with self.phase("reference_definitions"):
+            self.reference_definitions()
+        with self.phase("link"):
+            self.link()
+        with self.phase("embed"):
+            self.embed()
 
     def _split(self) -> Dict[str, Article]:
         return {
@@ -184,8 +191,9 @@ class _Document(DocumentTransformer, metaclass=ABCMeta):
     def reference_definitions(self):
         """Find definitions"""
         terms = definitions.TechnicalTerms(self.language)
-        for article in self.articles.values():
-            article.reference_definitions(terms)
+        for article_id, article in self.articles.items():
+            with self.instrumentation.article(article_id, article):
+                article.reference_definitions(terms)
 
 
 class _ModernOriginalAct(_Document):
@@ -205,7 +213,8 @@ class _ModernOriginalAct(_Document):
 
     def transform(self):
         super().transform()
-        self._relocate_footnotes()
+        with self.phase("relocate_footnotes"):
+            self._relocate_footnotes()
 
     def locate_title(self):
         # cdm = CoverDataManager(self.language)
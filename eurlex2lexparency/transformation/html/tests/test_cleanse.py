@@ -0,0 +1,60 @@
+import os
+import unittest
+from unittest.mock import Mock
+
+from lxml import etree as et
+
+from eurlex2lexparency.transformation.generic.document import SimpleDocument
+from eurlex2lexparency.utils import xtml
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "data")
+
+
+def reference_cleanse(source, domain, id_local):
+    """Former implementation, querying the anchors per unfound target."""
+    for anchor in source.xpath(f'//a[@href="/{domain}/{id_local}/"]'):
+        xtml.unfold(anchor)
+    targets = set(
+        href[1:] for href in source.xpath("//a/@href") if href.startswith("#")
+    )
+    ids = set(source.xpath("//*/@id"))
+    for href in targets - ids:
+        for anchor in source.xpath(f'//a[@href="#{href}"]'):
+            xtml.unfold(anchor)
+
+
+class TestCleanse(unittest.TestCase):
+    def test_fixtures(self):
+        for file_name in os.listdir(DATA_PATH):
+            if not file_name.endswith("_refined.html"):
+                continue
+            file_path = os.path.join(DATA_PATH, file_name)
+            expected = et.parse(file_path, parser=et.HTMLParser()).getroot()
+            actual = et.parse(file_path, parser=et.HTMLParser()).getroot()
+            # the most frequently cited act plays the role of the document
+            cited = xtml.analyze_attrib_frequency(actual, "href").most_common()
+            id_local = next(
+                (h.split("/")[2] for h, _ in cited if h.startswith("/eu/")), "none"
+            )
+            reference_cleanse(expected, "eu", id_local)
+            SimpleDocument(actual, "EN", logger=Mock()).cleanse("eu", id_local)
+            self.assertEqual(
+                et.tostring(expected, encoding="unicode"),
+                et.tostring(actual, encoding="unicode"),
+                file_name,
+            )
+
+    def test_self_reference_with_id(self):
+        source = et.fromstring(
+            '<html><body><p><a href="/eu/X/" id="a">X</a> <a href="#a">a</a> '
+            '<a href="#b">b</a><a href="#b" id="b">b</a></p></body></html>'
+        )
+        SimpleDocument(source, "EN", logger=Mock()).cleanse("eu", "X")
+        self.assertEqual(
+            '<p>X a <a href="#b">b</a><a href="#b" id="b">b</a></p>',
+            et.tostring(source.find(".//p"), encoding="unicode"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
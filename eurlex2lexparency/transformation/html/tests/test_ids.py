@@ -0,0 +1,43 @@
+import unittest
+from unittest.mock import Mock
+
+from lxml import etree as et
+
+from eurlex2lexparency.transformation import DocumentTransformer
+from eurlex2lexparency.transformation.generic.article import Article
+
+
+class TestIds(unittest.TestCase):
+    def test_list_items(self):
+        items = "".join('<li data-title="(a)">x</li>' for _ in range(300))
+        source = et.fromstring(
+            '<html><body><article id="ART_1"><ol><li id="ANX-a">x</li></ol></article>'
+            f'<article id="ANX"><ol>{items}<li data-title="(ä)">x</li>'
+            '<li data-title="(b)">x<ol><li data-title="(i)">y</li></ol></li></ol>'
+            '<ul><li data-title="(a)">z</li></ul></article></body></html>'
+        )
+        Article(source.find('.//article[@id="ANX"]'), "EN", logger=Mock())._set_ids()
+        ids = source.xpath('//article[@id="ANX"]//li/@id')
+        # the list item of the other article does not interfere
+        self.assertEqual("ANX-a", ids[0])
+        self.assertEqual([f"ANX-a--{k}" for k in range(1, 300)], ids[1:300])
+        self.assertEqual(["ANX-_z_", "ANX-b", "ANX-b-i"], ids[300:])
+        self.assertEqual(["ANX-a"], source.xpath('//article[@id="ART_1"]//li/@id'))
+
+    def test_toc_ids(self):
+        source = et.fromstring(
+            '<html><body><div class="lxp-container" id="toc-X">'
+            '<article class="lxp-article" id="ART_1"/>'
+            '<article class="lxp-article" id="ART_1"/></div>'
+            '<div class="lxp-container" id="toc-X">'
+            '<article class="lxp-article" id="ART_1"/></div></body></html>'
+        )
+        document = Mock(source=source, logger=Mock())
+        DocumentTransformer.make_toc_ids_unique(document)
+        self.assertEqual(["toc-X", "toc-Xa"], source.xpath("//div/@id"))
+        self.assertEqual(["ART_1", "ART_1a", "ART_1b"], source.xpath("//article/@id"))
+        self.assertEqual(2, document.logger.warning.call_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
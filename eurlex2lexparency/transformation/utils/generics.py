@@ -1,7 +1,8 @@
+import inspect
 import re
 from collections import namedtuple
-from functools import partial
-from typing import Tuple
+from functools import lru_cache, partial
+from typing import Tuple, Union
 
 from lexref.structures import StdCoordinate
 from lexref.token_sequences import TokenSequences
@@ -12,66 +13,89 @@ from lexref.model import Value
 
 from lexref.utils import Span
 
+from eurlex2lexparency.utils.generics import code_fingerprint
+
 
 LATINS_RE = re.compile(Value.tag_2_pattern("ES")["LATIN"].pattern.strip("\\b") + "$")
 
 
+# Pairs of opening quotation mark and the pattern replacing the quotation
+# by >>...<<, to be applied one after the other. The bounded repetitions
+# keep the backtracking linear in the length of the text, and the pattern
+# is not evaluated at all, if the text does not contain the opening mark.
+QUOTATION_PATTERNS = tuple(
+    (
+        quote_mark,
+        re.compile(
+            r"(?<![a-z0-9]){0}([^{0}]{{,200}}){0}(?=[\s),.])".format(quote_mark),
+            flags=re.I,
+        ),
+    )
+    for quote_mark in [chr(8231), "'", '"']
+) + tuple(
+    (
+        quote_pair[0],
+        re.compile(
+            r"(?<![a-z0-9]){0}([^{1}]{{,200}}){1}(?=[\s),.])".format(*quote_pair)
+        ),
+    )
+    for quote_pair in [
+        (chr(8216), chr(8217)),
+        (chr(8220), chr(8221)),
+        (chr(8222), chr(8220)),
+    ]
+)
+
+QUOTE_PATTERN = re.compile("(?<![a-z0-9])>>(.{,200}?)<<")
+
+
+def _is_quotation(element: et.ElementBase) -> bool:
+    return element.tag == "span" and element.attrib.get("class") == "lxp-quotation"
+
+
 def markup_quotation_marks(e: et.ElementBase):
-    """
+    """Standardizes the quotation marks of the texts and tails within e and
+    marks up the quotations, in a single traversal.
     :param e: Element whose quotation marks are to be marked up.
     """
-    for element in e.xpath(".//*"):
-        for attrib in ("text", "tail"):
-            if getattr(element, attrib) is not None:
-                setattr(
-                    element,
-                    attrib,
-                    standardize_quotation_marks(getattr(element, attrib)),
-                )
-    quote_pattern = re.compile("(?<![a-z0-9])>>(.{,200}?)<<")
-    for element in e.xpath(".//*"):
+    # The list excludes the spans that are inserted on the way.
+    for element in list(e.iterdescendants(et.Element)):
         for attrib_name in ("text", "tail"):
             text_tail = getattr(element, attrib_name)
             if text_tail is None:
                 continue
+            standardized = standardize_quotation_marks(text_tail)
+            if standardized != text_tail:
+                setattr(element, attrib_name, standardized)
+            if ">>" not in standardized:
+                continue
             # noinspection PyTypeChecker
             VirtualMarkup.add_markups(
                 attrib_name,
-                getattr(element, attrib_name),
+                standardized,
                 element,
-                [OnlySpan(Span(*m.span())) for m in quote_pattern.finditer(text_tail)],
+                [
+                    OnlySpan(Span(*m.span()))
+                    for m in QUOTE_PATTERN.finditer(standardized)
+                ],
                 lambda x: {"class": "lxp-quotation"},
                 tag="span",
             )
-        for sibling in element.itersiblings():
-            if sibling.tag == "span" and sibling.attrib.get("class") == "lxp-quotation":
-                sibling.text = sibling.text.strip("<>")
-        for child in element.iterchildren():
-            if child.tag == "span" and child.attrib.get("class") == "lxp-quotation":
-                child.text = child.text.strip("<>")
+            # The inserted spans directly follow the element, or lead its children
+            inserted = element.itersiblings() if attrib_name == "tail" else element
+            for span in inserted:
+                if not _is_quotation(span):
+                    break
+                span.text = span.text.strip("<>")
 
 
 def standardize_quotation_marks(in_string):
-    for quote_mark in [chr(8231), "'", '"']:
-        # TODO: This functionaly might be better placed within the
-        #  semantics sub-package, since some decisions are language specific
-        #  (not to modify expressions like "an institution's liabilities").
-        in_string = re.sub(
-            r"(?<![a-z0-9]){0}([^{0}]{{,200}}){0}(?=[\s),.])".format(quote_mark),
-            r">>\g<1><<",
-            in_string,
-            flags=re.I,
-        )
-    for quote_pair in [
-        (chr(8216), chr(8217)),
-        (chr(8220), chr(8221)),
-        (chr(8222), chr(8220)),
-    ]:
-        in_string = re.sub(
-            r"(?<![a-z0-9]){0}([^{1}]{{,200}}){1}(?=[\s),.])".format(*quote_pair),
-            r">>\g<1><<",
-            in_string,
-        )
+    # TODO: This functionaly might be better placed within the
+    #  semantics sub-package, since some decisions are language specific
+    #  (not to modify expressions like "an institution's liabilities").
+    for opening_mark, pattern in QUOTATION_PATTERNS:
+        if opening_mark in in_string:
+            in_string = pattern.sub(r">>\g<1><<", in_string)
     return in_string
 
 
@@ -79,11 +103,31 @@ OnlySpan = namedtuple("OnlySpan", ["span"])
 
 
 class HeadingAnalyzer:
+    """Decomposes headings into coordinate, ordinate and title. The outcomes
+    are memoized per language and text by a bounded LRU cache, shared by all
+    instances, and optionally by a persistent store (see persist).
+    """
+
+    store = None
+
     def __init__(self, language):
         self.language = language
         self.TokenSequences = partial(TokenSequences, language)
 
+    @classmethod
+    def persist(cls, store):
+        """:param store: Providing get(key) and set(key, value), such as
+        eurlex2lexparency.utils.sqlite_cache.SqliteCache, or None.
+        """
+        cls.store = store
+
     def __call__(self, in_text: str) -> Tuple[StdCoordinate, str, str]:
+        outcome = _analyze_heading(self.language, in_text)
+        if type(outcome) is str:
+            raise ValueError(outcome)
+        return outcome
+
+    def decompose(self, in_text: str) -> Tuple[StdCoordinate, str, str]:
         if not in_text or in_text.startswith("("):
             raise ValueError(f"Input not decomposable: {in_text}")
         first_second_rest = in_text.split(maxsplit=2)
@@ -114,3 +158,31 @@ class HeadingAnalyzer:
             co_part += f" {rest}"
             rest = None
         return co, co_part, rest or None
+
+
+# Persisted outcomes become invalid with a new version of lexref or of the
+# HeadingAnalyzer.
+HeadingAnalyzer.code_version = code_fingerprint(
+    [inspect.getsource(HeadingAnalyzer)], ("lexref",)
+)
+
+
+@lru_cache(maxsize=20000)
+def _analyze_heading(language, in_text) -> Union[Tuple[StdCoordinate, str, str], str]:
+    """:return: The decomposition of in_text, or the reason why it is not
+    decomposable. The latter is stored, rather than the exception, since
+    re-raising the same instance would accumulate its traceback.
+    """
+    store = HeadingAnalyzer.store
+    key = f"{language}:{in_text}:{HeadingAnalyzer.code_version}"
+    if store is not None:
+        outcome = store.get(key)
+        if outcome is not None:
+            return outcome
+    try:
+        outcome = HeadingAnalyzer(language).decompose(in_text)
+    except ValueError as e:
+        outcome = str(e)
+    if store is not None:
+        store.set(key, outcome)
+    return outcome
@@ -0,0 +1,150 @@
+import json
+import os
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from time import perf_counter, process_time
+from typing import Iterable, List
+
+from .reflectors import reflectors
+
+
+def count_elements(subject) -> int:
+    """Number of elements of the tree of subject.source"""
+    return sum(1 for _ in subject.source.iter())
+
+
+class Instrumentation:
+    """Records wall time, CPU time and element counts per phase of a
+    transformation, and per article within a phase. Phases that request
+    reflectors from the pool also record its hits and misses.
+    """
+
+    file_name = "instrumentation.json"
+
+    def __init__(self, **info):
+        """
+        :param info: Identifies the instrumented transformation, e.g.
+            celex, language and version.
+        """
+        self.info = info
+        self.phases: List[dict] = []
+        self._articles = None
+
+    @staticmethod
+    def _start(name, subject) -> dict:
+        record = {"name": name}
+        if subject is not None:
+            record["elements"] = [count_elements(subject), None]
+        record["reflectors"] = reflectors.counters()
+        record["wall"], record["cpu"] = perf_counter(), process_time()
+        return record
+
+    @staticmethod
+    def _stop(record, subject):
+        record["wall"] = perf_counter() - record["wall"]
+        record["cpu"] = process_time() - record["cpu"]
+        if subject is not None:
+            record["elements"][1] = count_elements(subject)
+        start = record.pop("reflectors")
+        counters = {k: v - start[k] for k, v in reflectors.counters().items()}
+        if any(counters.values()):
+            record["reflectors"] = counters
+
+    @contextmanager
+    def phase(self, name, subject=None):
+        """
+        :param name: of the phase, e.g. "skeletorize"
+        :param subject: Document, whose elements are counted before and
+            after the phase.
+        """
+        record = self._start(name, subject)
+        self._articles = []
+        try:
+            yield record
+        finally:
+            self._stop(record, subject)
+            if self._articles:
+                record["articles"] = self._articles
+            self._articles = None
+            self.phases.append(record)
+
+    @contextmanager
+    def article(self, article_id, subject=None):
+        """Measures the processing of a single article within a phase."""
+        record = self._start(article_id, subject)
+        try:
+            yield record
+        finally:
+            self._stop(record, subject)
+            if self._articles is not None:
+                self._articles.append(record)
+
+    def to_dict(self) -> dict:
+        return {
+            "info": self.info,
+            "wall": sum(phase["wall"] for phase in self.phases),
+            "cpu": sum(phase["cpu"] for phase in self.phases),
+            "phases": self.phases,
+        }
+
+    def dump(self, target_path):
+        """Writes the record next to the transformed document."""
+        with open(os.path.join(target_path, self.file_name), mode="w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, target_path) -> dict:
+        with open(os.path.join(target_path, cls.file_name)) as f:
+            return json.load(f)
+
+    @staticmethod
+    def aggregate(records: Iterable[dict], top=10) -> dict:
+        """Sums the records of several transformations up per phase.
+        :param records: as returned by to_dict
+        :param top: Number of the slowest articles to be listed.
+        """
+        phases = defaultdict(lambda: {"count": 0, "wall": 0.0, "cpu": 0.0})
+        articles = []
+        count = 0
+        for record in records:
+            count += 1
+            for phase in record["phases"]:
+                total = phases[phase["name"]]
+                total["count"] += 1
+                total["wall"] += phase["wall"]
+                total["cpu"] += phase["cpu"]
+                for key, value in phase.get("reflectors", {}).items():
+                    total.setdefault("reflectors", defaultdict(int))[key] += value
+                if phase["wall"] > total.get("max_wall", -1.0):
+                    total["max_wall"] = phase["wall"]
+                    total["slowest"] = record["info"]
+                for article in phase.get("articles", []):
+                    articles.append(
+                        {
+                            "info": record["info"],
+                            "phase": phase["name"],
+                            "article": article["name"],
+                            "wall": article["wall"],
+                        }
+                    )
+        articles.sort(key=lambda a: a["wall"], reverse=True)
+        return {
+            "records": count,
+            "phases": dict(phases),
+            "slowest_articles": articles[:top],
+        }
+
+
+class NoInstrumentation:
+    """Default of the transformers: Records nothing."""
+
+    @staticmethod
+    def phase(name, subject=None):
+        return nullcontext()
+
+    @staticmethod
+    def article(article_id, subject=None):
+        return nullcontext()
+
+
+no_instrumentation = NoInstrumentation()
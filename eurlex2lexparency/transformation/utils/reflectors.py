@@ -0,0 +1,56 @@
+from collections import OrderedDict
+
+from lexref import Reflector
+
+
+def _hashable(value):
+    """Container contexts (lexref.structures.Target) are lists."""
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+class ReflectorPool:
+    """Bounded cache of lexref.Reflector instances, keyed by the arguments
+    of their construction. Evicts the least recently used instance, if the
+    pool is full. Reusing an instance is safe, since its memory of recent
+    references is reset for each element or list it reflects.
+    """
+
+    def __init__(self, size=64):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._reflectors = OrderedDict()
+
+    def get(self, language, mode, **kwargs) -> Reflector:
+        """:param kwargs: as accepted by the constructor of Reflector"""
+        key = (
+            language,
+            mode,
+            tuple(sorted((k, _hashable(v)) for k, v in kwargs.items())),
+        )
+        reflector = self._reflectors.get(key)
+        if reflector is None:
+            self.misses += 1
+            reflector = Reflector(language, mode, **kwargs)
+            self._reflectors[key] = reflector
+            if len(self._reflectors) > self.size:
+                self._reflectors.popitem(last=False)
+        else:
+            self.hits += 1
+            self._reflectors.move_to_end(key)
+            reflector.problematics.clear()
+        return reflector
+
+    def counters(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        self._reflectors.clear()
+
+    def __len__(self):
+        return len(self._reflectors)
+
+
+reflectors = ReflectorPool()
@@ -1,6 +1,11 @@
+import os
 import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
 
+from eurlex2lexparency.transformation.utils import generics
 from eurlex2lexparency.transformation.utils.generics import HeadingAnalyzer
+from eurlex2lexparency.utils.sqlite_cache import SqliteCache
 
 
 class TestHeadingAnalyzer(unittest.TestCase):
@@ -33,5 +38,54 @@ class TestHeadingAnalyzer(unittest.TestCase):
         self.assertRaises(ValueError, lambda: ha("EG-Fusionskontrollverordnung"))
 
 
+class TestHeadingCache(unittest.TestCase):
+    def setUp(self):
+        generics._analyze_heading.cache_clear()
+
+    def tearDown(self):
+        HeadingAnalyzer.persist(None)
+        generics._analyze_heading.cache_clear()
+
+    def test_memoized(self):
+        decompose = HeadingAnalyzer.decompose
+        calls = []
+
+        def counted(analyzer, in_text):
+            calls.append((analyzer.language, in_text))
+            return decompose(analyzer, in_text)
+
+        with patch.object(HeadingAnalyzer, "decompose", counted):
+            for _ in range(3):
+                co, ordinate, _ = HeadingAnalyzer("EN")("Article 1")
+                self.assertEqual(("ART_1", "Article 1"), (co.collated, ordinate))
+                self.assertRaises(ValueError, HeadingAnalyzer("EN"), "Yeah, Whatever")
+                self.assertEqual(
+                    "ART_1", HeadingAnalyzer("DE")("Artikel 1")[0].collated
+                )
+        self.assertEqual(
+            [("EN", "Article 1"), ("EN", "Yeah, Whatever"), ("DE", "Artikel 1")],
+            calls,
+        )
+
+    def test_persisted(self):
+        with TemporaryDirectory() as path:
+            HeadingAnalyzer.persist(SqliteCache(os.path.join(path, "headings.db")))
+            expected = HeadingAnalyzer("EN")("CHAPTER II Definitions")
+            generics._analyze_heading.cache_clear()
+            with patch.object(HeadingAnalyzer, "decompose") as decompose:
+                self.assertEqual(
+                    expected, HeadingAnalyzer("EN")("CHAPTER II Definitions")
+                )
+            decompose.assert_not_called()
+            generics._analyze_heading.cache_clear()
+            with patch.object(HeadingAnalyzer, "code_version", "modified"):
+                with patch.object(
+                    HeadingAnalyzer, "decompose", return_value=expected
+                ) as decompose:
+                    HeadingAnalyzer("EN")("CHAPTER II Definitions")
+            decompose.assert_called_once()
+            HeadingAnalyzer.store.connection.close()
+
+
 if __name__ == "__main__":
     unittest.main()
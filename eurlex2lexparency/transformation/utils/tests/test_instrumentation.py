@@ -0,0 +1,74 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import Mock
+
+from lxml import etree as et
+
+from eurlex2lexparency.transformation.conductor import transform
+from eurlex2lexparency.transformation.utils.instrumentation import Instrumentation
+
+DATA_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    "formex",
+    "tests",
+    "data",
+)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        source = et.parse(os.path.join(DATA_PATH, "document_1.xml")).getroot()
+        self.instrumentation = Instrumentation(celex="32013R0575", language="EN")
+        transform(source, "EN", logger=Mock(), instrumentation=self.instrumentation)
+
+    def test_phases(self):
+        phases = {phase["name"]: phase for phase in self.instrumentation.phases}
+        self.assertEqual(
+            [
+                "preprocessing",
+                "locate_title",
+                "skeletorize",
+                "split",
+                "postprocessing",
+                "reference_definitions",
+                "link",
+                "embed",
+                "export",
+            ],
+            list(phases),
+        )
+        for phase in phases.values():
+            self.assertGreaterEqual(phase["wall"], 0.0)
+            self.assertGreater(phase["elements"][1], 0)
+        self.assertIn("PRE", [a["name"] for a in phases["link"]["articles"]])
+        self.assertIn("articles", phases["reference_definitions"])
+        self.assertNotIn("articles", phases["skeletorize"])
+        reflectors = phases["link"]["reflectors"]
+        self.assertEqual(
+            len(phases["link"]["articles"]), reflectors["hits"] + reflectors["misses"]
+        )
+        self.assertNotIn("reflectors", phases["skeletorize"])
+
+    def test_dump_and_aggregate(self):
+        with TemporaryDirectory() as path:
+            self.instrumentation.dump(path)
+            record = Instrumentation.load(path)
+        self.assertEqual({"celex": "32013R0575", "language": "EN"}, record["info"])
+        aggregate = Instrumentation.aggregate([record, record], top=3)
+        self.assertEqual(2, aggregate["records"])
+        self.assertEqual(2, aggregate["phases"]["link"]["count"])
+        self.assertAlmostEqual(
+            2 * record["wall"],
+            sum(phase["wall"] for phase in aggregate["phases"].values()),
+        )
+        self.assertEqual(3, len(aggregate["slowest_articles"]))
+        link = next(phase for phase in record["phases"] if phase["name"] == "link")
+        self.assertEqual(
+            2 * sum(link["reflectors"].values()),
+            sum(aggregate["phases"]["link"]["reflectors"].values()),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+from time import perf_counter
+
+from lxml import etree as et
+
+from eurlex2lexparency.transformation.utils.generics import markup_quotation_marks
+
+
+class TestQuotationMarks(unittest.TestCase):
+    def test_markup(self):
+        body = et.fromstring(
+            "<body><p>The term ‘thing’ means 'x'. <b>a</b> „y“,"
+            ' "z" and it\'s</p><span>‘no’ markup</span></body>'
+        )
+        markup_quotation_marks(body)
+        self.assertEqual(
+            '<body><p>The term <span class="lxp-quotation">thing</span> means '
+            '<span class="lxp-quotation">x</span>. <b>a</b> '
+            '<span class="lxp-quotation">y</span>, '
+            '<span class="lxp-quotation">z</span> and it\'s</p>'
+            "<span>&gt;&gt;no&lt;&lt; markup</span></body>",
+            et.tostring(body, encoding="unicode"),
+        )
+
+    def test_long_text(self):
+        body = et.Element("body")
+        et.SubElement(body, "p").text = ("‘" + "x" * 150 + " '") * 5000
+        start = perf_counter()
+        markup_quotation_marks(body)
+        self.assertLess(perf_counter() - start, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+
+from lexref.structures import Target
+
+from eurlex2lexparency.transformation.utils.reflectors import ReflectorPool
+
+
+class TestReflectorPool(unittest.TestCase):
+    def test_get(self):
+        pool = ReflectorPool(size=2)
+        first = pool.get("EN", "markup", container_context=Target.create("toc-CHP_1"))
+        self.assertIs(
+            first,
+            pool.get("EN", "markup", container_context=Target.create("toc-CHP_1")),
+        )
+        second = pool.get("EN", "markup", document_context="/eu/32013R0575/")
+        self.assertIsNot(first, second)
+        self.assertEqual({"hits": 1, "misses": 2}, pool.counters())
+        pool.get("EN", "markup", container_context=Target.create("toc-CHP_1"))
+        pool.get("DE", "markup")  # evicts the least recently used, i.e. second
+        self.assertEqual(2, len(pool))
+        self.assertIsNot(
+            second, pool.get("EN", "markup", document_context="/eu/32013R0575/")
+        )
+        self.assertEqual({"hits": 2, "misses": 4}, pool.counters())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from eurlex2lexparency.utils.eurlex_request_lock import eurlex_rate_limiter
+from eurlex2lexparency.utils.generics import retry
+
+
+class EurLexClient:
+    """HTTP client for EUR-Lex and the publications office.
+
+    The requests are sent via a session with pooled connections, complying
+    the (process-wide shared) rate limit. The coroutine variants allow to
+    have many requests in flight, while the limiter releases them exactly at
+    the allowed rate, instead of sending them one at a time.
+    """
+
+    def __init__(self, limiter=eurlex_rate_limiter, pool_size=10):
+        self.limiter = limiter
+        self.pool_size = pool_size
+        self._pid = None
+        self._session = None
+        self._executor = None
+        self._loop = None
+
+    def _connect(self):
+        # Neither the connections nor the threads survive forking.
+        self._pid = os.getpid()
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size, pool_maxsize=self.pool_size
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(self.pool_size)
+        self._loop = None
+
+    @property
+    def session(self) -> requests.Session:
+        if self._pid != os.getpid():
+            self._connect()
+        return self._session
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._pid != os.getpid():
+            self._connect()
+        return self._executor
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop of the blocking get_all, running in a thread of its
+        own. So get_all may also be called from within a running loop.
+        """
+        if self._pid != os.getpid():
+            self._connect()
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        return self._loop
+
+    def _send(self, method, url, tries, **kwargs) -> requests.Response:
+        return retry(requests.exceptions.ConnectionError, tries=tries)(
+            self.session.request
+        )(method, url, **kwargs)
+
+    def request(
+        self, method, url, throttled=True, tries=1, **kwargs
+    ) -> requests.Response:
+        """
+        :param method: HTTP method, e.g. "GET"
+        :param url: URL
+        :param throttled: If False, the request does not count for the rate
+            limit. Meant for static resources, such as images.
+        :param tries: Attempts, in case of connection errors.
+        :param kwargs: passed to requests.Session.request
+        """
+        if throttled:
+            self.limiter.wait()
+        return self._send(method, url, tries, **kwargs)
+
+    def get(self, url, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    async def async_request(
+        self, method, url, throttled=True, tries=1, **kwargs
+    ) -> requests.Response:
+        if throttled:
+            await self.limiter.async_wait(self.executor)
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, partial(self._send, method, url, tries, **kwargs)
+        )
+
+    async def async_get(self, url, **kwargs) -> requests.Response:
+        return await self.async_request("GET", url, **kwargs)
+
+    async def async_get_all(
+        self, urls, return_exceptions=False, **kwargs
+    ) -> List[Union[requests.Response, Exception]]:
+        """Retrieves the given URLs concurrently.
+        :param return_exceptions: If True, a failing request does not fail
+            the others, but its exception is returned instead of a response.
+        :return: Responses in the order of the given URLs.
+        """
+        return await asyncio.gather(
+            *(self.async_get(url, **kwargs) for url in urls),
+            return_exceptions=return_exceptions,
+        )
+
+    def get_all(
+        self, urls, return_exceptions=False, **kwargs
+    ) -> List[Union[requests.Response, Exception]]:
+        """Blocking variant of async_get_all."""
+        return asyncio.run_coroutine_threadsafe(
+            self.async_get_all(urls, return_exceptions, **kwargs), self.loop
+        ).result()
+
+
+eurlex_client = EurLexClient()
@@ -1,7 +1,15 @@
+import asyncio
 import os
-from time import sleep
-from datetime import datetime, timedelta
+import threading
+from contextlib import contextmanager
+from time import sleep, time
 
+try:
+    import fcntl
+except ImportError:  # Windows: The lock is only shared among threads
+    fcntl = None
+
+import settings
 from settings import LEXPATH
 
 
@@ -9,38 +17,67 @@ def wait(duration):  # pass-through for testing
     sleep(duration)
 
 
-class ServiceRequestDoorkeeper:
-    """A self-made shared state for multiprocessing and single threaded"""
+class TokenBucket:
+    """Rate limiter, allowing <rate> requests per second on average and
+    bursts of up to <burst> requests. The bucket's state is kept in a file,
+    guarded by a lock file, so it is shared by all processes.
+
+    Each caller reserves a token and then waits until the token is valid.
+    So the waiting happens outside the lock, and concurrent callers are
+    released exactly at the given rate.
+    """
 
-    def __init__(self, file_path, niceness):
+    def __init__(self, file_path, rate, burst=1):
         self.file_path = file_path
-        self.niceness = niceness
+        self.rate = rate
+        self.burst = burst
+        self._thread_lock = threading.Lock()
 
-    def get(self) -> datetime:
+    @contextmanager
+    def _locked(self):
+        with self._thread_lock, open(self.file_path + ".lock", mode="w") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def get(self):
+        """:return: Number of tokens and the corresponding timestamp"""
         try:
             with open(self.file_path, mode="r") as f:
-                result = datetime.fromtimestamp(float(f.read()))
-        except FileNotFoundError:
-            result = datetime.now()
-            self.set(result)
-        return result
+                tokens, timestamp = f.read().split()
+        except (FileNotFoundError, ValueError):
+            return float(self.burst), time()
+        return float(tokens), float(timestamp)
 
-    def set(self, value: datetime):
+    def set(self, tokens: float, timestamp: float):
         with open(self.file_path, mode="w") as f:
-            f.write(str(value.timestamp()))
+            f.write(f"{tokens} {timestamp}")
+
+    def reserve(self) -> float:
+        """Takes a token from the bucket.
+        :return: Number of seconds until the token is valid.
+        """
+        with self._locked():
+            tokens, timestamp = self.get()
+            now = time()
+            tokens = min(self.burst, tokens + (now - timestamp) * self.rate) - 1
+            self.set(tokens, now)
+        return max(0.0, -tokens / self.rate)
 
     def wait(self):
-        lct = self.get()
-        next_call_time = lct + timedelta(seconds=self.niceness)
-        now = datetime.now()
-        if next_call_time < now:
-            self.set(now)
-            return
-        self.set(next_call_time)
-        wait_time = (next_call_time - now).total_seconds()
-        wait(wait_time)
+        wait(self.reserve())
 
+    async def async_wait(self, executor=None):
+        """:param executor: Runs the reservation, which may block on the lock
+        file, outside the event loop. Default: that of the loop.
+        """
+        loop = asyncio.get_running_loop()
+        await asyncio.sleep(await loop.run_in_executor(executor, self.reserve))
 
-FILE_PATH = os.path.join(LEXPATH, "last_eurlex_call_time")
 
-eurlex_request_queue = ServiceRequestDoorkeeper(FILE_PATH, 1)
+# Limiter shared by all requests to EUR-Lex and the publications office.
+eurlex_rate_limiter = TokenBucket(
+    os.path.join(LEXPATH, "eurlex_token_bucket"),
+    rate=getattr(settings, "EURLEX_REQUEST_RATE", 1),
+    burst=getattr(settings, "EURLEX_REQUEST_BURST", 1),
+)
@@ -5,9 +5,15 @@ import os
 import sys
 from collections import namedtuple
 from datetime import date, timedelta
+from hashlib import sha256
 from logging import handlers
 from time import sleep
 
+try:
+    from importlib.metadata import version
+except ImportError:  # Python 3.7
+    from importlib_metadata import version
+
 
 def retry(exceptions, tries=2, wait=None):
     """Decorator factory creates retry-decorators which repeats the function
@@ -34,6 +40,21 @@ def retry(exceptions, tries=2, wait=None):
     return decorator
 
 
+def code_fingerprint(sources, packages=()) -> str:
+    """Short digest of source code and of the versions of installed packages,
+    e.g. to tell apart outcomes persisted by different versions of the code.
+
+    :param sources: Source code (str)
+    :param packages: Names of the distributions
+    """
+    fingerprint = sha256()
+    for source in sources:
+        fingerprint.update(source.encode("utf-8"))
+    for package in packages:
+        fingerprint.update(version(package).encode("utf-8"))
+    return fingerprint.hexdigest()[:16]
+
+
 def get_fallbacker(logger, default=None, exceptions=RuntimeError):
     """copied from the interface (doq) !!!"""
 
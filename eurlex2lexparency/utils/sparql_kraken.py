@@ -1,13 +1,18 @@
 import os
+from collections import Counter
 from functools import lru_cache
+from hashlib import sha256
 from inspect import getfile
 from logging import getLogger
 from urllib.error import URLError, HTTPError
 from SPARQLWrapper.Wrapper import POST
 from rdflib import ConjunctiveGraph
 
-from eurlex2lexparency.utils.eurlex_request_lock import eurlex_request_queue
+import settings
+from settings import LEXPATH
+from eurlex2lexparency.utils.eurlex_request_lock import eurlex_rate_limiter
 from eurlex2lexparency.utils.generics import retry
+from eurlex2lexparency.utils.sqlite_cache import SqliteCache
 
 OP_ENDPOINT = "https://publications.europa.eu/webapi/rdf/sparql"
 
@@ -49,13 +54,30 @@ class SPARQLGraph(ConjunctiveGraph):
 
 
 class SparqlKraken:
+    """Queries the SPARQL endpoint by the name of a template.
+    The results are cached on disk, for DEFAULT_TTL seconds or as defined per
+    template in TTLS (with 0 meaning not to cache at all). To query the
+    endpoint regardless of the cache, set bypass_cache (SPARQL_CACHE_BYPASS).
+    """
+
     ENDPOINT = OP_ENDPOINT
+    cache = SqliteCache(
+        getattr(settings, "SPARQL_CACHE", os.path.join(LEXPATH, "cache", "sparql.db")),
+        table="results",
+    )
+    DEFAULT_TTL = getattr(settings, "SPARQL_CACHE_TTL", 20 * 3600)
+    TTLS = {
+        "new_resolver_map": 30 * 24 * 3600,
+        "treaty_metadata": 30 * 24 * 3600,
+    }
+    bypass_cache = getattr(settings, "SPARQL_CACHE_BYPASS", False)
 
     def __init__(self, logger=None):
         self.sparql = SPARQLGraph(self.ENDPOINT)
         self.sparql.store.query_method = POST  # query might be too long for GET
         self.logger = logger or getLogger()
         self.templates = {n: t for n, t in self.iter_templates()}
+        self.cache_stats = Counter()
 
     @property
     @lru_cache()
@@ -76,11 +98,37 @@ class SparqlKraken:
                 with open(os.path.join(path, name)) as f:
                     yield name.replace(".sparql", ""), f.read()
 
-    @retry(exceptions=(URLError, HTTPError, TimeoutError), tries=3, wait=5)
+    def ttl(self, template):
+        return self.TTLS.get(template.split(".")[0], self.DEFAULT_TTL)
+
     def __call__(self, template, **kwargs):
+        return self.query(self.queries[template](**kwargs), template)
+
+    def query(self, query, template) -> list:
+        """
+        :param query: Complete query
+        :param template: Name of the template, the query was derived from.
+        :return: Result rows, as tuples of rdflib terms.
+        """
+        ttl = self.ttl(template)
+        if self.bypass_cache or not ttl:
+            return self._query(query, template)
+        key = f"{template}:{sha256(query.encode('utf-8')).hexdigest()}"
+        result = self.cache.get(key, max_age=ttl)
+        if result is not None:
+            self.cache_stats["hits"] += 1
+            self.logger.debug(f"Cached result for {template}.")
+            return result
+        self.cache_stats["misses"] += 1
+        result = self._query(query, template)
+        self.cache.set(key, result)
+        return result
+
+    @retry(exceptions=(URLError, HTTPError, TimeoutError), tries=3, wait=5)
+    def _query(self, query, template) -> list:
         """Added some waiting, to not annoy the Eur-lex service too much"""
-        eurlex_request_queue.wait()
+        eurlex_rate_limiter.wait()
         self.logger.debug(f"Querying {template}.")
-        result = self.sparql.query(self.queries[template](**kwargs))
+        result = [tuple(row) for row in self.sparql.query(query)]
         self.logger.debug(f"Query {template} finished.")
         return result
@@ -0,0 +1,90 @@
+import os
+import pickle
+import sqlite3
+from threading import Lock
+from time import time
+
+
+class SqliteCache:
+    """Picklable values, stored in a SQLite file along with the time of
+    storage. Safe to be shared by several processes and threads.
+    """
+
+    def __init__(self, path, table="cache"):
+        self.path = path
+        self.table = table
+        self._pid = None
+        self._connection = None
+        self._lock = Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():  # connections do not survive forking
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._connection = sqlite3.connect(
+                self.path, timeout=30, check_same_thread=False
+            )
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value BLOB, timestamp REAL)"
+            )
+            self._connection.commit()
+            self._pid = os.getpid()
+        return self._connection
+
+    def get(self, key, max_age=None):
+        """
+        :param key: str
+        :param max_age: Seconds after which stored values are ignored.
+        :return: The stored value, or None, if not available.
+        """
+        with self._lock:
+            row = self.connection.execute(
+                f"SELECT value, timestamp FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, timestamp = row
+        if max_age is not None and time() - timestamp > max_age:
+            return None
+        return pickle.loads(value)
+
+    def set(self, key, value):
+        with self._lock:
+            self.connection.execute(
+                f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?)",
+                (key, pickle.dumps(value), time()),
+            )
+            self.connection.commit()
+
+    def update(self, key, f):
+        """Replaces the stored value by f(value) within one transaction, so
+        that no concurrent update gets lost.
+
+        :param key: str
+        :param f: Maps the stored value, or None, if not available, to the
+            value to be stored.
+        :return: The value stored.
+        """
+        with self._lock:
+            connection = self.connection
+            connection.execute("BEGIN IMMEDIATE")  # locks out other writers
+            try:
+                row = connection.execute(
+                    f"SELECT value FROM {self.table} WHERE key = ?", (key,)
+                ).fetchone()
+                value = f(None if row is None else pickle.loads(row[0]))
+                connection.execute(
+                    f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?)",
+                    (key, pickle.dumps(value), time()),
+                )
+            except BaseException:
+                connection.rollback()
+                raise
+            connection.commit()
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self.connection.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self.connection.commit()
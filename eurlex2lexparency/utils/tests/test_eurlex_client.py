@@ -0,0 +1,43 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from eurlex2lexparency.utils.eurlex_client import EurLexClient
+from eurlex2lexparency.utils.eurlex_request_lock import TokenBucket
+
+
+def send(method, url, tries, **kwargs):
+    return SimpleNamespace(content=url.encode())
+
+
+class TestEurLexClient(unittest.TestCase):
+    urls = [f"https://eur-lex.europa.eu/{k}.png" for k in range(5)]
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        limiter = TokenBucket(os.path.join(tmp_dir.name, "bucket"), rate=1000)
+        self.client = EurLexClient(limiter)
+        patcher = mock.patch.object(self.client, "_send", side_effect=send)
+        self._send = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_all(self):
+        responses = self.client.get_all(self.urls)
+        self.assertEqual(
+            [url.encode() for url in self.urls], [r.content for r in responses]
+        )
+
+    def test_get_all_within_running_loop(self):
+        async def main():
+            return self.client.get_all(self.urls, throttled=False)
+
+        self.assertEqual(5, len(asyncio.run(main())))
+        self.assertEqual(5, self._send.call_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,31 +1,61 @@
+import asyncio
 import os
+import tempfile
+import threading
 import unittest
-from math import ceil
 from unittest import mock
 
-from eurlex2lexparency.utils.eurlex_request_lock import eurlex_request_queue
+from eurlex2lexparency.utils.eurlex_request_lock import TokenBucket
 
 
-class TestRequestLock(unittest.TestCase):
+class TestTokenBucket(unittest.TestCase):
     def setUp(self) -> None:
-        try:
-            os.remove(eurlex_request_queue.file_path)
-        except FileNotFoundError:
-            pass
-
-    def test(self):
-        lct_init = eurlex_request_queue.get()
-        with mock.patch("eurlex2lexparency.utils.eurlex_request_lock.wait") as _:
-            # mock is just to avoid actual waiting
-            eurlex_request_queue.wait()
-            eurlex_request_queue.wait()
-            eurlex_request_queue.wait()
-            eurlex_request_queue.wait()
-        lct_final = eurlex_request_queue.get()
-        self.assertEqual(
-            4 * eurlex_request_queue.niceness,
-            ceil((lct_final - lct_init).total_seconds()),
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.tmp_dir.name, "bucket")
+        # The clock stands still, so the waits do not depend on the machine.
+        patcher = mock.patch(
+            "eurlex2lexparency.utils.eurlex_request_lock.time", return_value=1e9
         )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_rate(self):
+        bucket = TokenBucket(self.file_path, rate=2)
+        waits = [bucket.reserve() for _ in range(4)]
+        for expected, actual in zip([0, 0.5, 1, 1.5], waits):
+            self.assertAlmostEqual(expected, actual, places=2)
+
+    def test_burst(self):
+        bucket = TokenBucket(self.file_path, rate=1, burst=3)
+        waits = [bucket.reserve() for _ in range(5)]
+        for expected, actual in zip([0, 0, 0, 1, 2], waits):
+            self.assertAlmostEqual(expected, actual, places=2)
+
+    def test_shared_state(self):
+        TokenBucket(self.file_path, rate=1).reserve()
+        self.assertAlmostEqual(
+            1, TokenBucket(self.file_path, rate=1).reserve(), places=2
+        )
+
+    def test_async_wait_off_the_loop(self):
+        bucket = TokenBucket(self.file_path, rate=1)
+        reserve = bucket.reserve
+        threads = []
+
+        def reserving():
+            threads.append(threading.get_ident())
+            return reserve()
+
+        async def main():
+            with mock.patch.object(bucket, "reserve", reserving):
+                await bucket.async_wait()
+            return threading.get_ident()
+
+        self.assertNotIn(asyncio.run(main()), threads)
+        self.assertEqual(1, len(threads))
 
 
 if __name__ == "__main__":
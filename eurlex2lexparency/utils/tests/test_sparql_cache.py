@@ -0,0 +1,62 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+from rdflib import Literal, URIRef
+
+from eurlex2lexparency.utils.sparql_kraken import SparqlKraken
+from eurlex2lexparency.utils.sqlite_cache import SqliteCache
+
+
+class Endpoint:
+    def __init__(self):
+        self.queries = []
+
+    def query(self, query):
+        self.queries.append(query)
+        return [(URIRef("http://celex/" + query), Literal(len(self.queries)))]
+
+
+class TestSparqlCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.kraken = type(
+            "Kraken",
+            (SparqlKraken,),
+            {
+                "cache": SqliteCache(os.path.join(self.tmp.name, "sparql.db")),
+                "TTLS": {"volatile": 0},
+            },
+        )()
+        self.kraken.sparql = Endpoint()
+        self.kraken.templates.update(
+            {"stable": "stable {celex}", "volatile": "volatile {celex}"}
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hits(self):
+        first = self.kraken("stable", celex="32013R0575")
+        self.assertEqual(first, self.kraken("stable", celex="32013R0575"))
+        self.assertEqual(1, first[0][1].toPython())
+        self.assertEqual(1, len(self.kraken.sparql.queries))
+        self.kraken("stable", celex="32016R0679")
+        self.assertEqual({"hits": 1, "misses": 2}, self.kraken.cache_stats)
+
+    def test_ttl(self):
+        self.kraken("volatile", celex="32013R0575")
+        self.kraken("volatile", celex="32013R0575")
+        self.assertEqual(2, len(self.kraken.sparql.queries))
+        self.assertEqual(0, sum(self.kraken.cache_stats.values()))
+
+    def test_bypass(self):
+        self.kraken("stable", celex="32013R0575")
+        self.kraken.bypass_cache = True
+        result = self.kraken("stable", celex="32013R0575")
+        self.assertEqual(2, result[0][1].toPython())
+        self.assertEqual(2, len(self.kraken.sparql.queries))
+
+
+if __name__ == "__main__":
+    unittest.main()
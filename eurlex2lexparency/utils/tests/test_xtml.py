@@ -1,7 +1,18 @@
+import logging
+
 from lxml import etree as et
 import unittest
 
-from eurlex2lexparency.utils.xtml import concatenate_siblings
+from eurlex2lexparency.utils.xtml import (
+    IMPLICITLY_CLOSED_BY,
+    VOID_ELEMENTS,
+    close_implicitly,
+    concatenate_siblings,
+    drop_namespaces,
+    escape_uri_attributes,
+    index_by_attribute,
+    rollback_on,
+)
 
 
 class TextXtmlUtils(unittest.TestCase):
@@ -19,6 +30,98 @@ class TextXtmlUtils(unittest.TestCase):
         concatenate_siblings(inp, "p", **{"class": "norm"})
         self.assertEqual(et.tostring(inp), et.tostring(output))
 
+    def test_index_by_attribute(self):
+        inp = et.fromstring(
+            '<html><body><a href="#1">a</a><p><a href="#2">b</a><a href="#1">c</a>'
+            "<a>d</a></p></body></html>"
+        )
+        index = index_by_attribute(inp.find(".//p"), "a", "href")
+        self.assertEqual({"#1", "#2"}, set(index))
+        self.assertEqual(["a", "c"], [a.text for a in index["#1"]])
+
+    def test_close_implicitly(self):
+        inp = et.fromstring(
+            "<html><body><p>a<ol><li>b</li></ol>c<div>d</div></p>e"
+            "<h3>f<p>g</p>h</h3><ul><li></li>i<li>j</li></ul>"
+            "<p>k<br>l</br>m</p></body></html>"
+        )
+        reparsed = et.fromstring(
+            et.tostring(inp, method="html", encoding="unicode"),
+            parser=et.HTMLParser(),
+        )
+        close_implicitly(inp)
+        self.assertEqual(
+            et.tostring(reparsed, encoding="unicode"),
+            et.tostring(inp, encoding="unicode"),
+        )
+
+    def test_close_implicitly_pairwise(self):
+        """Guards IMPLICITLY_CLOSED_BY against drifting from libxml2."""
+        tags = (
+            set(IMPLICITLY_CLOSED_BY)
+            | set().union(*IMPLICITLY_CLOSED_BY.values())
+            | VOID_ELEMENTS
+        )
+        tags |= {"div", "span", "table", "sup", "sub", "em", "strong", "label"}
+        tags |= {"select", "optgroup", "object", "blockquote", "q", "code"}
+        # Document level and raw text elements do not occur within the body.
+        tags -= {"html", "head", "body", "title", "script", "style", "textarea"}
+        for parent in sorted(tags):
+            for child in sorted(tags):
+                inp = et.fromstring(
+                    f"<html><body><div><{parent}>a<{child}>b</{child}>c"
+                    f"<span>d</span></{parent}>e</div></body></html>"
+                )
+                reparsed = et.fromstring(
+                    et.tostring(inp, method="html", encoding="unicode"),
+                    parser=et.HTMLParser(),
+                )
+                close_implicitly(inp)
+                self.assertEqual(
+                    et.tostring(reparsed, encoding="unicode"),
+                    et.tostring(inp, encoding="unicode"),
+                    msg=f"{child} within {parent}",
+                )
+
+    def test_drop_namespaces(self):
+        inp = et.fromstring(
+            '<body><div xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+            'xsi:type="t">a<p>b</p></div>c</body>'
+        )
+        drop_namespaces(inp)
+        div = inp.find("div")
+        self.assertEqual({}, div.nsmap)
+        self.assertEqual("t", div.get("xsi:type"))
+        self.assertEqual(("a", "c", "b"), (div.text, div.tail, div.find("p").text))
+
+    def test_escape_uri_attributes(self):
+        inp = et.fromstring(
+            '<html><body><a href=" #a b" name="x y">a</a><img src="ä ö"/>'
+            '<form action="?q=a&amp;b c"/><p name="x y" title="x y">'
+            '<a href="javascript:f(1, 2)">b</a></p></body></html>'
+        )
+        reparsed = et.fromstring(
+            et.tostring(inp, method="html", encoding="unicode"),
+            parser=et.HTMLParser(),
+        )
+        escape_uri_attributes(inp)
+        self.assertEqual(
+            et.tostring(reparsed, encoding="unicode"),
+            et.tostring(inp, encoding="unicode"),
+        )
+
+    def test_rollback_on(self):
+        def fail(e):
+            e.attrib.pop("id")
+            e.text = "changed"
+            e.remove(e[0])
+            raise ValueError
+
+        inp = et.fromstring('<div><p id="1">a<b>b</b>c<i>i</i></p>tail</div>')
+        expected = et.tostring(inp, encoding="unicode")
+        rollback_on(ValueError, logging.getLogger())(fail)(inp.find("p"))
+        self.assertEqual(expected, et.tostring(inp, encoding="unicode"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,9 +1,10 @@
 import logging
+from copy import deepcopy
 from functools import wraps
 
 from lxml import etree as et
 import collections
-from typing import List, Iterator
+from typing import Dict, List, Iterator
 
 
 def is_negligible(in_text):
@@ -116,6 +117,19 @@ def analyze_attrib_frequency(in_element, attribute):
     return collections.Counter(in_element.xpath("//@{}".format(attribute)))
 
 
+def index_by_attribute(in_element, tag, attribute) -> Dict[str, List[et.ElementBase]]:
+    """Groups the elements of the given tag in the document of in_element by
+    the value of the given attribute, in document order. Collected in a
+    single pass, as opposed to one XPath query per value.
+    """
+    index = collections.defaultdict(list)
+    for element in in_element.getroottree().iter(tag):
+        value = element.get(attribute)
+        if value is not None:
+            index[value].append(element)
+    return index
+
+
 def reunite(body, element_tag="p", class_list="doc-ti"):
     """Merges all adjacent elements that are of the same css-class"""
     if type(class_list) is str:
@@ -223,6 +237,180 @@ def iter_table_columns(table: et.ElementBase) -> Iterator[List[et.ElementBase]]:
             break
 
 
+# Start tags (values) that implicitly close the current element (key) when
+# parsed by the HTML parser of libxml2. test_xtml checks them against the
+# installed libxml2.
+CELL_CLOSERS = {"td", "th"}
+TABLE_SECTIONS = {"tbody", "tfoot"}
+IMPLICITLY_CLOSED_BY = {
+    "a": {"a", "fieldset", "table"} | CELL_CLOSERS,
+    "address": {"dd", "dl", "dt", "form", "li", "ul"},
+    "b": {"center", "p"} | CELL_CLOSERS,
+    "big": {"p"},
+    "caption": {"col", "colgroup", "thead", "tr"} | TABLE_SECTIONS,
+    "colgroup": {"colgroup", "thead", "tr"} | TABLE_SECTIONS,
+    "dd": {"dt"},
+    "dir": {"dd", "dl", "dt", "form", "ul"},
+    "dl": {"form", "li"},
+    "dt": {"dd", "dl"},
+    "font": {"center"} | CELL_CLOSERS,
+    "form": {"form"},
+    **{f"h{k}": {"fieldset", "form", "li", "p", "table"} for k in range(1, 7)},
+    "i": {"center", "p"} | CELL_CLOSERS,
+    "legend": {"fieldset"},
+    "li": {"li"},
+    "menu": {"dd", "dl", "dt", "form", "ul"},
+    "ol": {"form"},
+    "option": {"optgroup", "option"},
+    "p": {
+        "address",
+        "blockquote",
+        "caption",
+        "center",
+        "col",
+        "colgroup",
+        "dd",
+        "dir",
+        "div",
+        "dl",
+        "dt",
+        "fieldset",
+        "form",
+        "frameset",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "hr",
+        "li",
+        "menu",
+        "ol",
+        "p",
+        "pre",
+        "table",
+        "tr",
+        "ul",
+    }
+    | CELL_CLOSERS
+    | TABLE_SECTIONS,
+    "pre": {"dd", "dl", "dt", "fieldset", "form", "li", "table", "ul"},
+    "s": {"p"},
+    "small": {"p"},
+    "span": CELL_CLOSERS,
+    "strike": {"p"},
+    "tbody": TABLE_SECTIONS,
+    "td": {"tr"} | CELL_CLOSERS | TABLE_SECTIONS,
+    "tfoot": {"tbody"},
+    "th": {"tr"} | CELL_CLOSERS | TABLE_SECTIONS,
+    "thead": TABLE_SECTIONS,
+    "tr": {"tr"} | TABLE_SECTIONS,
+    "tt": {"p"},
+    "u": {"p"} | CELL_CLOSERS,
+    "ul": {"address", "form", "menu", "pre"},
+}
+
+# Elements whose content is omitted by the HTML serializer of libxml2.
+VOID_ELEMENTS = frozenset(
+    ("area", "base", "basefont", "br", "col", "frame")
+    + ("hr", "img", "input", "isindex", "link", "meta", "param")
+)
+
+
+def close_implicitly(element: et.ElementBase):
+    """Restructures the subtree of element as serializing it as HTML and
+    parsing the result would do: An element that is implicitly closed by a
+    child ends before that child, i.e. the child and its following siblings
+    move behind the element. Void elements lose their content.
+    Allows to avoid such a round trip, which copies the entire document.
+    """
+    k = 0
+    while k < len(element):
+        child = element[k]
+        if isinstance(child.tag, str):
+            if child.tag in IMPLICITLY_CLOSED_BY.get(element.tag, ()):
+                followers = element[k:]
+                if element.tail is not None:
+                    followers[-1].tail = (followers[-1].tail or "") + element.tail
+                    element.tail = None
+                for follower in reversed(followers):
+                    element.addnext(follower)
+                return  # The followers are handled by the parent's loop.
+            if child.tag in VOID_ELEMENTS:
+                child.text = None
+                for grandchild in list(child):
+                    child.remove(grandchild)
+                k += 1
+                continue
+            if child.tag == "li" and child.text is None and len(child) == 0:
+                # Serialized without end tag, so it takes up what follows.
+                child.text, child.tail = child.tail, None
+                while child.getnext() is not None:
+                    if child.getnext().tag in IMPLICITLY_CLOSED_BY["li"]:
+                        break
+                    child.append(child.getnext())
+            close_implicitly(child)
+        k += 1
+
+
+def drop_namespaces(element: et.ElementBase):
+    """Replaces the elements within the subtree of element that declare
+    namespaces by plain ones, as parsing their HTML serialization would do:
+    The declarations and the qualified names become ordinary attributes.
+    """
+    declared = []
+    for candidate in element.iter():
+        if not isinstance(candidate.tag, str):
+            continue
+        inherited = {}
+        if candidate.getparent() is not None:
+            inherited = candidate.getparent().nsmap
+        own = {p for p, uri in candidate.nsmap.items() if inherited.get(p) != uri}
+        declared.append((candidate, own))
+    for candidate, own in declared:
+        if not candidate.nsmap:  # e.g. since the parent has already been replaced
+            continue
+        stub = et.Element(candidate.tag, nsmap=candidate.nsmap)
+        for key, value in candidate.attrib.items():
+            stub.set(key, value)
+        plain = et.fromstring(et.tostring(stub, method="html"), et.HTMLParser())
+        plain = plain.find("./body")
+        if candidate.tag != "body":
+            plain = plain[0]
+        for prefix in set(candidate.nsmap) - own:  # declared by an ancestor
+            del plain.attrib["xmlns" if prefix is None else f"xmlns:{prefix}"]
+        plain.text, plain.tail = candidate.text, candidate.tail
+        plain.extend(list(candidate))
+        if candidate.getparent() is None:
+            raise ValueError("The root element cannot be replaced.")
+        candidate.getparent().replace(candidate, plain)
+
+
+def escape_uri_attributes(element: et.ElementBase):
+    """Percent-encodes the URI attributes (such as href and src) within the
+    subtree of element, as serializing it as HTML does. The values are
+    escaped by the serializer of libxml2 itself, but without the rest of the
+    document.
+    """
+    attributes = [
+        (e, key)
+        for e in element.iter()
+        if isinstance(e.tag, str)
+        for key in e.attrib
+        if key.lower() in ("href", "action", "src")
+        or (key.lower() == "name" and e.tag.lower() == "a")
+    ]
+    if not attributes:
+        return
+    stub = et.Element("div")
+    for e, key in attributes:
+        et.SubElement(stub, "a").set(key, e.get(key))
+    escaped = et.fromstring(et.tostring(stub, method="html"), et.HTMLParser())
+    for (e, key), a in zip(attributes, escaped.find("./body/div")):
+        e.set(key, a.get(key.lower()))
+
+
 def rollback_on(errors, logger: logging.Logger):
     def rollback_on_error(f):
         """Decorator for functions transforming an XML-Element (e).
@@ -231,20 +419,20 @@ def rollback_on(errors, logger: logging.Logger):
 
         @wraps(f)
         def wrapped(e: et.ElementBase, *args, **kwargs):
-            ec = et.fromstring(et.tostring(e, with_tail=False))
+            # The state before f cannot be recovered once f has failed, so the
+            # snapshot is taken in any case. It is copied within libxml2,
+            # though, instead of serializing and reparsing.
+            ec = deepcopy(e)
             try:
                 f(e, *args, **kwargs)
             except errors:  # rollback
                 logger.error(f"Could not transform {ec.tag}, {ec.attrib}")
-                for child in e.xpath("./*"):
+                for child in list(e):
                     e.remove(child)
                 e.text = ec.text
-                for child in ec.xpath("./*"):
-                    e.append(child)
-                for key in list(e.attrib):
-                    e.attrib.pop(key)
-                for key, value in ec.attrib.items():
-                    e.attrib[key] = value
+                e.extend(list(ec))
+                e.attrib.clear()
+                e.attrib.update(ec.attrib)
 
         return wrapped
 
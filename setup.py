@@ -43,5 +43,6 @@ setup(
         "html5lib",
         "keepalive",
         "numpy",
+        'importlib_metadata; python_version < "3.8"',
     ],
 )